@@ -37,11 +37,20 @@ Utility
    :toctree: generated/
 
    AdjustableSelector
+   ImageObserver
    PolygonModifier
 
+Segmentation
+-------------
+.. autosummary::
+   :toctree: generated/
+
+   segmentStack
+
 """
 
 from ._utilityClasses.adjustableSelector import AdjustableSelector
+from ._utilityClasses.imageObserver import ImageObserver
 from ._modifierWidgets.polygonModifier import PolygonModifier
 from ._modifierWidgets.movingModifier import MovingModifier
 from ._creatorWidgets.ellipse import EllipseCreator
@@ -52,11 +61,13 @@ from ._creatorWidgets.point import PointCreator
 from ._creatorWidgets.FullImPaintSelector import FullImPaintCreator
 from ._creatorWidgets.WaterShedPaintSelector import WaterShedPaintCreator
 from ._creatorWidgets._base import CreatorWidgetBase
+from ._creatorWidgets._segmentStack import segmentStack
 from ._coreClasses import InteractiveWidgetBase
 from ._modifierWidgets._base import ModifierWidgetBase
 
 __all__ = [
     "AdjustableSelector",
+    "ImageObserver",
     "EllipseCreator",
     "LassoCreator",
     "RegionalPaintCreator",
@@ -69,4 +80,5 @@ __all__ = [
     "CreatorWidgetBase",
     "InteractiveWidgetBase",
     "ModifierWidgetBase",
+    "segmentStack",
 ]
@@ -16,29 +16,83 @@
 # along with mpl_qt_viz.  If not, see <https://www.gnu.org/licenses/>.
 from __future__ import annotations
 import copy
+import math
 import typing
 
+import numpy as np
 from matplotlib.artist import Artist
 from matplotlib.axes import Axes
 from matplotlib.lines import Line2D
 from matplotlib.patches import Patch
+from matplotlib.transforms import Bbox
 from matplotlib.widgets import AxesWidget
 import typing as t_
 
 if typing.TYPE_CHECKING:
-    from matplotlib.backend_bases import LocationEvent, KeyEvent, MouseEvent
+    from matplotlib.backend_bases import FigureCanvasBase, LocationEvent, KeyEvent, MouseEvent, RendererBase
     from matplotlib.image import AxesImage
 
 
+class _FigureBackground:
+    """A snapshot of the pixels of a whole figure that is used to erase animated artists before they are redrawn. One
+    snapshot is shared by every `AxManager` on a canvas, and it is only copied from the canvas the first time that it's
+    needed after each full draw. This way a draw costs at most one copy no matter how many axes have selectors.
+
+    Args:
+        canvas: The canvas to take snapshots of.
+    """
+
+    _CANVAS_ATTR = "_mpl_qt_viz_background"  # The shared instance is stored on the canvas under this attribute.
+
+    def __init__(self, canvas: FigureCanvasBase):
+        self.canvas = canvas
+        self._drawn = False  # Until the canvas has been drawn there is nothing to restore.
+        self._region = None  # `None` if the snapshot must be copied again.
+        canvas.mpl_connect("draw_event", self._invalidate)
+
+    @classmethod
+    def forCanvas(cls, canvas: FigureCanvasBase) -> _FigureBackground:
+        """Return the instance shared by everything drawn on `canvas`, creating it if needed."""
+        background = getattr(canvas, cls._CANVAS_ATTR, None)
+        if background is None:
+            background = cls(canvas)
+            setattr(canvas, cls._CANVAS_ATTR, background)
+        return background
+
+    def _invalidate(self, event):
+        self._drawn = True
+        self._region = None
+
+    def restore(self, bbox: Bbox):
+        """Restore the pixels within `bbox` (in display coordinates) to how they were after the last full draw."""
+        if not self._drawn:
+            return
+        if self._region is None:
+            self._region = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        # Regions are addressed in pixels from the top left corner of the figure. `xy` is where the corner of the whole
+        # snapshot goes, not the corner of `bbox`.
+        height = self.canvas.figure.bbox.height
+        x0, x1 = math.floor(bbox.x0), math.ceil(bbox.x1)
+        y0, y1 = math.floor(height - bbox.y1), math.ceil(height - bbox.y0)
+        self.canvas.restore_region(
+            self._region, bbox=(x0, y0, x1, y1), xy=self._region.get_extents()[:2]
+        )
+
+
 class AxManager:
     """An object to manage multiple selector tools on a single axes. Only one of these should exist per Axes object.
 
+    When `update` is called only the artists that have changed (those that matplotlib has marked as `stale`) are
+    redrawn. Only the area that they covered before and after the change is restored from the background and blitted to
+    the screen, along with any other managed artists that overlap that area.
+
     Args:
         ax: The matplotlib Axes object to draw on.
 
     """
 
     _AX_ATTR = "_mpl_qt_viz_axManager"  # When a manager is attached to a Matplotlib Axes this attribute will be added to the axis. Allows making sure we only add one manager per axis.
+    _PAD = 2  # Pixels added around the extent of each artist to account for antialiasing.
 
     class ManagerAlreadyAssignedException(Exception):
         def __init__(self, axMan: AxManager):
@@ -60,7 +114,20 @@ class AxManager:
         self.ax = ax
         self.canvas = self.ax.figure.canvas
         self.canvas.mpl_connect("draw_event", self._update_background)
-        self.background = None
+        self._background = _FigureBackground.forCanvas(self.canvas)
+        self._extents: t_.Dict[Artist, t_.Optional[Bbox]] = {}  # Where each artist was last drawn, in display coords.
+        self._removedExtents: t_.List[Bbox] = []  # Areas of removed artists that haven't been erased yet.
+        self._needsFull = True  # After a full draw none of the animated artists are on the canvas.
+
+    def __getstate__(self):
+        # The canvas and background only apply to interactive use. Dropping them allows the figure to be pickled.
+        state = self.__dict__.copy()
+        state["canvas"] = None
+        state["_background"] = None
+        state["_extents"] = {}
+        state["_removedExtents"] = []
+        state["_needsFull"] = True
+        return state
 
     def addArtist(self, artist: Artist):
         """Adds an artist to the manager.
@@ -76,6 +143,7 @@ class AxManager:
             self.ax.add_line(artist)
         else:
             self.ax.add_artist(artist)
+        artist.stale = True
 
     def removeArtist(self, artist: Artist):
         """Remove a single `Artist` from the manaager
@@ -84,36 +152,103 @@ class AxManager:
             artist: A previously added matplotlib `Artist`.
         """
         self.artists.remove(artist)
+        extent = self._extents.pop(artist, None)
+        if extent is not None:
+            self._removedExtents.append(extent)
         artist.remove()
 
     def update(self):
-        """Re-render the axes. Call this after you know that something has changed with the plot."""
+        """Re-render the artists that have changed. Call this after you know that something has changed."""
         # TODO what is the return value here?
         if not self.ax.get_visible():
             return False
-        if self.canvas.supports_blit:
-            if self.background is not None:
-                self.canvas.restore_region(self.background)
-            for artist in self.artists:
-                if artist.get_visible():
-                    try:
-                        self.ax.draw_artist(artist)
-                    except AttributeError:
-                        pass  # This can happen if the figure hasn't already had it's initial draw
-            try:
-                self.canvas.blit(self.ax.bbox)
-            except AttributeError:  # Sometimes this happens when first opening
-                self.canvas.draw_idle()
+        if not self.canvas.supports_blit:
+            self.canvas.draw_idle()
+            return False
+        try:
+            renderer = self.canvas.get_renderer()
+        except AttributeError:  # Sometimes this happens when first opening
+            self.canvas.draw_idle()
+            return False
+        if self._needsFull:
+            dirty = list(self.artists)
         else:
+            dirty = [artist for artist in self.artists if artist.stale]
+            if len(dirty) == 0 and len(self._removedExtents) == 0:
+                return False  # Nothing has changed.
+        regions = self._removedExtents
+        self._removedExtents = []
+        for artist in dirty:
+            if self._extents.get(artist) is not None:
+                regions.append(self._extents[artist])  # Erase the artist from where it was.
+            self._extents[artist] = (
+                self._extent(artist, renderer) if artist.get_visible() else None
+            )
+            if self._extents[artist] is not None:
+                regions.append(self._extents[artist])
+            artist.stale = False  # Invisible artists don't draw so they'd otherwise stay stale.
+        if self._needsFull:
+            region = self.ax.bbox
+        elif len(regions) > 0:
+            region = self._growRegion(Bbox.union(regions))
+        else:
+            return False
+        region = Bbox.intersection(region, self.ax.bbox)
+        if region is None:
+            self._needsFull = False
+            return False  # The changes are all outside of the axes.
+        self._background.restore(region)
+        for artist in self.artists:
+            if artist.get_visible() and (
+                self._extents.get(artist) is None
+                or self._extents[artist].overlaps(region)
+            ):
+                try:
+                    self.ax.draw_artist(artist)
+                except AttributeError:
+                    pass  # This can happen if the figure hasn't already had it's initial draw
+        self._needsFull = False
+        try:
+            self.canvas.blit(region)
+        except AttributeError:  # Sometimes this happens when first opening
             self.canvas.draw_idle()
         return False
 
+    def _growRegion(self, region: Bbox) -> Bbox:
+        """Expand `region` until it entirely contains every visible artist that overlaps it. Artists that are redrawn
+        must be redrawn over a clean background, otherwise semi-transparent artists would be drawn over themselves."""
+        grown = True
+        while grown:
+            grown = False
+            for artist in self.artists:
+                extent = self._extents.get(artist)
+                if not artist.get_visible() or extent is None or not extent.overlaps(region):
+                    continue
+                union = Bbox.union([region, extent])
+                if not np.array_equal(union.extents, region.extents):
+                    region = union
+                    grown = True
+        return region
+
+    def _extent(self, artist: Artist, renderer: RendererBase) -> t_.Optional[Bbox]:
+        """The area of the canvas that `artist` covers, in display coordinates. `None` if it draws nothing."""
+        try:
+            bbox = artist.get_window_extent(renderer)
+        except Exception:
+            return self.ax.bbox  # We don't know where the artist is, assume it covers the whole axes.
+        if not np.all(np.isfinite(bbox.extents)):
+            return None
+        try:
+            lineWidth = float(np.max(artist.get_linewidth()))
+        except (AttributeError, ValueError):
+            lineWidth = 0
+        return bbox.padded(self._PAD + lineWidth * self.ax.figure.dpi / 72)
+
     def _update_background(self, event):
-        """force an update of the background"""
+        """The canvas has been drawn, none of our animated artists are on it anymore."""
         # If you add a call to `ignore` here, you'll want to check edge case:
         # `release` can call a draw event even when `ignore` is True.
-        if self.canvas.supports_blit:
-            self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._needsFull = True
 
 
 class InteractiveWidgetBase(AxesWidget):
@@ -310,10 +445,8 @@ class InteractiveWidgetBase(AxesWidget):
 
     def removeArtists(self):
         """Remove all artist objects associated with this selector"""
-        while (
-            len(self._artists) > 0
-        ):  # Using a for loop here has problems since we remove items as we go.
-            self.removeArtist(list(self._artists.keys())[0])
+        for artist in list(self._artists):  # Copied since we remove items as we go.
+            self.removeArtist(artist)
 
     def removeArtist(self, artist: Artist):
         self._artists.pop(artist)
@@ -0,0 +1,319 @@
+# Copyright 2018-2021 Nick Anthony, Backman Biophotonics Lab, Northwestern University
+#
+# This file is part of mpl_qt_viz.
+#
+# mpl_qt_viz is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# mpl_qt_viz is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with mpl_qt_viz.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+import logging
+import typing
+from PyQt6 import QtCore
+from PyQt6.QtCore import QPoint
+from PyQt6.QtWidgets import (
+    QDialog,
+    QWidget,
+    QPushButton,
+    QFormLayout,
+    QProgressBar,
+    QCheckBox,
+)
+import numpy as np
+from matplotlib.image import AxesImage
+from shapely.geometry import Polygon as shapelyPolygon, LinearRing, MultiPolygon
+from mpl_qt_viz.roiSelection._creatorWidgets._sharedWidgets import LabeledSlider
+from mpl_qt_viz.roiSelection._creatorWidgets._base import CreatorWidgetBase
+from mpl_qt_viz.roiSelection._creatorWidgets._worker import SegmentationWorker
+from mpl_qt_viz.roiSelection._creatorWidgets._regionIndex import RegionIndex
+from mpl_qt_viz.roiSelection._creatorWidgets._roiOverlay import RoiOverlay
+from mpl_qt_viz.roiSelection._utilityClasses.imageObserver import ImageObserver
+
+if typing.TYPE_CHECKING:
+    from matplotlib.axes import Axes
+
+
+class SliderSpec(typing.NamedTuple):
+    """Describes one of the sliders of a `PaintDialog`."""
+
+    setting: str  # The keyword argument of the segmenter that the slider controls.
+    label: str
+    minimum: int
+    maximum: int
+    step: int
+    default: int
+    toolTip: str
+
+
+class PaintCreatorBase(CreatorWidgetBase):
+    """Base class for selectors that segment the full image and let the user click on one of the detected regions to
+    select it. The segmentation runs in the background and is rerun whenever the image or the settings of the dialog
+    change.
+
+    Args:
+        ax: The matplotlib `Axes` that you want to interact with.
+        im: A reference to a matplotlib `AxesImage`. The data from this object is used to detect bright regions.
+        segmenter: A callable that takes the image data along with the settings of the dialog as keyword arguments and
+            returns a list of shapely `Polygon`s. It should keep the output of each of its stages so that only the
+            stages affected by a change are rerun, it is also passed an `imageKey` argument that changes whenever the
+            image data does.
+        sliders: The settings that the dialog should display.
+        title: The window title of the dialog.
+        onselect: A callback that will be called when the user hits 'enter'. Should have signature (polygonCoords, sparseHandleCoords).
+    """
+
+    def __init__(
+        self,
+        ax: Axes,
+        im: AxesImage,
+        segmenter: typing.Callable[..., typing.List[shapelyPolygon]],
+        sliders: typing.Sequence[SliderSpec],
+        title: str,
+        onselect=None,
+    ):
+        super().__init__(ax, im, onselect=onselect)
+        self.dlg = PaintDialog(self, self.ax.figure.canvas, title, sliders)
+        self._segmenter = SegmentationWorker()  # Segmentation runs in the background to keep the GUI responsive.
+        self._segmenter.finished.connect(self._segmentationFinished)
+        self._segmenter.failed.connect(self._segmentationFailed)
+        self._segmenter.busyChanged.connect(self.dlg.setBusy)
+        self._pipeline = segmenter
+
+        self._cachedRegions = None  # We cache the detected polygons. No need to redetect if nothing has changed between selections.
+        self._imageVersion = None  # The version of the image data that `self._cachedRegions` was detected from.
+        self._refreshCount = 0  # Part of the image key, incremented to make the segmentation start over.
+        self._imageObserver = ImageObserver.forImage(self.image)  # Notifies us when the image data is replaced.
+        self._imageObserverId = None
+        self._regionIndex: typing.Optional[RegionIndex] = None  # Finds the region under the mouse without checking every polygon.
+        self._overlay = RoiOverlay(self)  # Draws all of the regions as a single artist.
+        self._hoverHighlight = False
+
+    @property
+    def hoverHighlight(self) -> bool:
+        """If `True` then the region that would be selected by a click is highlighted when the mouse is over it."""
+        return self._hoverHighlight
+
+    @hoverHighlight.setter
+    def hoverHighlight(self, enabled: bool):
+        self._hoverHighlight = enabled
+        if not enabled and self._overlay.setHighlight(None):
+            self.updateAxes()
+
+    def reset(self):
+        """Reset the state of the selector so it's ready for a new selection."""
+        self._overlay.clear()
+        self.updateAxes()
+
+    def set_active(self, active: bool):
+        super().set_active(active)
+        if active:
+            self.dlg.show()
+            # Move dialog to the side
+            rect = self.dlg.geometry()
+            parentRect = self.ax.figure.canvas.geometry()
+            rect.moveTo(
+                self.ax.figure.canvas.mapToGlobal(
+                    QPoint(parentRect.x() - rect.width(), parentRect.y())
+                )
+            )
+            self.dlg.setGeometry(rect)
+            if self._imageObserverId is None:
+                self._imageObserverId = self._imageObserver.subscribe(
+                    self._imageChanged
+                )
+            self.paint()
+        else:
+            if self._imageObserverId is not None:
+                self._imageObserver.unsubscribe(self._imageObserverId)
+                self._imageObserverId = None
+            self._segmenter.cancel()
+            self._cachedRegions = None  # The segmentation may have been cancelled, make sure it's redone next time.
+            self.dlg.close()
+
+    def _addRois(self, polys: typing.List[shapelyPolygon]):
+        """Display a list of shapely `Polygon` objects."""
+        self._cachedRegions = polys
+        self._overlay.setRegions(polys, self._regionIndex)
+
+    def _press(self, event):
+        """If a displayed polygon is clicked on then execute the `onselect` callback."""
+        if event.button == 1 and self.onselect is not None:  # Left Click
+            i = self._regionAt(event)
+            if i is not None:
+                verts = self._overlay.vertices(i)
+                polygon = shapelyPolygon(LinearRing(verts))
+                polygon = polygon.simplify(polygon.length / 2e2, preserve_topology=False)
+                if isinstance(
+                    polygon, MultiPolygon
+                ):  # There is a chance for this to convert a Polygon to a Multipolygon.
+                    polygon = max(
+                        polygon.geoms, key=lambda a: a.area
+                    )  # To fix this we extract the largest polygon from the multipolygon
+                handles = polygon.exterior.coords
+                self.onselect(verts, handles)
+
+    def _onhover(self, event):
+        if self._hoverHighlight and self._overlay.setHighlight(self._regionAt(event)):
+            self.updateAxes()
+
+    def _regionAt(self, event) -> typing.Optional[int]:
+        """Return the index of the displayed region under the mouse, or `None`."""
+        if self._regionIndex is None or len(self._overlay) == 0:
+            return None
+        return self._regionIndex.lookup(event.xdata, event.ydata)
+
+    def paint(self, forceRedraw: bool = True):
+        """Refresh the detected regions.
+
+        Args:
+            forceRedraw: If `True` then polygons will be cleared and redrawn even if we don't detect that our status is `stale`
+        """
+        if not self.get_active():
+            return  # Sometimes we instantiate the class but don't have it active. avoid drawing stuff.
+        stale = self._cachedRegions is None
+        if self._imageVersion != self._imageObserver.version:  # The image has been changed.
+            self._imageVersion = self._imageObserver.version
+            stale = True
+        if self.dlg.isStale():
+            stale = True
+        if stale:  # We need to re-run the segmentation. The regions are drawn once it finishes.
+            self._segmenter.submit(
+                self._segment,
+                self.image.get_array().copy(),  # Copy in case the image is modified while segmenting.
+                imageKey=(self._imageVersion, self._refreshCount),
+                **self.dlg.getSettings(),
+            )
+        elif forceRedraw:  # Nothing needs to be done unless `forceRedraw` was passed.
+            self._showRegions(self._cachedRegions)
+
+    def refresh(self):
+        """Rerun every stage of the segmentation, even if the image and settings appear unchanged. Modifying the image
+        data in place can't be detected, this picks up such changes."""
+        self._refreshCount += 1
+        self._cachedRegions = None
+        self.paint()
+
+    def _segment(
+        self, image: np.ndarray, **kwargs
+    ) -> typing.Tuple[typing.List[shapelyPolygon], RegionIndex]:
+        """Runs in the background. Segment the image and index the resulting regions."""
+        polys = self._pipeline(image, **kwargs)
+        return polys, RegionIndex(polys)
+
+    def _imageChanged(self, version: int):
+        self.paint(forceRedraw=False)
+
+    def _segmentationFinished(
+        self, result: typing.Tuple[typing.List[shapelyPolygon], RegionIndex]
+    ):
+        if self.get_active():
+            polys, self._regionIndex = result
+            self._showRegions(polys)
+
+    def _segmentationFailed(self, e: Exception):
+        logging.getLogger(__name__).warning(
+            f"{self.dlg.windowTitle()} segmentation failed with error:"
+        )
+        logging.getLogger(__name__).exception(e)
+
+    def _showRegions(self, polys: typing.List[shapelyPolygon]):
+        self._addRois(polys)
+        self.updateAxes()
+
+
+class PaintDialog(QDialog):
+    """The dialog used by a `PaintCreatorBase`. Displays a slider for each of the settings of the segmentation.
+
+    Args:
+        parentSelector: A reference the the selector that is being used with this dialog.
+        parent: A QWidget to serve as the Qt parent for this QWidget.
+        title: The window title.
+        sliders: The settings to display, in order.
+
+    Attributes:
+        sliders (dict): The `LabeledSlider` for each setting, keyed by `SliderSpec.setting`.
+    """
+
+    def __init__(
+        self,
+        parentSelector: PaintCreatorBase,
+        parent: QWidget,
+        title: str,
+        sliders: typing.Sequence[SliderSpec],
+    ):
+        super().__init__(parent=parent)
+        self.setWindowFlags(
+            QtCore.Qt.WindowType.Window
+            | QtCore.Qt.WindowType.WindowTitleHint
+            | QtCore.Qt.WindowType.CustomizeWindowHint
+        )  # Get rid of the close button. this is handled by the selector widget active status
+        self.parentSelector = parentSelector
+        self.setWindowTitle(title)
+
+        self._stale = True  # Keeps track of if the settings have changed.
+
+        self._paintDebounce = (
+            QtCore.QTimer()
+        )  # This timer prevents the selectionChanged signal from firing too rapidly.
+        self._paintDebounce.setInterval(200)
+        self._paintDebounce.setSingleShot(True)
+        self._paintDebounce.timeout.connect(self.parentSelector.paint)
+
+        layout = QFormLayout()
+        self.sliders: typing.Dict[str, LabeledSlider] = {}
+        for spec in sliders:
+            slider = LabeledSlider(
+                spec.minimum, spec.maximum, spec.step, spec.default, self
+            )
+            slider.setToolTip(spec.toolTip)
+            slider.valueChanged.connect(self._valChanged)
+            layout.addRow(spec.label, slider)
+            self.sliders[spec.setting] = slider
+
+        self.refreshButton = QPushButton("Refresh", self)
+
+        self.refreshButton.released.connect(self.parentSelector.refresh)
+
+        self.hoverCheckBox = QCheckBox("Highlight Under Mouse", self)
+        self.hoverCheckBox.setToolTip(
+            "Highlight the region that will be selected by clicking as the mouse moves over it."
+        )
+        self.hoverCheckBox.toggled.connect(
+            lambda checked: setattr(self.parentSelector, "hoverHighlight", checked)
+        )
+
+        self.busyBar = QProgressBar(self)  # Indicates that segmentation is running.
+        self.busyBar.setRange(0, 0)
+        self.busyBar.setTextVisible(False)
+        self.busyBar.setVisible(False)
+
+        layout.addRow(self.hoverCheckBox)
+        layout.addRow(self.refreshButton)
+        layout.addRow(self.busyBar)
+        self.setLayout(layout)
+
+    def _valChanged(self):
+        """When a setting is changed it should call this to schedule a repaint."""
+        self._stale = True
+        self._paintDebounce.start()
+
+    def setBusy(self, busy: bool):
+        """Show or hide the indicator that segmentation is running."""
+        self.busyBar.setVisible(busy)
+
+    def isStale(self):
+        """Returns if True if the settings have changed since the last time `getSettings` was called."""
+        return self._stale
+
+    def getSettings(self) -> dict:
+        self._stale = False
+        return {setting: slider.value() for setting, slider in self.sliders.items()}
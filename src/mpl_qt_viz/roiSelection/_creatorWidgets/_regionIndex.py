@@ -0,0 +1,115 @@
+# Copyright 2018-2021 Nick Anthony, Backman Biophotonics Lab, Northwestern University
+#
+# This file is part of mpl_qt_viz.
+#
+# mpl_qt_viz is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# mpl_qt_viz is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with mpl_qt_viz.  If not, see <https://www.gnu.org/licenses/>.
+
+
+from __future__ import annotations
+import typing
+import cv2
+import numpy as np
+from matplotlib.path import Path
+from shapely.geometry import Polygon as shapelyPolygon, MultiPolygon
+
+
+class RegionIndex:
+    """A rasterized label map of a set of polygons. Finding the polygon under a point is a single array lookup no matter
+    how many polygons there are. Near the edge of a polygon, where rasterization is ambiguous, the few polygons found in
+    the neighboring pixels are tested exactly. The label map only covers the bounding box of the polygons.
+
+    Args:
+        polys: Polygons with coordinates in pixels of the image, the same as produced by the functions in `_segmentation`.
+            A `MultiPolygon` is indexed as its largest part.
+    """
+
+    def __init__(self, polys: typing.Sequence[shapelyPolygon]):
+        self._len = len(polys)
+        self._paths: typing.Dict[int, Path] = {}  # Built as needed for exact tests near edges.
+        dtype = np.uint16 if len(polys) < np.iinfo(np.uint16).max else np.int32
+        polys = [
+            max(p.geoms, key=lambda a: a.area) if isinstance(p, MultiPolygon) else p
+            for p in polys
+        ]
+        self._polys = polys
+        bounds = np.array([p.bounds for p in polys if not p.is_empty]).reshape(-1, 4)
+        if len(bounds) == 0:
+            self._origin = (0, 0)
+            self.labels = np.zeros((0, 0), dtype=dtype)
+            return
+        x0, y0 = np.floor(bounds[:, :2].min(axis=0)).astype(int)
+        x1, y1 = np.ceil(bounds[:, 2:].max(axis=0)).astype(int)
+        self._origin = (x0, y0)
+        self.labels = np.zeros((y1 - y0 + 1, x1 - x0 + 1), dtype=dtype)
+        # Fill in reverse order so that where polygons overlap the first one wins, the same as a linear search would.
+        for i in reversed(range(len(polys))):
+            p = polys[i]
+            if p.is_empty:
+                continue
+            px0, py0, px1, py1 = (int(v) for v in np.round(p.bounds))
+            mask = np.zeros((py1 - py0 + 1, px1 - px0 + 1), dtype=np.uint8)
+            offset = (-px0, -py0)
+            cv2.fillPoly(mask, [self._ring(p.exterior)], 1, offset=offset)
+            if len(p.interiors) > 0:
+                cv2.fillPoly(mask, [self._ring(r) for r in p.interiors], 0, offset=offset)
+            region = self.labels[py0 - y0 : py1 - y0 + 1, px0 - x0 : px1 - x0 + 1]
+            region[mask.astype(bool)] = i + 1
+
+    def __len__(self):
+        return self._len
+
+    @property
+    def origin(self) -> typing.Tuple[int, int]:
+        """The (x, y) coordinates of the first pixel of `labels`."""
+        return self._origin
+
+    @staticmethod
+    def _ring(ring) -> np.ndarray:
+        return np.round(np.asarray(ring.coords)[:, :2]).astype(np.int32)
+
+    def lookup(self, x: float, y: float) -> typing.Optional[int]:
+        """Find the polygon at a point.
+
+        Args:
+            x: The x (column) coordinate of the point.
+            y: The y (row) coordinate of the point.
+
+        Returns:
+            The index of the polygon in the sequence that the index was built from, or `None` if there is no polygon there.
+        """
+        if x is None or y is None:
+            return None
+        col = int(round(x)) - self._origin[0]
+        row = int(round(y)) - self._origin[1]
+        rows, cols = self.labels.shape
+        if not (-1 <= row <= rows and -1 <= col <= cols):
+            return None
+        neighborhood = self.labels[max(row - 1, 0) : row + 2, max(col - 1, 0) : col + 2]
+        label = int(self.labels[row, col]) if (0 <= row < rows and 0 <= col < cols) else 0
+        if label > 0 and neighborhood.size == 9 and np.all(neighborhood == label):
+            return label - 1  # Well inside a polygon.
+        for label in np.unique(neighborhood):  # Ascending, so the first polygon wins.
+            if label > 0 and self._contains(int(label) - 1, x, y):
+                return int(label) - 1
+        return None
+
+    def _contains(self, i: int, x: float, y: float) -> bool:
+        path = self._paths.get(i)
+        if path is None:
+            p = self._polys[i]
+            path = Path.make_compound_path(
+                *(Path(np.asarray(r.coords)[:, :2]) for r in (p.exterior, *p.interiors))
+            )
+            self._paths[i] = path
+        return path.contains_point((x, y))
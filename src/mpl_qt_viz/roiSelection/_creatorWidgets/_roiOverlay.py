@@ -0,0 +1,208 @@
+# Copyright 2018-2021 Nick Anthony, Backman Biophotonics Lab, Northwestern University
+#
+# This file is part of mpl_qt_viz.
+#
+# mpl_qt_viz is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# mpl_qt_viz is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with mpl_qt_viz.  If not, see <https://www.gnu.org/licenses/>.
+
+
+from __future__ import annotations
+import typing
+import numpy as np
+from matplotlib.collections import PolyCollection
+from matplotlib.image import AxesImage
+from matplotlib.patches import Polygon
+from shapely.geometry import Polygon as shapelyPolygon, MultiPolygon
+from ._regionIndex import RegionIndex
+
+if typing.TYPE_CHECKING:
+    from .._coreClasses import InteractiveWidgetBase
+
+_COLORS = np.array(
+    [(1, 0, 0), (0, 1, 0), (0, 0, 1), (1, 1, 0), (1, 0, 1)], dtype=float
+)  # Regions are colored by cycling through these.
+
+
+class RoiOverlay:
+    """Displays a large number of polygonal regions using a single artist so that the cost of redrawing doesn't depend on
+    drawing each region individually. Up to `imageThreshold` regions are drawn as one `PolyCollection`. Beyond that the
+    label map of a `RegionIndex` is displayed as an image with a colormap that gives each label its color, which costs
+    the same to draw no matter how many regions there are. A single region at a time can be highlighted with an outline.
+
+    Args:
+        selector: The selector that the artists of the overlay are added to.
+        alpha: The opacity of the regions.
+        imageThreshold: Draw the regions as an image when there are more than this many.
+    """
+
+    def __init__(
+        self, selector: InteractiveWidgetBase, alpha: float = 0.3, imageThreshold: int = 1000
+    ):
+        self._selector = selector
+        self.alpha = alpha
+        self.imageThreshold = imageThreshold
+        self._polys: typing.List[shapelyPolygon] = []
+        self._colors = np.zeros((0, 4))
+        self._regions: typing.Optional[typing.Union[PolyCollection, AxesImage]] = None
+        self._outline: typing.Optional[Polygon] = None
+        self._highlighted: typing.Optional[int] = None
+
+    def __len__(self):
+        return len(self._polys)
+
+    def setRegions(
+        self,
+        polys: typing.Sequence[shapelyPolygon],
+        index: typing.Optional[RegionIndex] = None,
+    ):
+        """Replace the displayed regions.
+
+        Args:
+            polys: The regions to display. A `MultiPolygon` is displayed as its largest part.
+            index: The `RegionIndex` of `polys`. Needed to display the regions as an image. If `None` the regions are
+                always drawn as polygons.
+        """
+        self.clear()
+        self._polys = [
+            max(p.geoms, key=lambda a: a.area) if isinstance(p, MultiPolygon) else p
+            for p in polys
+        ]
+        if len(self._polys) == 0:
+            return
+        self._colors = np.concatenate(
+            [
+                _COLORS[np.arange(len(self._polys)) % len(_COLORS)],
+                np.full((len(self._polys), 1), self.alpha),
+            ],
+            axis=1,
+        )
+        ax = self._selector.ax
+        if index is not None and len(self._polys) > self.imageThreshold:
+            self._regions = _LabelImage(ax, index, self._colors, animated=True)
+        else:
+            self._regions = PolyCollection(
+                [np.asarray(p.exterior.coords) for p in self._polys],
+                facecolors=self._colors,
+                edgecolors=self._colors,
+                animated=True,
+            )
+        self._selector.addArtist(self._regions)
+        self._outline = Polygon(np.zeros((1, 2)), fill=False, linewidth=2, animated=True)
+        self._selector.addArtist(self._outline)
+        self._selector.setArtistVisible(self._outline, False)
+
+    def clear(self):
+        """Remove all regions."""
+        for artist in (self._regions, self._outline):
+            if artist is not None:
+                self._selector.removeArtist(artist)
+        self._regions = self._outline = None
+        self._highlighted = None
+        self._polys = []
+
+    def vertices(self, i: int) -> np.ndarray:
+        """Return the vertices of region `i` as an Nx2 array."""
+        return np.asarray(self._polys[i].exterior.coords)
+
+    def setColor(self, i: int, color: typing.Tuple[float, ...]):
+        """Change the color of region `i`.
+
+        Args:
+            i: The index of the region.
+            color: An RGB or RGBA tuple. If no alpha is given then the overlay's `alpha` is used.
+        """
+        self._colors[i] = tuple(color) + (self.alpha,) * (4 - len(color))
+        if isinstance(self._regions, _LabelImage):
+            self._regions.setColors(self._colors)
+        elif self._regions is not None:
+            self._regions.set_facecolor(self._colors)
+            self._regions.set_edgecolor(self._colors)
+        if i == self._highlighted:
+            self._outline.set_edgecolor(self._colors[i, :3])
+
+    def setHighlight(self, i: typing.Optional[int]) -> bool:
+        """Outline region `i`, or remove the outline if `i` is `None`.
+
+        Returns:
+            `True` if the highlighted region changed and the axes need to be redrawn.
+        """
+        if i == self._highlighted or self._outline is None:
+            return False
+        self._highlighted = i
+        if i is not None:
+            self._outline.set_xy(self.vertices(i))
+            self._outline.set_edgecolor(self._colors[i, :3])
+        self._selector.setArtistVisible(self._outline, i is not None)
+        return True
+
+
+class _LabelImage(AxesImage):
+    """Displays the label map of a `RegionIndex` with a color for each label. Only the visible part of the map, reduced
+    to about the resolution of the screen, is colored and passed on to be drawn so the cost of drawing depends on
+    neither the size of the map nor the number of labels. The colored view is reused until the axes limits change.
+
+    Args:
+        ax: The axes to draw on.
+        index: The index whose label map is displayed. Label 0 is transparent, label `i + 1` has color `colors[i]`.
+        colors: An Nx4 array of RGBA colors in the range 0-1.
+    """
+
+    def __init__(self, ax, index: RegionIndex, colors: np.ndarray, **kwargs):
+        super().__init__(ax, interpolation="nearest", origin="upper", **kwargs)
+        self.set_mouseover(False)  # Don't replace the image data in the cursor readout.
+        self._labels = index.labels
+        self._origin = index.origin
+        self._view = None  # The region of `_labels` that was last colored.
+        self._viewExtent = (0, 1, 1, 0)
+        self.setColors(colors)
+
+    def setColors(self, colors: np.ndarray):
+        """Set the color of each label."""
+        self._lut = np.zeros((len(colors) + 1, 4), dtype=np.uint8)
+        self._lut[1:] = np.round(np.asarray(colors) * 255)
+        self._view = None
+
+    def get_extent(self):
+        return self._viewExtent
+
+    def draw(self, renderer):
+        if self._updateView():
+            super().draw(renderer)
+
+    def _updateView(self) -> bool:
+        """Color the visible part of the label map if it has changed. Returns `False` if nothing is visible."""
+        x0, y0 = self._origin
+        h, w = self._labels.shape
+        vx0, vx1 = sorted(self.axes.get_xlim())
+        vy0, vy1 = sorted(self.axes.get_ylim())
+        c0, c1 = (int(np.clip(v, 0, w)) for v in (np.floor(vx0 - x0 + 0.5), np.ceil(vx1 - x0 + 0.5)))
+        r0, r1 = (int(np.clip(v, 0, h)) for v in (np.floor(vy0 - y0 + 0.5), np.ceil(vy1 - y0 + 0.5)))
+        if c1 <= c0 or r1 <= r0:
+            return False
+        step = max(
+            1,
+            int(min((c1 - c0) / max(self.axes.bbox.width, 1), (r1 - r0) / max(self.axes.bbox.height, 1))),
+        )
+        view = (r0, r1, c0, c1, step)
+        if view != self._view:
+            self._view = view
+            rgba = self._lut[self._labels[r0:r1:step, c0:c1:step]]
+            rows, cols = rgba.shape[:2]
+            self._viewExtent = (
+                x0 + c0 - 0.5,
+                x0 + c0 + cols * step - 0.5,
+                y0 + r0 + rows * step - 0.5,
+                y0 + r0 - 0.5,
+            )
+            self.set_data(rgba)
+        return True
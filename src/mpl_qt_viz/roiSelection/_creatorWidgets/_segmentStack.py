@@ -0,0 +1,205 @@
+# Copyright 2018-2021 Nick Anthony, Backman Biophotonics Lab, Northwestern University
+#
+# This file is part of mpl_qt_viz.
+#
+# mpl_qt_viz is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# mpl_qt_viz is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with mpl_qt_viz.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Segmentation of many images at once, outside of the interactive ROI creators.
+
+Functions
+-----------
+.. autosummary::
+   :toctree: generated/
+
+   segmentStack
+
+"""
+
+from __future__ import annotations
+import collections
+import mmap
+import multiprocessing
+import os
+import typing
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import shapely
+from ._segmentation import segmentAdaptive, segmentOtsu, segmentWatershed
+
+Methods: typing.Dict[str, typing.Callable[..., typing.List[shapely.geometry.Polygon]]] = {
+    "adaptive": segmentAdaptive,
+    "watershed": segmentWatershed,
+    "otsu": segmentOtsu,
+}
+
+
+class _FrameRef(typing.NamedTuple):
+    """Tells a worker process where to find a frame without the frame itself being pickled. `name` is either the name
+    of a shared memory block holding just the frame or, if `index` isn't `None`, the path of a file that is memory
+    mapped as a stack of frames."""
+
+    name: str
+    shape: typing.Tuple[int, ...]
+    dtype: str
+    offset: int = 0
+    index: typing.Optional[int] = None
+
+
+_opened: typing.Dict[tuple, typing.Union[shared_memory.SharedMemory, np.memmap]] = {}  # Cached in each worker.
+
+
+def _readFrame(ref: _FrameRef) -> np.ndarray:
+    """Runs in a worker process. Return the frame that `ref` refers to, without copying it."""
+    key = ref[:4]
+    if ref.index is not None:
+        stack = _opened.get(key)
+        if stack is None:
+            stack = _opened[key] = np.memmap(
+                ref.name, dtype=ref.dtype, mode="r", offset=ref.offset, shape=ref.shape
+            )
+        return stack[ref.index]
+    shm = _opened.get(key)
+    if shm is None:
+        shm = _opened[key] = shared_memory.SharedMemory(ref.name)
+    return np.ndarray(ref.shape, dtype=ref.dtype, buffer=shm.buf)
+
+
+def _segmentFrame(
+    method: typing.Callable, params: dict, ref: _FrameRef
+) -> typing.List[shapely.geometry.Polygon]:
+    """Runs in a worker process."""
+    return method(_readFrame(ref), **params)
+
+
+def _isWholeMemmap(images) -> bool:
+    """Whether `images` is a C ordered `np.memmap` of an entire file region. These can be reopened by the worker
+    processes. Slices of a memmap don't record their position in the file so they are copied like any other array."""
+    return (
+        isinstance(images, np.memmap)
+        and isinstance(images.base, mmap.mmap)
+        and images.filename is not None
+        and images.flags.c_contiguous
+    )
+
+
+def segmentStack(
+    images: typing.Union[np.ndarray, typing.Iterable[np.ndarray]],
+    method: typing.Union[str, typing.Callable[..., typing.List[shapely.geometry.Polygon]]] = "adaptive",
+    params: typing.Optional[typing.Dict[str, typing.Any]] = None,
+    workers: typing.Optional[int] = None,
+    progress: typing.Optional[typing.Callable[[int, typing.Optional[int]], None]] = None,
+) -> typing.Iterator[typing.List[shapely.geometry.Polygon]]:
+    """Segment every frame of a stack of images in a pool of processes. The polygons for each frame are yielded in order
+    as soon as they are ready so that the results of a long stack can be processed (or saved) while the rest of it is
+    still being segmented.
+
+    Frames are passed to the worker processes through shared memory rather than being pickled. An `np.memmap` is opened
+    directly by each worker so its frames are only ever read from the file by the process that segments them.
+
+    Since the worker processes are started with the "spawn" method, scripts that call this function must protect their
+    entry point with `if __name__ == "__main__":`.
+
+    Args:
+        images: A 3d array (or `np.memmap`) with frames along the first axis, or any iterable of 2d arrays. Iterables are
+            only consumed as fast as the frames are segmented.
+        method: The name of one of the segmentation functions ("adaptive" for `segmentAdaptive`, "watershed" for
+            `segmentWatershed` or "otsu" for `segmentOtsu`) or any other function that takes a 2d array and returns a
+            list of polygons. Functions must be defined at module level so that they can be pickled.
+        params: Keyword arguments passed to the segmentation function along with each frame.
+        workers: The number of processes to use. Defaults to the number of CPUs. If this is 1 then the frames are
+            segmented in the calling process.
+        progress: Called as `progress(completed, total)` each time a frame's polygons are yielded. `total` is `None` if
+            the length of `images` isn't known.
+
+    Returns:
+        An iterator of lists of `shapely.geometry.Polygon`, one list per frame.
+    """
+    func = Methods[method] if isinstance(method, str) else method
+    params = dict(params or {})
+    total = len(images) if hasattr(images, "__len__") else None
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers <= 1:
+        for i, frame in enumerate(images):
+            polys = func(np.asarray(frame), **params)
+            if progress is not None:
+                progress(i + 1, total)
+            yield polys
+        return
+    if func is segmentAdaptive:
+        params.setdefault("workers", 1)  # Each process gets a CPU to itself, don't also threshold tiles in parallel.
+    yield from _segmentParallel(images, func, params, workers, total, progress)
+
+
+def _segmentParallel(
+    images: typing.Union[np.ndarray, typing.Iterable[np.ndarray]],
+    func: typing.Callable,
+    params: dict,
+    workers: int,
+    total: typing.Optional[int],
+    progress: typing.Optional[typing.Callable[[int, typing.Optional[int]], None]],
+) -> typing.Iterator[typing.List[shapely.geometry.Polygon]]:
+    maxPending = 2 * workers  # Enough that the workers never wait for a frame, few enough to bound the memory used.
+    slots: typing.List[shared_memory.SharedMemory] = []  # Every shared memory block that we've created.
+    freeSlots: typing.List[shared_memory.SharedMemory] = []
+    pending: typing.Deque[typing.Tuple[Future, typing.Optional[shared_memory.SharedMemory]]] = collections.deque()
+
+    def stage(i: int, frame) -> typing.Tuple[_FrameRef, typing.Optional[shared_memory.SharedMemory]]:
+        if _isWholeMemmap(images):
+            return _FrameRef(images.filename, images.shape, images.dtype.str, images.offset, i), None
+        frame = np.asarray(frame)
+        slot = freeSlots.pop() if freeSlots else None
+        if slot is None or slot.size < frame.nbytes:
+            if slot is not None:
+                slots.remove(slot)
+                slot.close()
+                slot.unlink()
+            slot = shared_memory.SharedMemory(create=True, size=max(frame.nbytes, 1))
+            slots.append(slot)
+        np.ndarray(frame.shape, dtype=frame.dtype, buffer=slot.buf)[...] = frame
+        return _FrameRef(slot.name, frame.shape, frame.dtype.str), slot
+
+    frames = enumerate(range(len(images)) if _isWholeMemmap(images) else images)
+    pool = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+    try:
+        exhausted = False
+        completed = 0
+        while True:
+            while not exhausted and len(pending) < maxPending:
+                try:
+                    i, frame = next(frames)
+                except StopIteration:
+                    exhausted = True
+                    break
+                ref, slot = stage(i, frame)
+                pending.append((pool.submit(_segmentFrame, func, params, ref), slot))
+            if not pending:
+                return
+            future, slot = pending.popleft()
+            polys = future.result()
+            if slot is not None:
+                freeSlots.append(slot)
+            completed += 1
+            if progress is not None:
+                progress(completed, total)
+            yield polys
+    finally:
+        # Wait for any frames that are still being segmented before their shared memory is released.
+        pool.shutdown(wait=True, cancel_futures=True)
+        for slot in slots:
+            slot.close()
+            slot.unlink()
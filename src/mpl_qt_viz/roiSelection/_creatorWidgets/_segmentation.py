@@ -26,23 +26,153 @@ Functions
    segmentOtsu
    segmentAdaptive
    segmentWatershed
+   adaptiveThresholdTiled
    updateFolderStructure
 
+Classes
+---------
+.. autosummary::
+   :toctree: generated/
+
+   AdaptiveSegmenter
+   WatershedSegmenter
+   EightBitNormalizer
+
 """
 
+import hashlib
+import logging
+import os
+import time
 import typing
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 from typing import List
 from skimage import morphology, measure, segmentation
 import cv2
 import numpy as np
 import shapely
-from shapely.geometry import MultiPolygon
 import scipy.ndimage as ndim
 
 
+class EightBitNormalizer:
+    """Converts images to 8 bit, scaling the data so that the `lowPercentile` maps to 0 and the `highPercentile` maps to
+    255. The result is identical to the original `numpy.percentile` based implementation but much faster:
+
+    - 8 and 16 bit unsigned images are scanned once to build a histogram, percentiles are found from the cumulative
+      counts and the conversion is a lookup table.
+    - Other images find both percentiles with a single partial sort and are converted in place.
+    - The percentiles found for an image can be cached by passing a `key` that identifies the image data.
+
+    Args:
+        lowPercentile: The percentile of the data that maps to 0.
+        highPercentile: The percentile of the data that maps to 255.
+        cacheSize: The number of images whose percentiles are cached.
+    """
+
+    _HIST_CHUNK = 2**24  # calcHist counts in float32, which is only exact up to 2**24.
+
+    def __init__(
+        self, lowPercentile: float = 0.1, highPercentile: float = 99.9, cacheSize: int = 16
+    ):
+        self.lowPercentile = lowPercentile
+        self.highPercentile = highPercentile
+        self.cacheSize = cacheSize
+        self._cache: typing.OrderedDict[typing.Hashable, typing.Tuple[float, float]] = OrderedDict()
+
+    def __call__(self, arr: np.ndarray, key: typing.Optional[typing.Hashable] = None) -> np.ndarray:
+        """Convert `arr` to 8 bit.
+
+        Args:
+            arr: The input array.
+            key: Identifies the data of `arr`. If given then the percentiles are cached under this key. It must change
+                whenever the data does.
+
+        Returns:
+            The output array of dtype numpy.uint8
+        """
+        arr = np.asarray(arr)
+        if arr.dtype == bool:
+            return arr.astype(np.uint8) * 255
+        if arr.dtype in (np.uint8, np.uint16):
+            hist = None
+            cached = self._cache.get(key) if key is not None else None
+            if cached is None:
+                hist = self._histogram(arr)
+            Min, Max = self._percentiles(arr, key, hist)
+            lut = self._convert(np.arange(np.iinfo(arr.dtype).max + 1, dtype=float), Min, Max)
+            return lut[arr]
+        else:
+            Min, Max = self._percentiles(arr, key)
+            return self._convert(arr, Min, Max)
+
+    def _percentiles(
+        self, arr: np.ndarray, key: typing.Optional[typing.Hashable], hist: typing.Optional[np.ndarray] = None
+    ) -> typing.Tuple[float, float]:
+        """Return the low percentile and the difference between the high and low percentiles."""
+        if key is not None and key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        n = arr.size
+        indices = [self._virtualIndex(n, q) for q in (self.lowPercentile, self.highPercentile)]
+        ranks = sorted({rank for i, _ in indices for rank in (i, min(i + 1, n - 1))})
+        if hist is not None:
+            cumulative = np.cumsum(hist)
+            stats = np.searchsorted(cumulative, ranks, side="right").astype(float)
+        else:
+            flat = arr.ravel()
+            stats = np.partition(flat, ranks)[ranks].astype(float)
+        stat = dict(zip(ranks, stats))
+        (lowIdx, lowGamma), (highIdx, highGamma) = indices
+        Min = self._lerp(stat[lowIdx], stat[min(lowIdx + 1, n - 1)], lowGamma)
+        # The original implementation found the high percentile after subtracting `Min` from the data.
+        Max = self._lerp(
+            stat[highIdx] - Min, stat[min(highIdx + 1, n - 1)] - Min, highGamma
+        )
+        if key is not None:
+            self._cache[key] = (Min, Max)
+            while len(self._cache) > self.cacheSize:
+                self._cache.popitem(last=False)
+        return Min, Max
+
+    @staticmethod
+    def _virtualIndex(n: int, q: float) -> typing.Tuple[int, float]:
+        """The same as the 'linear' method of `numpy.percentile`."""
+        index = (n - 1) * (q / 100)
+        prev = int(np.floor(index))
+        return prev, index - prev
+
+    @staticmethod
+    def _lerp(a: float, b: float, t: float) -> float:
+        """The same interpolation as `numpy.percentile`."""
+        diff = b - a
+        return b - diff * (1 - t) if t >= 0.5 else a + diff * t
+
+    @classmethod
+    def _histogram(cls, arr: np.ndarray) -> np.ndarray:
+        bins = np.iinfo(arr.dtype).max + 1
+        flat = arr.reshape(-1, 1) if arr.flags.c_contiguous else arr.ravel().reshape(-1, 1)
+        hist = np.zeros(bins, dtype=np.int64)
+        for start in range(0, flat.shape[0], cls._HIST_CHUNK):
+            chunk = flat[start : start + cls._HIST_CHUNK]
+            hist += cv2.calcHist([chunk], [0], None, [bins], [0, bins]).ravel().astype(np.int64)
+        return hist
+
+    @staticmethod
+    def _convert(arr: np.ndarray, Min: float, Max: float) -> np.ndarray:
+        out = np.subtract(arr, Min, dtype=float)
+        np.divide(out, Max, out=out)
+        np.multiply(out, 255, out=out)
+        np.clip(out, 0, 255, out=out)
+        return out.astype(np.uint8)
+
+
+_normalizer = EightBitNormalizer()
+
+
 def to8bit(arr: np.ndarray) -> np.ndarray:
     """Converts boolean or float type numpy arrays to 8bit and scales the data to span from 0 to 255. Used for many
-    OpenCV functions.
+    OpenCV functions. See `EightBitNormalizer`.
 
     Args:
         arr: The input array
@@ -50,17 +180,7 @@ def to8bit(arr: np.ndarray) -> np.ndarray:
     Returns:
         The output array of dtype numpy.uint8
     """
-    if arr.dtype == bool:
-        arr = arr.astype(np.uint8) * 255
-    else:
-        arr = arr.astype(float)  # This solves problems if the array is int16 type
-        Min = np.percentile(arr, 0.1)
-        arr -= Min
-        Max = np.percentile(arr, 99.9)
-        arr = arr / Max * 255
-        arr[arr < 0] = 0
-        arr[arr > 255] = 255
-    return arr.astype(np.uint8)
+    return _normalizer(arr)
 
 
 def segmentOtsu(image: np.ndarray, minArea=100) -> List[shapely.geometry.Polygon]:
@@ -77,59 +197,110 @@ def segmentOtsu(image: np.ndarray, minArea=100) -> List[shapely.geometry.Polygon
     image = to8bit(image)  # convert to 8bit
     threshold, binary = cv2.threshold(image, 0, 1, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
     polys = _binaryToPoly(binary)
-    newPolys = []
-    for p in polys:
-        newPolys += _processPoly(
-            p, erode=0, dilate=0, polySimplification=2, minArea=minArea
-        )
-    return newPolys
+    return _processPolys(polys, erode=0, dilate=0, polySimplification=2, minArea=minArea)
 
 
 def _binaryToPoly(binary: np.ndarray) -> typing.List[shapely.geometry.Polygon]:
-    binary = to8bit(binary)
+    if binary.dtype == bool:
+        binary = binary.view(np.uint8)
+    elif binary.dtype != np.uint8:  # `findContours` only cares whether pixels are 0, a mask doesn't need rescaling.
+        binary = to8bit(binary)
     contours, hierarchy = cv2.findContours(
         binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE
     )
-    polys = []
-    for contour in contours:
-        contour = contour.squeeze()  # We want a Nx2 array. We get Nx1x2 though.
-        if (
-            len(contour.shape) != 2
-        ):  # Sometimes contour is 1x1x2 which squezes down to just 2
-            continue
-        if contour.shape[0] < 3:  # We need a polygon, not a line
-            continue
-        p = shapely.geometry.Polygon(contour)
-        polys.append(p)
-    return polys
+    contours = [c for c in contours if len(c) >= 3]  # We need a polygon, not a line
+    if len(contours) == 0:
+        return []
+    # Build every polygon at once from a single flat array of coordinates.
+    coords = np.concatenate(contours).reshape(-1, 2)  # Each contour is Nx1x2
+    ringIndex = np.repeat(np.arange(len(contours)), [len(c) for c in contours])
+    return list(shapely.polygons(shapely.linearrings(coords, indices=ringIndex)))
 
 
-def _processPoly(
-    p: shapely.geometry.Polygon,
+def _processPolys(
+    polys: typing.Sequence[shapely.geometry.Polygon],
     erode: int = 0,
     dilate: int = 0,
     polySimplification: int = 5,
     minArea: int = 100,
-):
+) -> typing.List[shapely.geometry.Polygon]:
+    return _simplifyFilter(_erodeDilate(polys, erode, dilate), polySimplification, minArea)
+
+
+def _erodeDilate(
+    polys: typing.Sequence[shapely.geometry.Polygon], erode: int = 0, dilate: int = 0
+) -> np.ndarray:
+    """Returns an array of polygons. Erosion can split a polygon into a multipolygon, each of its parts is kept as a
+    separate polygon."""
+    polys = np.asarray(polys, dtype=object)
+    # `quad_segs` is the default of the `buffer` method, but not of the `shapely.buffer` function.
     if erode != 0:
-        p = p.buffer(-erode)
-    if not isinstance(
-        p, MultiPolygon
-    ):  # there is a chance for this to split a polygon into a multipolygon. we iterate over each new polygon. If it's still just a polygon put it in a list so it can be iterated over wit the same syntax
-        p = [p]
-    polys = []
-    for poly in p:
-        if dilate != 0:
-            poly = poly.buffer(dilate)  # This is an erode followed by a dilate.
-        poly = poly.simplify(
-            polySimplification, preserve_topology=False
-        )  # This removed unneed points to lessen the saving/loading burden
-        if poly.area < minArea:
-            continue
-        polys.append(poly)
+        polys = shapely.buffer(polys, -erode, quad_segs=16)
+    polys = shapely.get_parts(polys)
+    if dilate != 0:
+        polys = shapely.buffer(polys, dilate, quad_segs=16)  # This is an erode followed by a dilate.
     return polys
 
 
+def _simplifyFilter(
+    polys: typing.Sequence[shapely.geometry.Polygon], polySimplification: int = 5, minArea: int = 100
+) -> typing.List[shapely.geometry.Polygon]:
+    polys = shapely.simplify(
+        np.asarray(polys, dtype=object), polySimplification, preserve_topology=False
+    )  # This removed unneed points to lessen the saving/loading burden
+    return list(polys[shapely.area(polys) >= minArea])
+
+
+def adaptiveThresholdTiled(
+    image: np.ndarray,
+    blockSize: int,
+    offset: float,
+    tileSize: typing.Optional[int] = 4096,
+    workers: typing.Optional[int] = None,
+) -> np.ndarray:
+    """Equivalent to `cv2.adaptiveThreshold(image, 1, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, blockSize, offset)`
+    but the image is divided into tiles that are thresholded in parallel. Each tile is extended by a halo of
+    `blockSize // 2` pixels, the radius of the gaussian window, so the result is identical to thresholding the whole
+    image at once.
+
+    Args:
+        image: A 2d 8-bit image.
+        blockSize: The size of the gaussian window. Must be odd.
+        offset: Subtracted from the gaussian weighted mean to get the threshold of each pixel.
+        tileSize: The size of the square tiles, not including the halo. If `None`, or if the halo would be larger than the
+            tile, then the image is thresholded in a single call.
+        workers: The number of threads to use. Defaults to the number of CPUs. OpenCV releases the GIL so threads run in
+            parallel.
+
+    Returns:
+        A binary `numpy.uint8` array of the same shape as `image`.
+    """
+    halo = blockSize // 2
+    h, w = image.shape
+    if tileSize is None or halo > tileSize or (h <= tileSize and w <= tileSize):
+        return cv2.adaptiveThreshold(
+            image, 1, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, blockSize, offset
+        )
+    binary = np.empty((h, w), dtype=np.uint8)
+
+    def thresholdTile(r0: int, c0: int):
+        r1, c1 = min(r0 + tileSize, h), min(c0 + tileSize, w)
+        hr0, hc0 = max(r0 - halo, 0), max(c0 - halo, 0)
+        tile = np.ascontiguousarray(
+            image[hr0 : min(r1 + halo, h), hc0 : min(c1 + halo, w)]
+        )
+        tile = cv2.adaptiveThreshold(
+            tile, 1, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, blockSize, offset
+        )
+        binary[r0:r1, c0:c1] = tile[r0 - hr0 : r1 - hr0, c0 - hc0 : c1 - hc0]
+
+    corners = [(r, c) for r in range(0, h, tileSize) for c in range(0, w, tileSize)]
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        for future in [executor.submit(thresholdTile, r, c) for r, c in corners]:
+            future.result()  # Raise any exception from the workers.
+    return binary
+
+
 def segmentAdaptive(
     image: np.ndarray,
     minArea: int = 100,
@@ -138,6 +309,8 @@ def segmentAdaptive(
     polySimplification: int = 5,
     dilate: int = 0,
     erode: int = 0,
+    tileSize: typing.Optional[int] = 4096,
+    workers: typing.Optional[int] = None,
 ) -> List[shapely.geometry.Polygon]:
     """Uses opencv's `cv2.adaptiveThreshold` function to segment nuclei in a fluorescence image.
 
@@ -151,26 +324,23 @@ def segmentAdaptive(
         dilate: The number of pixels that the polygons should be dilated by.
         erode: The number of pixels that the polygons should be eroded by. Combining this with dilation can help to
             close gaps.
+        tileSize: Large images are thresholded in tiles of this size in parallel. See `adaptiveThresholdTiled`. The
+            result doesn't depend on the tiling.
+        workers: The number of threads used for tiled thresholding. Defaults to the number of CPUs.
 
     Returns:
         A list of `shapely.geometry.Polygon` objects corresponding to detected nuclei.
     """
-    if adaptiveRange % 2 != 1 or adaptiveRange < 3:
-        raise ValueError("adaptiveRange must be a positive odd integer >=3.")
-    image = to8bit(image)  # convert to 8bit
-    binary = cv2.adaptiveThreshold(
+    return AdaptiveSegmenter(tileSize, workers)(
         image,
-        1,
-        cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-        cv2.THRESH_BINARY,
+        minArea,
         adaptiveRange,
         thresholdOffset,
+        polySimplification,
+        dilate,
+        erode,
+        imageKey=id(image),
     )
-    polys = _binaryToPoly(binary)
-    newPolys = []
-    for i, p in enumerate(polys):
-        newPolys += _processPoly(p, erode, dilate, polySimplification, minArea)
-    return newPolys
 
 
 def segmentWatershed(
@@ -178,6 +348,8 @@ def segmentWatershed(
     closingRadius: int = 2,
     openingRadius: int = 2,
     minimumArea: int = 2000,
+    hMinimaDepth: float = 20,
+    distanceMetric: str = "euclidean",
 ):
     """
     Use watershed with otsu thresholding to segment bright sections of an image. Does a good job of keeping adaject nuclei separate.
@@ -187,32 +359,233 @@ def segmentWatershed(
         closingRadius: The kernel radius to be used for a binary closing operation that eliminated small empty regions of the segmentation mask
         openingRadius: The kernel radius to be used for a binary opening operation that eliminated small filled regions of the segmentation mask
         minimumArea: Polygons below this area (in pixels) will not be returned.
+        hMinimaDepth: How far (in pixels) the distance from the edge of the mask must drop between two peaks for them to
+            be separated into different regions. Lower values split touching nuclei more readily.
+        distanceMetric: How the distance from the edge of the mask is measured. "euclidean" uses an exact Euclidean
+            distance transform. "taxicab" and "chessboard" use a faster chamfer distance transform with that metric.
     """
-    image = to8bit(image)
-    threshold, binary = cv2.threshold(
-        image, 0, 1, cv2.THRESH_BINARY | cv2.THRESH_OTSU
-    )  # TODO switch to adaptive?
-    binary = morphology.binary_opening(binary, morphology.disk(openingRadius))
-    binary = morphology.binary_closing(binary, morphology.disk(closingRadius))
-
-    # Remove objects smaller than 2000 pixels
-    labeled = measure.label(binary)
-    props = measure.regionprops(labeled)
-    for regionProp in props:
-        if regionProp.area < minimumArea:
-            binary[labeled == regionProp.label] = 0
-    # Invert the mask and compute the Euclidean distance
-    # transform
-    disttrans = -ndim.distance_transform_edt(
-        binary
-    )  # The distance from the edge of the segmented nuclei.
-    hmin = morphology.extrema.h_minima(
-        disttrans, 20
-    )  # Should be a tiny true region at the center of each nuclei
-
-    d = disttrans.astype(int)
-    d = d - d.min()
-    ws = segmentation.watershed(d, markers=measure.label(hmin), mask=binary)
-    # ws = segmentation.clear_border(ws)  # Clear incomplete nuclei on the border.
-    polys = _binaryToPoly(ws)
-    return polys
+    return WatershedSegmenter()(
+        image,
+        closingRadius,
+        openingRadius,
+        minimumArea,
+        hMinimaDepth,
+        distanceMetric=distanceMetric,
+        imageKey=id(image),
+    )
+
+
+class _StagedSegmenter:
+    """Base class for segmentation pipelines that are broken into stages. The output of each stage is kept along with a
+    key made from the image identity and every parameter that the stage (or any stage before it) depends on. When
+    the pipeline is run again only the stages whose key has changed are recomputed, so adjusting a parameter of a late,
+    cheap stage doesn't repeat the expensive early ones. Stage outputs are shared between runs and must not be modified.
+
+    Attributes:
+        timings (dict): The time in seconds that each stage took the last time it was computed, by stage name.
+    """
+
+    def __init__(self):
+        self._stages: typing.Dict[str, typing.Tuple[tuple, typing.Any]] = {}
+        self.timings: typing.Dict[str, float] = {}
+        self._normalizer = EightBitNormalizer()  # Keys are only unique to this instance so it has its own cache.
+
+    def clear(self):
+        """Forget the cached output of every stage."""
+        self._stages.clear()
+
+    @staticmethod
+    def _imageKey(image: np.ndarray) -> typing.Hashable:
+        """Identify an image by its contents. Used when the caller doesn't supply a key."""
+        image = np.ascontiguousarray(image)
+        digest = hashlib.blake2b(image.view(np.uint8).data, digest_size=16).hexdigest()
+        return image.shape, image.dtype.str, digest
+
+    def _stage(self, name: str, key: tuple, func: typing.Callable, *args):
+        """Return the output of stage `name`, only calling `func(*args)` if it wasn't cached for the same `key`."""
+        cached = self._stages.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        start = time.perf_counter()
+        value = func(*args)
+        self.timings[name] = time.perf_counter() - start
+        logging.getLogger(__name__).debug(
+            f"{type(self).__name__} stage '{name}' took {self.timings[name]:.3f} s"
+        )
+        self._stages[name] = (key, value)
+        return value
+
+
+class AdaptiveSegmenter(_StagedSegmenter):
+    """The same segmentation as `segmentAdaptive` but the output of each stage is cached. The stages are:
+
+    1. Conversion to 8 bit. Depends on the image.
+    2. `cv2.adaptiveThreshold` and contour detection. Depends on `adaptiveRange` and `thresholdOffset`.
+    3. Erosion and dilation of the polygons. Depends on `erode` and `dilate`.
+    4. Simplification and area filtering. Depends on `polySimplification` and `minArea`.
+
+    Calling an instance repeatedly with the same image only recomputes the stages downstream of whichever parameter
+    changed.
+
+    Args:
+        tileSize: Large images are thresholded in tiles of this size in parallel. See `adaptiveThresholdTiled`.
+        workers: The number of threads used for tiled thresholding. Defaults to the number of CPUs.
+    """
+
+    def __init__(
+        self, tileSize: typing.Optional[int] = 4096, workers: typing.Optional[int] = None
+    ):
+        super().__init__()
+        self.tileSize = tileSize
+        self.workers = workers
+
+    def __call__(
+        self,
+        image: np.ndarray,
+        minArea: int = 100,
+        adaptiveRange: int = 500,
+        thresholdOffset: float = -10,
+        polySimplification: int = 5,
+        dilate: int = 0,
+        erode: int = 0,
+        imageKey: typing.Optional[typing.Hashable] = None,
+    ) -> List[shapely.geometry.Polygon]:
+        """Run the segmentation. See `segmentAdaptive` for a description of the parameters.
+
+        Args:
+            imageKey: Identifies the image. The cached stages are reused as long as this doesn't change so it must change
+                whenever the image data does. If `None` then a hash of the image data is used.
+
+        Returns:
+            A list of `shapely.geometry.Polygon` objects corresponding to detected nuclei.
+        """
+        if adaptiveRange % 2 != 1 or adaptiveRange < 3:
+            raise ValueError("adaptiveRange must be a positive odd integer >=3.")
+        key = (self._imageKey(image) if imageKey is None else imageKey,)
+        image8 = self._stage("8bit", key, self._normalizer, image, key[0])
+        key += (adaptiveRange, thresholdOffset)
+        polys = self._stage("threshold", key, self._threshold, image8, adaptiveRange, thresholdOffset)
+        key += (erode, dilate)
+        polys = self._stage("morphology", key, self._morphology, polys, erode, dilate)
+        key += (polySimplification, minArea)
+        return self._stage("filter", key, self._filter, polys, polySimplification, minArea)
+
+    def _threshold(self, image: np.ndarray, adaptiveRange: int, thresholdOffset: float) -> List[shapely.geometry.Polygon]:
+        binary = adaptiveThresholdTiled(
+            image, adaptiveRange, thresholdOffset, self.tileSize, self.workers
+        )
+        return _binaryToPoly(binary)
+
+    @staticmethod
+    def _morphology(polys: List[shapely.geometry.Polygon], erode: int, dilate: int) -> np.ndarray:
+        return _erodeDilate(polys, erode, dilate)
+
+    @staticmethod
+    def _filter(
+        polys: typing.Sequence[shapely.geometry.Polygon], polySimplification: int, minArea: int
+    ) -> List[shapely.geometry.Polygon]:
+        return _simplifyFilter(polys, polySimplification, minArea)
+
+
+class WatershedSegmenter(_StagedSegmenter):
+    """The same segmentation as `segmentWatershed` but the output of each stage is cached. The stages are:
+
+    1. Conversion to 8 bit. Depends on the image.
+    2. Otsu thresholding.
+    3. Binary opening. Depends on `openingRadius`.
+    4. Binary closing. Depends on `closingRadius`.
+    5. Removal of small objects. Depends on `minimumArea`.
+    6. Distance transform. Depends on `distanceMetric`.
+    7. Detection of a marker at the center of each object with `h_minima`. Depends on `hMinimaDepth`.
+    8. The watershed itself and conversion to polygons.
+
+    Calling an instance repeatedly with the same image only recomputes the stages downstream of whichever parameter
+    changed.
+    """
+
+    _distanceMetrics = ("euclidean", "taxicab", "chessboard")
+
+    def __call__(
+        self,
+        image: np.ndarray,
+        closingRadius: int = 2,
+        openingRadius: int = 2,
+        minimumArea: int = 2000,
+        hMinimaDepth: float = 20,
+        distanceMetric: str = "euclidean",
+        imageKey: typing.Optional[typing.Hashable] = None,
+    ) -> List[shapely.geometry.Polygon]:
+        """Run the segmentation. See `segmentWatershed` for a description of the parameters.
+
+        Args:
+            imageKey: Identifies the image. The cached stages are reused as long as this doesn't change so it must change
+                whenever the image data does. If `None` then a hash of the image data is used.
+
+        Returns:
+            A list of `shapely.geometry.Polygon` objects.
+        """
+        if distanceMetric not in self._distanceMetrics:
+            raise ValueError(f"distanceMetric must be one of {self._distanceMetrics}, not '{distanceMetric}'.")
+        key = (self._imageKey(image) if imageKey is None else imageKey,)
+        image8 = self._stage("8bit", key, self._normalizer, image, key[0])
+        binary = self._stage("threshold", key, self._threshold, image8)
+        key += (openingRadius,)
+        binary = self._stage("opening", key, self._opening, binary, openingRadius)
+        key += (closingRadius,)
+        binary = self._stage("closing", key, self._closing, binary, closingRadius)
+        key += (minimumArea,)
+        binary = self._stage("smallObjects", key, self._removeSmallObjects, binary, minimumArea)
+        key += (distanceMetric,)
+        distance = self._stage("distance", key, self._distance, binary, distanceMetric)
+        key += (hMinimaDepth,)
+        markers = self._stage("markers", key, self._markers, distance, hMinimaDepth)
+        return self._stage("watershed", key, self._watershed, binary, distance, markers)
+
+    @staticmethod
+    def _threshold(image: np.ndarray) -> np.ndarray:
+        threshold, binary = cv2.threshold(
+            image, 0, 1, cv2.THRESH_BINARY | cv2.THRESH_OTSU
+        )  # TODO switch to adaptive?
+        return binary
+
+    @staticmethod
+    def _opening(binary: np.ndarray, openingRadius: int) -> np.ndarray:
+        return morphology.binary_opening(binary, morphology.disk(openingRadius))
+
+    @staticmethod
+    def _closing(binary: np.ndarray, closingRadius: int) -> np.ndarray:
+        return morphology.binary_closing(binary, morphology.disk(closingRadius))
+
+    @staticmethod
+    def _removeSmallObjects(binary: np.ndarray, minimumArea: int) -> np.ndarray:
+        # Count the pixels of every object at once and use the counts as a lookup table, this takes a single pass over
+        # the image no matter how many objects there are.
+        labeled = measure.label(binary)
+        keep = np.bincount(labeled.ravel()) >= minimumArea
+        keep[0] = False  # The background
+        return keep[labeled]
+
+    @staticmethod
+    def _distance(binary: np.ndarray, distanceMetric: str) -> np.ndarray:
+        # The negative distance from the edge of the segmented nuclei, so that their centers are minima.
+        if distanceMetric == "euclidean":
+            return -ndim.distance_transform_edt(binary)
+        return -ndim.distance_transform_cdt(binary, metric=distanceMetric).astype(float)
+
+    @staticmethod
+    def _markers(distance: np.ndarray, hMinimaDepth: float) -> np.ndarray:
+        hmin = morphology.extrema.h_minima(
+            distance, hMinimaDepth
+        )  # Should be a tiny true region at the center of each nuclei
+        return measure.label(hmin)
+
+    @staticmethod
+    def _watershed(
+        binary: np.ndarray, distance: np.ndarray, markers: np.ndarray
+    ) -> List[shapely.geometry.Polygon]:
+        d = distance.astype(int)
+        d = d - d.min()
+        ws = segmentation.watershed(d, markers=markers, mask=binary)
+        # ws = segmentation.clear_border(ws)  # Clear incomplete nuclei on the border.
+        polys = _binaryToPoly(ws)
+        return polys
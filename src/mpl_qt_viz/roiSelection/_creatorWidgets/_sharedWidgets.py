@@ -8,7 +8,7 @@ class LabeledSlider(QWidget):
     def __init__(self, Min, Max, Step, Value, parent=None):
         super().__init__(parent)
         self.display = QLabel(self)
-        self.slider = QSlider(QtCore.Qt.Horizontal, self)
+        self.slider = QSlider(QtCore.Qt.Orientation.Horizontal, self)
 
         self.slider.valueChanged.connect(lambda val: self.display.setText(str(val)))
 
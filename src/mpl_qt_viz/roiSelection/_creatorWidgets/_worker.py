@@ -0,0 +1,132 @@
+# Copyright 2018-2021 Nick Anthony, Backman Biophotonics Lab, Northwestern University
+#
+# This file is part of mpl_qt_viz.
+#
+# mpl_qt_viz is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# mpl_qt_viz is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with mpl_qt_viz.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+import typing
+from PyQt6 import QtCore
+
+
+class _JobSignals(QtCore.QObject):
+    """`QRunnable` isn't a `QObject` so the results of a job are delivered through this object. It lives on the GUI
+    thread so the signals are queued to the GUI thread when they are emitted by a job."""
+
+    done = QtCore.pyqtSignal(int, object)  # The generation of the job and its result.
+    failed = QtCore.pyqtSignal(int, object)  # The generation of the job and the exception that it raised.
+
+
+class _Job(QtCore.QRunnable):
+    def __init__(
+        self,
+        generation: int,
+        func: typing.Callable,
+        args: tuple,
+        kwargs: dict,
+        signals: _JobSignals,
+    ):
+        super().__init__()
+        self.generation = generation
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._signals = signals
+
+    def run(self):
+        try:
+            result = self._func(*self._args, **self._kwargs)
+        except Exception as e:
+            self._signals.failed.emit(self.generation, e)
+        else:
+            self._signals.done.emit(self.generation, result)
+
+
+class SegmentationWorker(QtCore.QObject):
+    """Runs segmentation functions on a background thread so that the GUI stays responsive.
+
+    Only the result of the most recent request is ever delivered. If requests are submitted while a segmentation is
+    running then only the latest one is kept and it is started once the running segmentation finishes, the result of
+    the running segmentation is discarded.
+
+    Args:
+        parent: The Qt parent of this object.
+    """
+
+    finished = QtCore.pyqtSignal(object)  # The result of the latest request.
+    failed = QtCore.pyqtSignal(object)  # The exception raised by the latest request.
+    busyChanged = QtCore.pyqtSignal(bool)  # `True` while there is a request whose result hasn't been delivered.
+
+    def __init__(self, parent: typing.Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._signals = _JobSignals(self)
+        self._signals.done.connect(self._jobDone)
+        self._signals.failed.connect(self._jobFailed)
+        self._generation = 0
+        self._running = False
+        self._runningGeneration = 0
+        self._next: typing.Optional[_Job] = None
+
+    @property
+    def busy(self) -> bool:
+        """`True` while there is a request whose result hasn't been delivered yet."""
+        return self._next is not None or (
+            self._running and self._runningGeneration == self._generation
+        )
+
+    def submit(self, func: typing.Callable, *args, **kwargs):
+        """Request that `func(*args, **kwargs)` be run in the background. The result is delivered with the `finished`
+        signal unless another request is submitted first.
+
+        Args:
+            func: The function to run. It must not interact with any Qt or matplotlib objects.
+        """
+        wasBusy = self.busy
+        self._generation += 1
+        self._next = _Job(self._generation, func, args, kwargs, self._signals)
+        if not self._running:
+            self._startNext()
+        if not wasBusy:
+            self.busyChanged.emit(True)
+
+    def cancel(self):
+        """Discard any requests that haven't finished."""
+        wasBusy = self.busy
+        self._generation += 1
+        self._next = None
+        if wasBusy:
+            self.busyChanged.emit(False)
+
+    def _startNext(self):
+        job, self._next = self._next, None
+        self._running = True
+        self._runningGeneration = job.generation
+        self._pool.start(job)
+
+    def _jobDone(self, generation: int, result):
+        self._jobEnded(generation, self.finished, result)
+
+    def _jobFailed(self, generation: int, exception: Exception):
+        self._jobEnded(generation, self.failed, exception)
+
+    def _jobEnded(self, generation: int, signal, value):
+        self._running = False
+        if self._next is not None:  # A newer request is waiting, this result is already out of date.
+            self._startNext()
+            return
+        if generation == self._generation:
+            self.busyChanged.emit(False)
+            signal.emit(value)
@@ -17,6 +17,7 @@
 
 from __future__ import annotations
 import typing
+import numpy as np
 from matplotlib.image import AxesImage
 from matplotlib.patches import Polygon
 from shapely.geometry import Polygon as shapelyPolygon, LinearRing, MultiPolygon
@@ -26,6 +27,45 @@ if typing.TYPE_CHECKING:
     from matplotlib.axes import Axes
 
 
+class _VertexBuffer:
+    """A growable array of the vertices of a closed polygon. Appending a vertex takes amortized constant time. The first
+    vertex is kept repeated after the last one so that `closedArray` can be passed to
+    `matplotlib.patches.Polygon.set_xy` without it making a closed copy.
+
+    Args:
+        capacity: The number of vertices that can be held before the array must grow.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self._data = np.empty((capacity + 1, 2))
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def array(self) -> np.ndarray:
+        """A view of the vertices."""
+        return self._data[: self._size]
+
+    @property
+    def closedArray(self) -> np.ndarray:
+        """A view of the vertices followed by the first vertex again."""
+        return self._data[: self._size + 1]
+
+    def append(self, x: float, y: float):
+        if self._size + 2 > len(self._data):
+            data = np.empty((2 * len(self._data), 2))
+            data[: self._size] = self._data[: self._size]
+            self._data = data
+        self._data[self._size] = (x, y)
+        self._size += 1
+        self._data[self._size] = self._data[0]
+
+    def clear(self):
+        self._size = 0
+
+
 class LassoCreator(CreatorWidgetBase):
     """Allows the user to select a region with freehand drawing.
 
@@ -34,12 +74,18 @@ class LassoCreator(CreatorWidgetBase):
         image: A reference to a matplotlib `AxesImage`. Selectors may use this reference to get information such as data values from the image
             for computer vision related tasks.
         onselect: A callback function that will be called when the selector finishes a selection.
+        minSpacing: The minimum distance, in screen pixels, between consecutive vertices of the drawn path. Mouse events
+            closer than this to the previous vertex are skipped, this keeps the path compact no matter how slowly it is
+            drawn.
     """
 
-    def __init__(self, ax: Axes, image: AxesImage, onselect=None):
+    def __init__(self, ax: Axes, image: AxesImage, onselect=None, minSpacing: float = 2):
         super().__init__(ax, image)
         self.onselect = onselect
-        self.verts = None
+        self.minSpacing = minSpacing
+        self._verts = _VertexBuffer()
+        # The screen position of the last vertex. `None` if we aren't drawing.
+        self._lastPixel: typing.Optional[typing.Tuple[float, float]] = None
         self.polygon = Polygon(
             [[0, 0]], facecolor=(0, 0, 1, 0.1), animated=True, edgecolor=(0, 0, 1, 0.8)
         )
@@ -53,17 +99,21 @@ class LassoCreator(CreatorWidgetBase):
         return "Click and drag to draw a freehand shape."
 
     def reset(self):
-        self.verts = None
+        self._verts.clear()
+        self._lastPixel = None
         self.polygon.set_visible(False)
 
     def _press(self, event):
-        self.verts = [(event.xdata, event.ydata)]
+        self._verts.clear()
+        self._verts.append(event.xdata, event.ydata)
+        self._lastPixel = (event.x, event.y)
 
     def _release(self, event):
         if event.button == 1:  # Left click
-            if (self.verts is not None) and (self.onselect is not None):
+            if (self._lastPixel is not None) and (self.onselect is not None):
+                verts = [tuple(v) for v in self._verts.array.tolist()]
                 try:
-                    polygon = shapelyPolygon(LinearRing(self.verts))
+                    polygon = shapelyPolygon(LinearRing(verts))
                 except ValueError:
                     return  # If the user clicks without dragging there will just be a single coordinate, this will result in an error when trying to convert to a `LinearRing`
                 polygon = polygon.buffer(0)
@@ -72,16 +122,19 @@ class LassoCreator(CreatorWidgetBase):
                     polygon, MultiPolygon
                 ):  # There is a chance for this to be a Multipolygon.
                     polygon = max(
-                        polygon, key=lambda a: a.area
+                        polygon.geoms, key=lambda a: a.area
                     )  # To fix this we extract the largest polygon from the multipolygon
                 handles = polygon.exterior.coords
-                self.onselect(self.verts, handles)
+                self.onselect(verts, handles)
 
     def _ondrag(self, event):
-        if self.verts is None:
+        if self._lastPixel is None:
+            return
+        if np.hypot(event.x - self._lastPixel[0], event.y - self._lastPixel[1]) < self.minSpacing:
             return
-        self.verts.append((event.xdata, event.ydata))
-        self.polygon.set_xy(self.verts)
+        self._verts.append(event.xdata, event.ydata)
+        self._lastPixel = (event.x, event.y)
+        self.polygon.set_xy(self._verts.closedArray)
         self.updateAxes()
 
 
@@ -17,13 +17,14 @@
 
 from __future__ import annotations
 import typing
-from cycler import cycler
 from matplotlib.image import AxesImage
-from matplotlib.patches import Rectangle, Polygon
+from matplotlib.patches import Rectangle
 from shapely.geometry import Polygon as shapelyPolygon, LinearRing, MultiPolygon
 import shapely
 from ._segmentation import segmentOtsu
 from ._base import CreatorWidgetBase
+from ._regionIndex import RegionIndex
+from ._roiOverlay import RoiOverlay
 
 if typing.TYPE_CHECKING:
     from matplotlib.axes import Axes
@@ -46,7 +47,9 @@ class RegionalPaintCreator(CreatorWidgetBase):
         self.onselect = onselect
         self.started = False
         self.selectionTime = False
-        self.contours = []
+        self._overlay = RoiOverlay(self)  # Draws the detected contours.
+        self._regionIndex: typing.Optional[RegionIndex] = None  # Finds the contour under the mouse.
+        self.hoverHighlight = False  # If `True` then the contour that would be selected by a click is highlighted.
         self.box = Rectangle(
             (0, 0),
             0,
@@ -64,8 +67,8 @@ class RegionalPaintCreator(CreatorWidgetBase):
     def reset(self):
         """Reset the state of the selector so it's ready for a new selection."""
         self.started = False
-        [self.removeArtist(i) for i in self.contours]
-        self.contours = []
+        self._overlay.clear()
+        self._regionIndex = None
         self.selectionTime = False
         self.updateAxes()
 
@@ -96,26 +99,8 @@ class RegionalPaintCreator(CreatorWidgetBase):
     def _drawRois(self, polys: typing.List[shapelyPolygon]):
         """Draw ROIs detected by `findContours."""
         if len(polys) > 0:
-            alpha = 0.3
-            colorCycler = cycler(
-                color=[
-                    (1, 0, 0, alpha),
-                    (0, 1, 0, alpha),
-                    (0, 0, 1, alpha),
-                    (1, 1, 0, alpha),
-                    (1, 0, 1, alpha),
-                ]
-            )
-            for poly, color in zip(polys, colorCycler()):
-                if isinstance(
-                    poly, MultiPolygon
-                ):  # There is a chance for this a Multipolygon rather than just a Polygon.
-                    poly = max(
-                        poly, key=lambda a: a.area
-                    )  # To fix this we extract the largest polygon from the multipolygon
-                p = Polygon(poly.exterior.coords, color=color["color"], animated=True)
-                self.addArtist(p)
-                self.contours.append(p)
+            self._regionIndex = RegionIndex(polys)
+            self._overlay.setRegions(polys, self._regionIndex)
             self.updateAxes()
 
     def _press(self, event):
@@ -125,23 +110,35 @@ class RegionalPaintCreator(CreatorWidgetBase):
                 self.box.set_visible(True)
                 self.box.set_xy((event.xdata, event.ydata))
             elif self.selectionTime:
-                coord = (event.xdata, event.ydata)
-                for artist in self.contours:
-                    assert isinstance(artist, Polygon)
-                    if artist.get_path().contains_point(coord):
-                        polygon = shapelyPolygon(LinearRing(artist.xy))
-                        polygon = polygon.simplify(polygon.length / 100, preserve_topology=False)
-                        if isinstance(
-                            polygon, MultiPolygon
-                        ):  # There is a chance for this to convert a Polygon to a Multipolygon.
-                            polygon = max(
-                                polygon, key=lambda a: a.area
-                            )  # To fix this we extract the largest polygon from the multipolygon
-                        handles = polygon.exterior.coords
-                        self.onselect(artist.xy, handles)
-                        break
+                i = self._contourAt(event)
+                if i is not None:
+                    verts = self._overlay.vertices(i)
+                    polygon = shapelyPolygon(LinearRing(verts))
+                    polygon = polygon.simplify(polygon.length / 100, preserve_topology=False)
+                    if isinstance(
+                        polygon, MultiPolygon
+                    ):  # There is a chance for this to convert a Polygon to a Multipolygon.
+                        polygon = max(
+                            polygon.geoms, key=lambda a: a.area
+                        )  # To fix this we extract the largest polygon from the multipolygon
+                    handles = polygon.exterior.coords
+                    self.onselect(verts, handles)
                 self.reset()
 
+    def _onhover(self, event):
+        if (
+            self.hoverHighlight
+            and self.selectionTime
+            and self._overlay.setHighlight(self._contourAt(event))
+        ):
+            self.updateAxes()
+
+    def _contourAt(self, event) -> typing.Optional[int]:
+        """Return the index of the contour under the mouse, or `None`."""
+        if self._regionIndex is None:
+            return None
+        return self._regionIndex.lookup(event.xdata, event.ydata)
+
     def _ondrag(self, event):
         if self.started and event.button == 1:
             x, y = self.box.xy
@@ -0,0 +1,112 @@
+# Copyright 2018-2021 Nick Anthony, Backman Biophotonics Lab, Northwestern University
+#
+# This file is part of mpl_qt_viz.
+#
+# mpl_qt_viz is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# mpl_qt_viz is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with mpl_qt_viz.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+import typing
+import numpy as np
+
+
+class ClosedCatmullRom:
+    """A closed, centripetal Catmull-Rom spline that passes through each of its control points. Unlike a global spline
+    fit each segment of the curve depends only on the four control points around it, so moving one point only changes
+    the four segments next to it. The coefficients of each segment and the sampled curve are cached and only the
+    segments that have changed are recomputed.
+
+    Args:
+        points: The (N, 2) control points. The curve returns from the last point to the first.
+        alpha: 0.5 gives a centripetal spline, which never forms cusps or loops within a segment. 0 gives a uniform and
+            1 a chordal Catmull-Rom spline.
+    """
+
+    def __init__(self, points: np.ndarray, alpha: float = 0.5):
+        self.alpha = alpha
+        self.setPoints(points)
+
+    def __len__(self):
+        return len(self._points)
+
+    @property
+    def points(self) -> np.ndarray:
+        """The (N, 2) control points. Use `setPoints` or `movePoint` rather than modifying these."""
+        return self._points
+
+    def setPoints(self, points: np.ndarray):
+        """Replace all of the control points."""
+        self._points = np.array(points, dtype=float).reshape(-1, 2)
+        self._coeffs = self._coefficients(np.arange(len(self._points)))
+        # The number of samples of each segment, `None` if everything must be resampled.
+        self._counts: typing.Optional[np.ndarray] = None
+        self._offsets = np.zeros(1, dtype=int)
+        self._samples = np.empty((1, 2))
+        self._dirty: typing.Set[int] = set()  # Segments whose coefficients changed since they were sampled.
+
+    def movePoint(self, index: int, xy: typing.Tuple[float, float]):
+        """Move a single control point, only updating the segments that depend on it."""
+        self._points[index] = xy
+        segments = np.array(sorted({(index + i) % len(self._points) for i in range(-2, 2)}))
+        self._coeffs[segments] = self._coefficients(segments)
+        self._dirty.update(segments.tolist())
+
+    def sample(self, counts: np.ndarray) -> np.ndarray:
+        """Return points along the curve.
+
+        Args:
+            counts: The number of points to sample from each segment. Segment `k` runs from control point `k` to `k+1`
+                and is sampled at evenly spaced values of its parameter, starting at control point `k`.
+
+        Returns:
+            An (M + 1, 2) array of points, the first point is repeated at the end so that it can be passed to
+            `matplotlib.patches.Polygon.set_xy` without being copied. The array is reused by later calls so it must be
+            copied if it is kept.
+        """
+        counts = np.maximum(np.asarray(counts, dtype=int), 1)
+        if self._counts is None or not np.array_equal(counts, self._counts):
+            self._counts = counts
+            self._offsets = np.concatenate([[0], np.cumsum(counts)])
+            self._samples = np.empty((self._offsets[-1] + 1, 2))
+            self._evaluate(np.arange(len(counts)))
+        elif self._dirty:
+            self._evaluate(np.array(sorted(self._dirty)))
+        self._dirty.clear()
+        self._samples[-1] = self._samples[0]
+        return self._samples
+
+    def _evaluate(self, segments: np.ndarray):
+        """Write the samples of `segments` into `_samples`."""
+        counts = self._counts[segments]
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        rows = np.repeat(self._offsets[segments], counts) + local
+        t = (local / np.repeat(counts, counts))[:, None]
+        c = self._coeffs[np.repeat(segments, counts)]
+        self._samples[rows] = ((c[:, 3] * t + c[:, 2]) * t + c[:, 1]) * t + c[:, 0]
+
+    def _coefficients(self, segments: np.ndarray) -> np.ndarray:
+        """Return the (len(segments), 4, 2) cubic polynomial coefficients, constant term first, of each segment in
+        terms of a parameter that goes from 0 to 1 along the segment."""
+        p = self._points[(segments[:, None] + np.arange(-1, 3)) % len(self._points)]  # The 4 points around each segment
+        d = np.diff(p, axis=1)
+        spacing = np.hypot(d[..., 0], d[..., 1]) ** self.alpha
+        # Wherever a spacing is 0 the vector being divided by it is also 0.
+        safe = np.where(spacing == 0, 1, spacing)
+        pairs = spacing[:, :2] + spacing[:, 1:]
+        pairs[pairs == 0] = 1
+        v = d / safe[..., None]
+        # The tangents at either end of the segment, scaled to the segment's parameter.
+        m = (v[:, :2] + v[:, 1:] - (d[:, :2] + d[:, 1:]) / pairs[..., None]) * spacing[:, 1, None, None]
+        m1, m2 = m[:, 0], m[:, 1]
+        # Hermite form
+        return np.stack([p[:, 1], m1, 3 * d[:, 1] - 2 * m1 - m2, m1 + m2 - 2 * d[:, 1]], axis=1)
@@ -21,141 +21,34 @@ import typing
 import numpy as np
 from matplotlib.lines import Line2D
 from matplotlib.patches import Polygon
-from scipy import interpolate
 from ._base import ModifierWidgetBase
+from ._spline import ClosedCatmullRom
 
 if typing.TYPE_CHECKING:
     from matplotlib.axes import Axes
 
 
-Vector3 = typing.Tuple[float, float, float]
-Point3 = typing.Tuple[float, float, float]
-
-
-def pnt2line(pnt: Point3, start: Point3, end: Point3) -> typing.Tuple[float, Point3]:
-    """
-    Given a line with coordinates 'start' and 'end' and the
-    coordinates of a point 'pnt' the proc returns the shortest
-    distance from pnt to the line and the coordinates of the
-    nearest point on the line.
-
-    1  Convert the line segment to a vector ('line_vec').
-    2  Create a vector connecting start to pnt ('pnt_vec').
-    3  Find the length of the line vector ('line_len').
-    4  Convert line_vec to a unit vector ('line_unitvec').
-    5  Scale pnt_vec by line_len ('pnt_vec_scaled').
-    6  Get the dot product of line_unitvec and pnt_vec_scaled ('t').
-    7  Ensure t is in the range 0 to 1.
-    8  Use t to get the nearest location on the line to the end
-       of vector pnt_vec_scaled ('nearest').
-    9  Calculate the distance from nearest to pnt_vec_scaled.
-    10 Translate nearest back to the start/end line.
-    Malcolm Kesson 16 Dec 2012
+def pointToSegmentDistances(
+    point: typing.Tuple[float, float], starts: np.ndarray, ends: np.ndarray
+) -> np.ndarray:
+    """Return the shortest distance from a point to each of a set of line segments, all at once.
 
     Args:
-        pnt: A 3d point.
-        start: The 3d point indicating the start of a line segment
-        end: The 3d point indicating the end of a line segment
+        point: A 2d point.
+        starts: An (N, 2) array of the points where each line segment starts.
+        ends: An (N, 2) array of the points where each line segment ends.
 
     Returns:
-        A `tuple` containing:
-            dist: The distance from `pnt` to the nearest point on the line
-            nearest: The nearest point on the line to `pnt`
+        An array of the N distances from `point` to the nearest point of each line segment.
     """
-
-    def dot(v, w):
-        x, y, z = v
-        X, Y, Z = w
-        return x * X + y * Y + z * Z
-
-    def length(v: Vector3) -> float:
-        """
-        Return the length of a 3d vector.
-
-        Args:
-            v: A 3d vector.
-
-        Returns:
-            The length of the vector.
-        """
-        x, y, z = v
-        return math.sqrt(x * x + y * y + z * z)
-
-    def vector(b: Point3, e: Point3) -> Vector3:
-        """
-        Args:
-            b: A 3d point
-            e: Another 3d point
-
-        Returns:
-            A vector giving the difference between `b` and `e`
-        """
-        x, y, z = b
-        X, Y, Z = e
-        return (X - x, Y - y, Z - z)
-
-    def unit(v: Vector3) -> Vector3:
-        """
-        Args:
-            v: A 3d vector.
-
-        Returns:
-            A unit vector with the same orientation as `v`
-        """
-        x, y, z = v
-        mag = length(v)
-        return (x / mag, y / mag, z / mag)
-
-    def distance(p0: Point3, p1: Point3) -> float:
-        """
-        Args:
-            p0: A 3d point
-            p1: Another 3d point
-
-        Returns:
-            The distance between `p0` and `p1`.
-        """
-        return length(vector(p0, p1))
-
-    def scale(v: Vector3, sc: float) -> Vector3:
-        """
-        Args:
-            v: A 3d vector
-            sc: A scalar
-
-        Returns:
-            A vector of `v` * `sc`.
-        """
-        x, y, z = v
-        return (x * sc, y * sc, z * sc)
-
-    def add(v: Vector3, w: Vector3) -> Vector3:
-        """
-        Args:
-            v: A 3d vector
-            w: Another 3d vector
-
-        Returns:
-            The sum of `v` and `w`
-        """
-        x, y, z = v
-        X, Y, Z = w
-        return (x + X, y + Y, z + Z)
-
-    line_vec = vector(start, end)
-    pnt_vec = vector(start, pnt)
-    line_len = length(line_vec)
-    line_unitvec = unit(line_vec)
-    pnt_vec_scaled = scale(pnt_vec, 1.0 / line_len)
-    t = dot(line_unitvec, pnt_vec_scaled)
-    if t < 0.0:
-        t = 0.0
-    elif t > 1.0:
-        t = 1.0
-    nearest = scale(line_vec, t)
-    dist = distance(nearest, pnt_vec)
-    nearest = add(nearest, start)
-    return dist, nearest
+    point = np.asarray(point, dtype=float)
+    lineVec = ends - starts
+    pointVec = point - starts
+    lengthSq = np.einsum("ij,ij->i", lineVec, lineVec)
+    # The position of the nearest point along each segment, from 0 at the start to 1 at the end.
+    t = np.einsum("ij,ij->i", pointVec, lineVec) / np.where(lengthSq == 0, 1, lengthSq)
+    nearest = np.clip(t, 0, 1)[:, None] * lineVec
+    return np.hypot(*(pointVec - nearest).T)
 
 
 class PolygonModifier(ModifierWidgetBase):
@@ -173,9 +66,14 @@ class PolygonModifier(ModifierWidgetBase):
 
     Attributes:
         epsilon: The pixel distance required to detect a mouse-over event.
+        samplePixels: The approximate on-screen spacing, in pixels, of the points sampled from the smooth outline.
+        minSamples: The minimum total number of points sampled from the smooth outline, however small it is on screen.
     """
 
     epsilon: int = 10  # max pixel distance to count as a vertex hit
+    samplePixels: float = 3
+    minSamples: int = 200
+    _maxSegmentSamples: int = 500  # Limits the number of points when zoomed far in.
 
     def __init__(
         self,
@@ -190,6 +88,7 @@ class PolygonModifier(ModifierWidgetBase):
         )
         self._ind = None  # the active vert
         self._hoverInd = None
+        self._spline: typing.Optional[ClosedCatmullRom] = None
         self.poly = Polygon(
             [[0, 0]], animated=True, facecolor=(0, 1, 0, 0.1), edgecolor=(0, 0, 1, 0.9)
         )
@@ -209,33 +108,55 @@ class PolygonModifier(ModifierWidgetBase):
         Args:
             handles: A sequence of 2d coordinates to intialize the polygon to. Each point will become a draggable handle
         """
-        handles = handles[
-            0
-        ]  # We don't support multiple polygons in this widget, just select out the first if multiple are passed.
-        x, y = zip(*handles)
-        self.markers.set_data(x, y)
+        handles = np.asarray(
+            handles[0], dtype=float
+        )  # We don't support multiple polygons in this widget, just select out the first if multiple are passed.
+        if len(handles) > 1 and np.array_equal(handles[0], handles[-1]):
+            handles = handles[:-1]  # The shape is closed by repeating the first point.
+        self._spline = ClosedCatmullRom(handles)
+        self._updateMarkers()
         self._interpolate()
 
+    def _updateMarkers(self):
+        """Set the markers to the control points of the spline, repeating the first point to close the shape."""
+        points = self._spline.points
+        self.markers.set_data(
+            np.append(points[:, 0], points[0, 0]), np.append(points[:, 1], points[0, 1])
+        )
+
     def _interpolate(self):
-        """update the polygon to match the marker vertices with smooth interpolation in between."""
-        x, y = self.markers.get_data()
-        tck, u = interpolate.splprep([x, y], s=0, per=True)
-        # evaluate the spline fits for 1000 evenly spaced distance values
-        xi, yi = interpolate.splev(np.linspace(0, 1, 200), tck)
-        self.poly.set_xy(list(zip(xi, yi)))
+        """update the polygon to match the marker vertices with smooth interpolation in between. Each segment between
+        two markers is sampled according to its length on screen."""
+        points = self._spline.points
+        screen = self.markers.get_transform().transform(points)
+        d = np.diff(screen, axis=0, append=screen[:1])
+        lengths = np.hypot(d[:, 0], d[:, 1])
+        counts = np.clip(
+            np.ceil(lengths / self.samplePixels),
+            math.ceil(self.minSamples / len(points)),
+            self._maxSegmentSamples,
+        )
+        self.poly.set_xy(self._spline.sample(counts))
+
+    def _screenHandles(self) -> np.ndarray:
+        """Return the (N, 2) display coordinates of the markers."""
+        return self.markers.get_transform().transform(
+            np.column_stack(self.markers.get_data())
+        )
 
     def _get_ind_under_point(self, event):
         """get the index of the vertex under point if within epsilon tolerance"""
-        # display coords
-        xy = np.asarray(list(zip(*self.markers.get_data())))
-        xyt = self.markers.get_transform().transform(xy)
-        xt, yt = xyt[:, 0], xyt[:, 1]
-        d = np.hypot(xt - event.x, yt - event.y)
-        (indseq,) = np.nonzero(d == d.min())
-        ind = indseq[0]
-        if d[ind] >= self.epsilon:
-            ind = None
-        return ind
+        xyt = self._screenHandles()  # display coords
+        # Each vertex lies on the edges beside it, so only the ends of the edges within epsilon of the point can be hit.
+        near = np.flatnonzero(
+            pointToSegmentDistances((event.x, event.y), xyt[:-1], xyt[1:]) < self.epsilon
+        )
+        if len(near) == 0:
+            return None
+        candidates = np.union1d(near, near + 1)
+        d = np.hypot(xyt[candidates, 0] - event.x, xyt[candidates, 1] - event.y)
+        i = int(d.argmin())
+        return int(candidates[i]) if d[i] < self.epsilon else None
 
     def _press(self, event):
         """whenever a mouse button is pressed. Set self._ind to the nearest marker index."""
@@ -253,29 +174,22 @@ class PolygonModifier(ModifierWidgetBase):
         """whenever a key is pressed"""
         if event.key == "d":
             ind = self._get_ind_under_point(event)
-            if ind is not None:
-                x, y = self.markers.get_data()
-                self.markers.set_data(np.delete(x, ind), np.delete(y, ind))
+            if ind is not None and len(self._spline) > 3:
+                points = self._spline.points
+                self._spline.setPoints(np.delete(points, ind % len(points), axis=0))
+                self._updateMarkers()
                 self._interpolate()
         elif event.key == "i":
-            xys = list(
-                self.markers.get_transform().transform(
-                    np.array(self.markers.get_data()).T
-                )
-            )
-            p = np.array([event.x, event.y, 0])  # display coords
-            d = []
-            for i in range(len(xys) - 1):
-                s0 = (xys[i][0], xys[i][1], 0)
-                s1 = (xys[i + 1][0], xys[i + 1][1], 0)  # Convert to 3d points.
-                d.append(pnt2line(p, s0, s1)[0])  # distance from line to click point
-            d = np.array(d)
-            i = d.argmin()
-            if d.min() <= (self.epsilon * 5):  # The 5 here was decided arbitrarily
-                x, y = self.markers.get_data()
-                self.markers.set_data(
-                    np.insert(x, i + 1, event.xdata), np.insert(y, i + 1, event.ydata)
+            xys = self._screenHandles()
+            d = pointToSegmentDistances(
+                (event.x, event.y), xys[:-1], xys[1:]
+            )  # distance from each edge to the click point, in display coords
+            i = int(d.argmin())
+            if d[i] <= (self.epsilon * 5):  # The 5 here was decided arbitrarily
+                self._spline.setPoints(
+                    np.insert(self._spline.points, i + 1, (event.xdata, event.ydata), axis=0)
                 )
+                self._updateMarkers()
                 self._interpolate()
         elif event.key == "enter":
             self.onselect([self.poly.xy], [self.markers.get_data()])
@@ -298,20 +212,14 @@ class PolygonModifier(ModifierWidgetBase):
                 self.markers.set_markerfacecolor((0, 0.9, 1, 1))
             else:
                 self.markers.set_markerfacecolor("r")
-        self.updateAxes()
+            self.updateAxes()  # Nothing needs to be redrawn unless the hovered marker changed.
 
     def _ondrag(self, event):
         """on mouse movement move the selected marker with the mouse and interpolate."""
         if self._ind is None:
             return
-        x, y = event.xdata, event.ydata
-        d = list(zip(*self.markers.get_data()))
-        d[self._ind] = (x, y)
-        if self._ind == 0:
-            d[-1] = (x, y)
-        elif self._ind == len(d) - 1:
-            d[0] = (x, y)
-        self.markers.set_data(list(zip(*d)))
-
+        # The last marker is the same point as the first.
+        self._spline.movePoint(self._ind % len(self._spline), (event.xdata, event.ydata))
+        self._updateMarkers()
         self._interpolate()
         self.updateAxes()
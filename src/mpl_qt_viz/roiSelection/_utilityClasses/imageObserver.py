@@ -0,0 +1,77 @@
+# Copyright 2018-2021 Nick Anthony, Backman Biophotonics Lab, Northwestern University
+#
+# This file is part of mpl_qt_viz.
+#
+# mpl_qt_viz is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# mpl_qt_viz is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with mpl_qt_viz.  If not, see <https://www.gnu.org/licenses/>.
+
+
+from __future__ import annotations
+import typing
+from matplotlib import cbook
+
+if typing.TYPE_CHECKING:
+    from matplotlib.image import AxesImage
+
+
+class ImageObserver:
+    """Notifies subscribers whenever the data of a matplotlib `AxesImage` is replaced with `set_data` (or `set_array`).
+    This lets interested objects react to new image data immediately rather than polling the image for changes. Use
+    `ImageObserver.forImage` rather than the constructor so that only one observer is attached to each image.
+
+    Args:
+        image: The image to observe.
+
+    Attributes:
+        version (int): Incremented each time the image data is replaced. Can be used as a cache key for anything computed
+            from the image data.
+    """
+
+    _IMAGE_ATTR = "_mpl_qt_viz_imageObserver"  # When an observer is attached to an `AxesImage` this attribute will be added to the image.
+
+    def __init__(self, image: AxesImage):
+        if hasattr(image, ImageObserver._IMAGE_ATTR):
+            raise ValueError("This image already has an observer. Use `ImageObserver.forImage`.")
+        self.image = image
+        self.version = 0
+        self._callbacks = cbook.CallbackRegistry(signals=["changed"])
+        setattr(image, ImageObserver._IMAGE_ATTR, self)
+        image.set_data = self._setData  # Shadow the method for this instance only.
+
+    @classmethod
+    def forImage(cls, image: AxesImage) -> ImageObserver:
+        """Return the observer of `image`, creating it if needed."""
+        observer = getattr(image, ImageObserver._IMAGE_ATTR, None)
+        return observer if observer is not None else cls(image)
+
+    def subscribe(self, func: typing.Callable[[int], None]) -> int:
+        """Call `func(version)` whenever the image data changes. Only a weak reference is kept to bound methods so
+        subscribing doesn't keep the subscriber alive.
+
+        Returns:
+            An id that can be passed to `unsubscribe`.
+        """
+        return self._callbacks.connect("changed", func)
+
+    def unsubscribe(self, cid: int):
+        """Stop calling a function that was previously subscribed.
+
+        Args:
+            cid: The id returned by `subscribe`.
+        """
+        self._callbacks.disconnect(cid)
+
+    def _setData(self, A):
+        type(self.image).set_data(self.image, A)  # Don't keep a bound method, it would refer back to this wrapper when unpickled.
+        self.version += 1
+        self._callbacks.process("changed", self.version)
@@ -37,6 +37,10 @@ from matplotlib.backends.backend_qt5 import NavigationToolbar2QT, FigureCanvasQT
 import numpy as np
 from mpl_qt_viz.roiSelection import LassoCreator, AdjustableSelector, PointCreator
 from mpl_qt_viz.visualizers._PlotNd._canvas import PlotNdCanvas
+from mpl_qt_viz.visualizers._PlotNd._animation import PlotNdAnimator
+from mpl_qt_viz.visualizers._PlotNd._roi import reduceRoi
+from mpl_qt_viz.visualizers._PlotNd._sources import ArraySource
+from mpl_qt_viz.visualizers._PlotNd._statistics import StatisticsMode
 from mpl_qt_viz.visualizers._sharedWidgets import AnimationDlg, QRangeSlider
 
 
@@ -93,7 +97,8 @@ class PlotNd(QWidget):  # TODO add function and GUI method to set coordinates of
     functionality of `PlotNdCanvas`.
 
     Args:
-        data: A 3D or greater numpy array of numeric values.
+        data: A 3D or greater numpy array of numeric values. Data that doesn't fit in memory can be provided as an
+            `ArraySource` (or an `np.memmap` or `h5py.Dataset`), in that case only the displayed data is read.
         names: A sequence of labels for each axis of the data array.
         initialCoords: An optional sequence of the coordinates to initially se the ND crosshair to. There should be one
             coordinate for each axis of the data array.
@@ -102,9 +107,16 @@ class PlotNd(QWidget):  # TODO add function and GUI method to set coordinates of
         indices: An optional tuple of 1d arrays of values to set as the indexes for each dimension of the data. Elements of the list can be set to `None` to skip
             setting a custom index for that dimension.
         flags: See the `flags` constructor argument for a QWidget. Default value is `Window`
+        statisticsMode: Determines how the data is scanned to choose the initial color limits and the range of the
+            slider. The default approximate mode keeps startup time independent of the size of the data. See
+            `StatisticsMode`. If the data is too large to be scanned completely then the slider extends beyond the
+            scanned range by half of that range on each side, use "exact" mode to limit the slider to the true range of
+            the data.
+        displayPyramid: If `True` the image is displayed at a resolution matching the screen rather than at full
+            resolution. Recommended for very large image planes. See `PlotNdCanvas`.
 
     Attributes:
-        data: A reference to the 3D or greater numpy array. This can be safely modified.
+        data: A reference to the 3D or greater numpy array (or `ArraySource`). This can be safely modified.
     """
 
     _defaultNames = (
@@ -123,13 +135,15 @@ class PlotNd(QWidget):  # TODO add function and GUI method to set coordinates of
 
     def __init__(
         self,
-        data: np.ndarray,
+        data: t_.Union[np.ndarray, ArraySource],
         names: t_.Tuple[str, ...] = None,
         initialCoords: t_.Optional[t_.Tuple[int, ...]] = None,
         title: t_.Optional[str] = "",
         parent: t_.Optional[QWidget] = None,
         indices: t_.Sequence[np.ndarray] = None,
         flags=QtCore.Qt.WindowType.Window,
+        statisticsMode: t_.Union[StatisticsMode, str] = StatisticsMode.APPROXIMATE,
+        displayPyramid: bool = False,
     ):
         super().__init__(parent=parent, flags=flags)
 
@@ -138,17 +152,26 @@ class PlotNd(QWidget):  # TODO add function and GUI method to set coordinates of
         if names is None:
             names = PlotNd._defaultNames[: len(data.shape)]
 
-        if data.dtype == bool:
+        if isinstance(data, np.ndarray) and data.dtype == bool:
             data = data.astype(np.uint8)
 
-        self.canvas = PlotNdCanvas(data, names, initialCoords, indices)
+        self.canvas = PlotNdCanvas(
+            data,
+            names,
+            initialCoords,
+            indices,
+            statisticsMode=statisticsMode,
+            displayPyramid=displayPyramid,
+        )
         self.view = _MyView(self.canvas)
         self.slider = QRangeSlider(self)
         self.slider.setMaximumHeight(20)
-        self.slider.setMax(np.nanmax(data))
-        self.slider.setMin(np.nanmin(data))
-        self.slider.setEnd(np.nanmax(data))
-        self.slider.setStart(np.nanmin(data))
+        Min, Max = self.canvas.statistics.min, self.canvas.statistics.max
+        sliderMin, sliderMax = self._sliderLimits(Min, Max)
+        self.slider.setMax(sliderMax)
+        self.slider.setMin(sliderMin)
+        self.slider.setEnd(Max)
+        self.slider.setStart(Min)
 
         self._sliderDebounceTimer = QTimer()
         self._sliderDebounceTimer.setSingleShot(True)
@@ -219,15 +242,29 @@ class PlotNd(QWidget):  # TODO add function and GUI method to set coordinates of
 
         self.show()
 
-    def _saveAnimation(self):
-        def animationUpdaterFunc(z: int):
-            """Used by the animation saver to iterate through the 3rd dimension of the data."""
-            self.canvas.coords = self.canvas.coords[:2] + (z,) + self.canvas.coords[3:]
-            self.canvas.updatePlots()
+    def closeEvent(self, event: QtGui.QCloseEvent):
+        self.canvas.shutdown()  # Child widgets don't receive a close event of their own.
+        super().closeEvent(event)
+
+    def _sliderLimits(self, Min: float, Max: float) -> t_.Tuple[float, float]:
+        """The range of the color limit slider given the range of the scanned data. If only part of the data was scanned
+        then values outside of that range may exist, the slider is extended by half of the range on each side so that
+        they can still be included. Integer data is never extended past the limits of its dtype."""
+        if self.canvas.statistics.isRangeExact:
+            return Min, Max
+        margin = (Max - Min) / 2 or 1
+        Min, Max = Min - margin, Max + margin
+        dtype = np.dtype(self.canvas.source.dtype)
+        if dtype.kind in "ui":
+            info = np.iinfo(dtype)
+            Min, Max = max(Min, info.min), min(Max, info.max)
+        return Min, Max
 
+    def _saveAnimation(self):
+        # Iterate through the 3rd dimension of the data.
         dlg = AnimationDlg(
             self.canvas.fig,
-            (animationUpdaterFunc, range(self.canvas.data.shape[2])),
+            (PlotNdAnimator(self.canvas, 2), range(self.canvas.source.shape[2])),
             self,
         )
         dlg.exec()
@@ -257,34 +294,33 @@ class PlotNd(QWidget):  # TODO add function and GUI method to set coordinates of
 
         self._lastButton = button
 
+    def reduceRoi(
+        self, verts: np.ndarray, statistics: t_.Sequence[str] = ("mean",)
+    ) -> t_.Dict[str, np.ndarray]:
+        """Reduce the pixels of the data inside a polygonal region of the image. The data is read in chunks so the
+        selected pixels are never all held in memory. See `reduceRoi`.
+
+        Args:
+            verts: An Nx2 array of the (x, y) vertices of the region in terms of the index values of the image.
+            statistics: The reductions to compute. Any of "mean", "std", "median" and "sum".
+
+        Returns:
+            A dictionary with an array for each of the requested `statistics`. The shape of each array is the shape of
+            the non-image dimensions of the data.
+        """
+        return reduceRoi(
+            self.canvas.source, verts, statistics, indices=self.canvas.indexes[:2]
+        )
+
     def _selectorFinished(self, verts: np.ndarray):
         """When an ROI selector finishes selecting a region the vertex coordinates of the selection are passed to this
         function. The function then uses the vertices to plot the average of the data in the ROI"""
-        import cv2
-
-        newVerts = []
-        for vert in verts:  # Convert `verts` from being in terms of the values in self.canvas._indexes to being in terms of the element locations of the data array.
-            v1 = self.canvas.image.verticalValueToCoord(vert[1])
-            v0 = self.canvas.image.horizontalValueToCoord(vert[0])
-            newVerts.append((v0, v1))
-        verts = newVerts
-
-        # Convert from vertices to a boolean mask
-        iVerts = np.rint(
-            [verts]
-        ).astype(
-            np.int32
-        )  # The brackets here convert to a 3d array which is what cv2.fillpoly expects. We have to round to integers for cv2 to work.
-        mask = np.zeros(self.canvas.data.shape[:2], dtype=np.int32)
-        cv2.fillPoly(mask, iVerts, 1)
-        mask = mask.astype(bool)
-
-        selected = self.canvas.data[
-            mask
-        ]  # For a 3d data array this will now be 2d . For a 4d array it will be 3d etc. The 0th axis is one element for each selected pixel.
-        selected = selected.mean(
-            axis=0
-        )  # Get the average over all selected pixels. We are now down to 1d for a 3d data array, 2d for a 4d data array, et.
+        try:
+            # The average over all selected pixels. This is 1d for a 3d data array, 2d for a 4d data array, etc.
+            selected = self.reduceRoi(verts, ("mean",))["mean"]
+        except ValueError:  # The selection didn't include any pixels.
+            self.selector.setActive(True)
+            return
         if len(selected.shape) == 1:
             fig, ax = pyplot.subplots()
             ax.plot(self.canvas.indexes[2], selected)
@@ -313,11 +349,11 @@ class PlotNd(QWidget):  # TODO add function and GUI method to set coordinates of
 
     # API
     @property
-    def data(self):
+    def data(self) -> t_.Union[np.ndarray, ArraySource]:
         return self.canvas.data
 
     @data.setter
-    def data(self, data: np.ndarray):
+    def data(self, data: t_.Union[np.ndarray, ArraySource]):
         self.canvas.data = data
 
     def setLimits(self, Min: float, Max: float):
@@ -0,0 +1,95 @@
+# Copyright 2018-2021 Nick Anthony, Backman Biophotonics Lab, Northwestern University
+#
+# This file is part of mpl_qt_viz.
+#
+# mpl_qt_viz is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# mpl_qt_viz is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with mpl_qt_viz.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+import copy
+import typing
+from ._plots import PlotBase
+from ._sources import ArraySource
+
+if typing.TYPE_CHECKING:
+    from matplotlib.artist import Artist
+    from ._canvas import PlotNdCanvas
+
+
+class PlotNdAnimator:
+    """The frame function used to save an animation of a `PlotNdCanvas` sweeping through one dimension of the data.
+
+    Unlike a closure over the canvas this can be pickled along with the canvas's figure, which allows the frames to be
+    rendered in other processes. When unpickled it updates the plots directly rather than through the canvas.
+
+    Args:
+        canvas: The canvas to animate.
+        dimension: The dimension of the data that each frame steps through.
+    """
+
+    def __init__(self, canvas: PlotNdCanvas, dimension: int = 2):
+        self._canvas = canvas
+        self.plots: typing.List[PlotBase] = list(canvas.artistManagers)
+        self.source: typing.Optional[ArraySource] = canvas.source
+        self.coords = tuple(canvas.coords)
+        self.dimension = dimension
+        self._frameData: typing.Optional[typing.Dict[int, typing.List]] = None  # Pre-read data for each frame.
+
+    def __call__(self, frame: int) -> typing.List[Artist]:
+        """Show `frame` and return the artists that changed."""
+        coords = self._coords(frame)
+        if self._canvas is not None:
+            self._canvas.coords = coords
+            self._canvas.updatePlots(draw=False)
+        else:
+            for i, plot in enumerate(self.plots):
+                if self._frameData is not None:
+                    plot.data = self._frameData[frame][i]
+                else:
+                    plot.data = self.source[self._slice(plot, coords)]
+                plot.setMarker(
+                    tuple(c for d, c in enumerate(coords) if d in plot.dimensions)
+                )
+        return [a for plot in self.plots for a in plot.artists]
+
+    def forFrames(self, frames: typing.Sequence[int]) -> PlotNdAnimator:
+        """Return a copy that only renders `frames`. If the data is held in memory then the data needed for those frames
+        is copied so that only it gets pickled rather than the whole array. Otherwise the data will be read from the
+        source by each process."""
+        animator = copy.copy(self)
+        if self.source is not None and self.source.inMemory:
+            animator._frameData = {
+                frame: [
+                    self.source[self._slice(plot, self._coords(frame))]
+                    for plot in self.plots
+                ]
+                for frame in frames
+            }
+            animator.source = None
+        return animator
+
+    def _coords(self, frame: int) -> typing.Tuple[int, ...]:
+        return (
+            self.coords[: self.dimension] + (frame,) + self.coords[self.dimension + 1 :]
+        )
+
+    @staticmethod
+    def _slice(plot: PlotBase, coords: typing.Tuple[int, ...]) -> typing.Tuple:
+        from ._canvas import PlotNdCanvas
+
+        return PlotNdCanvas._slice(plot, coords)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_canvas"] = None  # The canvas is a Qt widget. The plots and data are enough to render frames.
+        return state
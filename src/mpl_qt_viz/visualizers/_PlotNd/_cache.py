@@ -0,0 +1,102 @@
+# Copyright 2018-2021 Nick Anthony, Backman Biophotonics Lab, Northwestern University
+#
+# This file is part of mpl_qt_viz.
+#
+# mpl_qt_viz is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# mpl_qt_viz is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with mpl_qt_viz.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+import threading
+import typing
+from collections import OrderedDict
+import numpy as np
+
+
+class CacheStatistics(typing.NamedTuple):
+    """A snapshot of the usage of a `SliceCache`."""
+
+    hits: int
+    misses: int
+    entries: int
+    nbytes: int
+
+    @property
+    def hitRate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+class SliceCache:
+    """A least-recently-used cache of array slices that is bounded by the total number of bytes it holds. The cache is
+    thread-safe so that slices can be added from background threads.
+
+    Args:
+        maxBytes: When the cached arrays exceed this size the least recently used entries are evicted. Arrays larger
+            than this are never cached.
+    """
+
+    def __init__(self, maxBytes: int = 256 * 1024**2):
+        self.maxBytes = maxBytes
+        self._entries: typing.OrderedDict[typing.Hashable, np.ndarray] = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: typing.Hashable):
+        return key in self._entries
+
+    @property
+    def nbytes(self) -> int:
+        """The total size of the cached arrays."""
+        return self._nbytes
+
+    @property
+    def statistics(self) -> CacheStatistics:
+        return CacheStatistics(self.hits, self.misses, len(self._entries), self._nbytes)
+
+    def get(self, key: typing.Hashable) -> typing.Optional[np.ndarray]:
+        """Return the array cached for `key`, or `None` if there isn't one."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key: typing.Hashable, data: np.ndarray):
+        """Add an array to the cache, evicting old entries if needed."""
+        with self._lock:
+            if key in self._entries:
+                self._nbytes -= self._entries.pop(key).nbytes
+            if data.nbytes > self.maxBytes:
+                return
+            self._entries[key] = data
+            self._nbytes += data.nbytes
+            while self._nbytes > self.maxBytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+
+    def clear(self):
+        """Remove all entries. Hit/miss counts are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def resetStatistics(self):
+        self.hits = self.misses = 0
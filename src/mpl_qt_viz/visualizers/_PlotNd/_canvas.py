@@ -24,7 +24,12 @@ import matplotlib as mpl
 from matplotlib import pyplot as plt, gridspec
 from matplotlib.axes import Axes
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
-from ._plots import ImPlot, SidePlot, CBar
+from ._plots import PlotBase, ImPlot, SidePlot, CBar, Dirty
+from ._sources import ArraySource, NumpyArraySource, asArraySource
+from ._statistics import DataStatistics, StatisticsMode
+from ._cache import SliceCache, CacheStatistics
+from ._prefetch import PlanePrefetcher
+from ._scheduler import RenderScheduler, RenderStatistics
 
 
 def ifactive(func):
@@ -42,20 +47,48 @@ class PlotNdCanvas(FigureCanvasQTAgg):
     """The matplotlib canvas for the PlotND widget.
 
     Args:
-        data: 3D or greater numeric data
+        data: 3D or greater numeric data. This can be a numpy array (including `np.memmap`), an `ArraySource` or an
+            array-like object such as an `h5py.Dataset`. Only the data that is being displayed is read from an
+            `ArraySource`, this allows visualizing datasets that are too large to fit in memory. The source is closed
+            when the canvas is closed.
         names: The names to label each dimension of the data with.
         initialCoords: An optional tuple of coordinates to set the Nd crosshair to.
         indices: An optional tuple of 1d arrays of values to set as the indexes for each dimension of the data.
+        cmap: The colormap to display the image with.
+        statisticsMode: Determines how the data is scanned to choose the initial color limits. See `StatisticsMode`.
+        cacheBytes: The maximum size of the cache of data slices used by `updatePlots`.
+        prefetchPlanes: When scrolling through the non-image dimensions of data that isn't held in memory this many
+            image planes are loaded ahead of the crosshair on background threads. Set to 0 to disable prefetching.
+        displayPyramid: If `True` the image plane is displayed at a resolution matching the screen. The full
+            resolution plane is only drawn once zoomed in far enough to need it. This makes redrawing very large image
+            planes much faster.
+        targetFps: Dragging the crosshair renders at most this many frames per second, mouse movements in between
+            frames are merged. Set to 0 to render every mouse movement immediately.
+
+    Attributes:
+        statistics (DataStatistics): The range and percentiles of the data. These are computed lazily the first time
+            they are needed.
+        sliceCache (SliceCache): Recently displayed slices of the data. Each plot is only re-read when one of the
+            coordinates that determine its data changes. If the data array is modified in place then
+            `invalidateCache` must be called.
+        renderScheduler (RenderScheduler): Limits the rate of rendering while the crosshair is dragged. Its
+            `targetFps` can be lowered on slow connections, such as remote desktop sessions.
     """
 
     def __init__(
         self,
-        data: np.ndarray,
+        data: typing.Union[np.ndarray, ArraySource],
         names: typing.Tuple[str, ...],
         initialCoords: typing.Optional[typing.Tuple[int, ...]] = None,
         indices: typing.Optional[typing.List] = None,
         cmap: mpl.colors.Colormap = plt.cm.gray,
+        statisticsMode: typing.Union[StatisticsMode, str] = StatisticsMode.APPROXIMATE,
+        cacheBytes: int = 256 * 1024**2,
+        prefetchPlanes: int = 4,
+        displayPyramid: bool = False,
+        targetFps: float = 60,
     ):
+        data = asArraySource(data)
         assert len(data.shape) >= 3
         assert len(names) == len(data.shape)
         fig = plt.Figure(figsize=(6, 6), tight_layout=True)
@@ -90,7 +123,14 @@ class PlotNdCanvas(FigureCanvasQTAgg):
         ax: plt.Axes = fig.add_subplot(gs[1, extraDims])
         ax.get_xaxis().set_visible(False)
         ax.get_yaxis().set_visible(False)
-        self.image = ImPlot(ax, self.indexes[0], self.indexes[1], (0, 1), cmap=cmap)
+        self.image = ImPlot(
+            ax,
+            self.indexes[0],
+            self.indexes[1],
+            (0, 1),
+            cmap=cmap,
+            displayPyramid=displayPyramid,
+        )
 
         ax: plt.Axes = fig.add_subplot(gs[1, extraDims + 1], sharey=self.image.ax)
         ax.yaxis.set_ticks_position("right")
@@ -119,7 +159,18 @@ class PlotNdCanvas(FigureCanvasQTAgg):
         self.setFocusPolicy(QtCore.Qt.FocusPolicy.ClickFocus)
         self.setFocus()
 
-        self._data = data
+        self._source = data
+        self.sliceCache = SliceCache(cacheBytes)
+        self._plotKeys = {}  # The cache key of the data currently held by each plot.
+        self._prefetcher = PlanePrefetcher(
+            self.sliceCache,
+            lambda coords: self._sliceKey(self.image, coords),
+            lambda coords: self._source[self._slice(self.image, coords)],
+            data.shape,
+            planes=prefetchPlanes,
+        )
+        self._statisticsMode = StatisticsMode(statisticsMode)
+        self.statistics = DataStatistics(data, self._statisticsMode)
 
         self.coords = (
             tuple(i // 2 for i in data.shape)
@@ -127,10 +178,12 @@ class PlotNdCanvas(FigureCanvasQTAgg):
             else initialCoords
         )
 
-        Max = np.percentile(self.data[np.logical_not(np.isnan(self.data))], 99.99)
-        Min = np.percentile(self.data[np.logical_not(np.isnan(self.data))], 0.01)
+        Min, Max = self.statistics.percentile((0.01, 99.99))
         self.updateLimits(Max, Min)
 
+        self._pendingMouse: typing.Dict[Axes, typing.Tuple[float, float]] = {}  # Drag positions not rendered yet.
+        self.renderScheduler = RenderScheduler(self._renderPendingMouse, targetFps)
+
         self.spectraViewActive = True
         self.mpl_connect("button_press_event", self._onclick)
         self.mpl_connect("motion_notify_event", self._ondrag)
@@ -159,38 +212,102 @@ class PlotNdCanvas(FigureCanvasQTAgg):
         # A full draw() does not render the `animated` artists (side-plot lines,
         # crosshairs). Re-blit them here so they are visible after every draw,
         # including the initial draw and the one triggered by the widget being shown.
-        self.performBlit()
+        self.performBlit(full=True)
 
-    def updatePlots(self, blit=True):
+    def updatePlots(self, blit=True, draw: bool = True):
         """This should be called after `self.coords` have been changed to update the data of each plot.
 
         Args:
             blit: If `True` then drawing will be done more efficiently through `blitting`. Sometimes this needs to be false
                 to trigger a full redraw though.
+            draw: If `False` then the plots are updated but nothing is rendered to the screen. This is used when the
+                figure is being rendered elsewhere, e.g. when exporting an animation.
         """
         for plot in self.artistManagers:
-            slic = tuple(
-                c if i not in plot.dimensions else slice(None)
-                for i, c in enumerate(self.coords)
-            )
-            newData = self.data[slic]
-            plot.data = newData
+            key = self._sliceKey(plot, self.coords)
+            if self._plotKeys.get(plot) != key:  # Only plots whose data actually changed get new data.
+                # Check for a background load first, a load that completes in the meantime is already in the cache.
+                newData = self._prefetcher.take(key)
+                if newData is None:
+                    newData = self.sliceCache.get(key)
+                if newData is None:
+                    newData = self._source[self._slice(plot, self.coords)]
+                    if not newData.flags.owndata:  # Cache a copy, not a view that is re-read on every use.
+                        newData = newData.copy()
+                    self.sliceCache.put(key, newData)
+                plot.data = newData
+                self._plotKeys[plot] = key
             newCoords = tuple(
                 c for i, c in enumerate(self.coords) if i in plot.dimensions
             )
             plot.setMarker(newCoords)
+        if not self._source.inMemory:
+            self._prefetcher.notify(self.coords)
+        if not draw:
+            return
         if blit:
             self.performBlit()
         else:
             self.draw()
 
-    def performBlit(self):
-        """Re-render the axes efficiently using matplotlib `blitting`."""
+    @staticmethod
+    def _slice(plot: PlotBase, coords: typing.Tuple[int, ...]) -> typing.Tuple:
+        """The index into the data for the values displayed by `plot` when the crosshair is at `coords`."""
+        return tuple(
+            c if i not in plot.dimensions else slice(None)
+            for i, c in enumerate(coords)
+        )
+
+    @staticmethod
+    def _sliceKey(plot: PlotBase, coords: typing.Tuple[int, ...]) -> typing.Tuple:
+        """A cache key for the data displayed by `plot`, this only depends on the coordinates of the dimensions that
+        aren't displayed by the plot."""
+        return plot.dimensions, tuple(
+            int(c) for i, c in enumerate(coords) if i not in plot.dimensions
+        )
+
+    def invalidateCache(self):
+        """Discard all cached data slices. This must be called if the data array is modified in place."""
+        self._prefetcher.reset(self._source.shape)
+        self.sliceCache.clear()
+        self._plotKeys.clear()
+
+    def shutdown(self):
+        """Stop the background threads that prefetch data and close the `source`. This is called when the canvas or
+        the window containing it is closed, prefetching does not resume afterward."""
+        self.renderScheduler.cancel()
+        self._prefetcher.shutdown(wait=True)  # Reads that are in progress must finish before the source is closed.
+        self._source.close()
+
+    def closeEvent(self, event):
+        self.shutdown()
+        super().closeEvent(event)
+
+    @property
+    def cacheStatistics(self) -> CacheStatistics:
+        """Hit and miss counts of the slice cache."""
+        return self.sliceCache.statistics
+
+    @property
+    def renderStatistics(self) -> RenderStatistics:
+        """Frame counts and latency of rendering while dragging the crosshair."""
+        return self.renderScheduler.statistics
+
+    def performBlit(self, full: bool = False):
+        """Re-render the axes efficiently using matplotlib `blitting`. Only plots that have changed since they were last
+        rendered are re-rendered.
+
+        Args:
+            full: If `True` then every plot is re-rendered, this is needed after the background has been redrawn.
+        """
         for artistManager in self.artistManagers:  # The fact that spX is first here makes it not render on click. sometimes not sure why.
+            if not full and artistManager.dirty == Dirty.NONE:
+                continue
             if artistManager.background is not None:
                 self.restore_region(artistManager.background)
             artistManager.drawArtists()  # Draw the artists
             self.blit(artistManager.ax.bbox)
+            artistManager.dirty = Dirty.NONE
 
     def updateLimits(self, Max: float, Min: float):
         """Update the range of values displayed. Similar to the set_clim method of a matplotlib image.
@@ -246,18 +363,35 @@ class PlotNdCanvas(FigureCanvasQTAgg):
         self.setAxesNames([self.names[-1]] + list(self.names[:-1]))
         self.setIndices((self.indexes[-1],) + tuple(self.indexes[:-1]))
         self.coords = (self.coords[-1],) + tuple(self.coords[:-1])
-        axes = list(range(len(self.data.shape)))
-        self.data = np.transpose(self.data, [axes[-1]] + axes[:-1])
+        axes = list(range(self._source.ndim))
+        statistics = self.statistics  # Permuting the axes doesn't change the statistics.
+        self.source = self._source.transpose([axes[-1]] + axes[:-1])
+        self.statistics = statistics
         # The draw_event handler re-blits the animated artists after this draw.
         self.draw()
 
     @property
-    def data(self) -> np.ndarray:
-        return self._data
+    def data(self) -> typing.Union[np.ndarray, ArraySource]:
+        """The data being displayed. If the data is held in memory this is a numpy array, otherwise it is the
+        `ArraySource` that the data is read from."""
+        if isinstance(self._source, NumpyArraySource):
+            return self._source.array
+        return self._source
 
     @data.setter
-    def data(self, d: np.ndarray):
-        self._data = d
+    def data(self, d: typing.Union[np.ndarray, ArraySource]):
+        self.source = asArraySource(d)
+
+    @property
+    def source(self) -> ArraySource:
+        """The `ArraySource` that displayed data is read from."""
+        return self._source
+
+    @source.setter
+    def source(self, source: ArraySource):
+        self._source = source
+        self.invalidateCache()
+        self.statistics = DataStatistics(source, self._statisticsMode)
         self.updatePlots()
 
     @ifactive
@@ -280,7 +414,7 @@ class PlotNdCanvas(FigureCanvasQTAgg):
             except IndexError:  # No plot is being moused over
                 return
             self.coords = tuple(
-                (c + step) % self.data.shape[plot.dimensions[0]]
+                (c + step) % self._source.shape[plot.dimensions[0]]
                 if i in plot.dimensions
                 else c
                 for i, c in enumerate(self.coords)
@@ -303,6 +437,8 @@ class PlotNdCanvas(FigureCanvasQTAgg):
                 ax.plot(am.getIndex(), am.data)
                 self.childPlots.append(fig)
                 fig.show()
+        self._pendingMouse.clear()  # Any drag positions that haven't been rendered yet are out of date now.
+        self.renderScheduler.cancel()
         self._processMouse(event.inaxes, event.xdata, event.ydata)
 
     def _processMouse(self, ax: Axes, x: float, y: float):
@@ -313,6 +449,11 @@ class PlotNdCanvas(FigureCanvasQTAgg):
             x: The matplotlib x coordinate of the event
             y: The matplotlib y coordinate of the event
         """
+        self._setCoordsFromMouse(ax, x, y)
+        self.updatePlots()
+
+    def _setCoordsFromMouse(self, ax: Axes, x: float, y: float):
+        """Move the crosshair to the position of a mouse event. See `_processMouse`."""
         if ax == self.image.ax:
             self.coords = (
                 self.image.verticalValueToCoord(y),
@@ -329,6 +470,12 @@ class PlotNdCanvas(FigureCanvasQTAgg):
             self.coords = (
                 self.coords[: 2 + idx] + (int(ycoord),) + self.coords[3 + idx :]
             )
+
+    def _renderPendingMouse(self):
+        """Called by the `renderScheduler`. Apply the latest drag position in each plot and render once."""
+        pending, self._pendingMouse = self._pendingMouse, {}
+        for ax, (x, y) in pending.items():
+            self._setCoordsFromMouse(ax, x, y)
         self.updatePlots()
 
     @ifactive
@@ -338,7 +485,10 @@ class PlotNdCanvas(FigureCanvasQTAgg):
             return
         if event.button != 1:  # Only respond to a left click.
             return
-        self._processMouse(event.inaxes, event.xdata, event.ydata)
+        # Only the latest position in each plot matters, moving it to the end keeps the plots in the order they were visited.
+        self._pendingMouse.pop(event.inaxes, None)
+        self._pendingMouse[event.inaxes] = (event.xdata, event.ydata)
+        self.renderScheduler.request()
 
     def setColorMap(self, cmap: typing.Union[str, mpl.colors.Colormap]):
         """
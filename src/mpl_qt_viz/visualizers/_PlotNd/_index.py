@@ -0,0 +1,94 @@
+# Copyright 2018-2021 Nick Anthony, Backman Biophotonics Lab, Northwestern University
+#
+# This file is part of mpl_qt_viz.
+#
+# mpl_qt_viz is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# mpl_qt_viz is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with mpl_qt_viz.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+import typing
+import numpy as np
+
+
+class AxisIndex:
+    """The values associated with each coordinate along one dimension of an array. Converting a value back to the
+    nearest coordinate happens on every mouse event so the lookup strategy is chosen once up front: uniformly spaced
+    values use arithmetic, monotonic values use a binary search and only unordered values fall back to a full scan.
+
+    Args:
+        values: A 1d sequence of numeric values, one for each coordinate of the dimension.
+    """
+
+    def __init__(self, values: typing.Iterable[float]):
+        self.values = np.ascontiguousarray(
+            values if hasattr(values, "__len__") else list(values), dtype=float
+        )
+        if self.values.ndim != 1 or len(self.values) == 0:
+            raise ValueError("An index must be a non-empty 1d sequence.")
+        self._start = self.values[0]
+        self._step = None
+        self._searchable = None  # An ascending array for `np.searchsorted`.
+        self._sign = 1
+        if len(self.values) > 1:
+            diffs = np.diff(self.values)
+            if diffs[0] != 0 and np.allclose(diffs, diffs[0], rtol=1e-6, atol=0):
+                self._step = (self.values[-1] - self.values[0]) / (len(self.values) - 1)
+            elif np.all(diffs > 0):
+                self._searchable = self.values
+            elif np.all(diffs < 0):
+                self._searchable = -self.values
+                self._sign = -1
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, item):
+        return self.values[item]
+
+    def __array__(self, dtype=None, copy=None):
+        return self.values if dtype is None else self.values.astype(dtype)
+
+    @property
+    def isUniform(self) -> bool:
+        """`True` if the values are evenly spaced."""
+        return self._step is not None
+
+    def valueToCoord(self, value: float) -> int:
+        """Given a value of this index return the nearest corresponding coordinate [0, 1, 2, ...]"""
+        return int(self.valuesToCoords(np.asarray([value], dtype=float))[0])
+
+    def valuesToCoords(self, values: np.ndarray) -> np.ndarray:
+        """Vectorized version of `valueToCoord`.
+
+        Args:
+            values: An array of values of this index.
+
+        Returns:
+            An integer array of the nearest coordinate to each value.
+        """
+        values = np.asarray(values, dtype=float)
+        n = len(self.values)
+        if n == 1:
+            return np.zeros(values.shape, dtype=int)
+        if self._step is not None:
+            coords = np.rint((values - self._start) / self._step)
+            return np.clip(coords, 0, n - 1).astype(int)
+        elif self._searchable is not None:
+            v = values * self._sign
+            i = np.clip(np.searchsorted(self._searchable, v), 1, n - 1)
+            left, right = self._searchable[i - 1], self._searchable[i]
+            return np.where(v - left <= right - v, i - 1, i)
+        else:
+            return np.abs(self.values[None, :] - values.reshape(-1, 1)).argmin(
+                axis=1
+            ).reshape(values.shape)
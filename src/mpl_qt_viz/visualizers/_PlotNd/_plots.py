@@ -17,10 +17,13 @@
 
 
 from __future__ import annotations
+import enum
 import typing
 from abc import ABC, abstractmethod
 import numpy as np
 import matplotlib.pyplot as plt
+from ._index import AxisIndex
+from ._pyramid import DisplayPyramid
 
 if typing.TYPE_CHECKING:
     from matplotlib.artist import Artist
@@ -28,14 +31,34 @@ if typing.TYPE_CHECKING:
 lw = 0.75
 
 
+class Dirty(enum.Flag):
+    """What has changed about a plot since it was last rendered."""
+
+    NONE = 0
+    DATA = enum.auto()
+    MARKER = enum.auto()
+    RANGE = enum.auto()
+    ALL = DATA | MARKER | RANGE
+
+
 class PlotBase(ABC):
     """An abstract class for the plots in the ND plotter widget. Dimension is the numpy array dimensions associated
-    with this plot. For an image plot it should be a tuple of the two dimensions."""
+    with this plot. For an image plot it should be a tuple of the two dimensions.
+
+    Subclasses should add to the `dirty` flags whenever they change something that requires the plot's artists to be
+    redrawn. This lets the canvas skip re-rendering plots that haven't changed."""
 
     def __init__(self, ax: plt.Axes, dimensions: typing.Tuple[int, ...]):
         self.ax = ax  # The axes object that this plot exists on.
         self.dimensions = dimensions  # The dimensions of ND-array that this plot visualized. 2d for an image, 1d for a plot
         self.background = None
+        self.dirty = Dirty.ALL
+        self._markerPos = None  # The last position passed to `setMarker`, `None` forces the marker to be updated.
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["background"] = None  # A copy of the canvas's pixels, this can't be pickled.
+        return state
 
     def updateBackground(self):
         """Refresh the background, this is for the purposes of blitting."""
@@ -62,6 +85,7 @@ class PlotBase(ABC):
         """Show or hide the position marker (crosshair) artists. Hidden artists are skipped by `drawArtists`."""
         for artist in self.markerArtists:
             artist.set_visible(visible)
+        self.dirty |= Dirty.MARKER
 
     @property
     @abstractmethod
@@ -89,6 +113,9 @@ class ImPlot(PlotBase):
         horizontalIndex: See documentation for the `setIndices` method.
         dims: In the context of composite plot (PlotNd) representing higher dimensional data this is used to keep track
             of which dimensions of the data this plot is representing.
+        cmap: The colormap to display the image with.
+        displayPyramid: If `True` then a downsampled copy of the image that matches the resolution of the screen is
+            displayed rather than the full resolution image.
 
     """
 
@@ -99,9 +126,13 @@ class ImPlot(PlotBase):
         horizontalIndex,
         dims: typing.Tuple[int, int],
         cmap=None,
+        displayPyramid: bool = False,
     ):
         super().__init__(ax, dims)
         self.shape = (len(verticalIndex), len(horizontalIndex))
+        self._data = np.zeros(self.shape)
+        self._pyramid: typing.Optional[DisplayPyramid] = None
+        self._level = 0  # The pyramid level currently displayed.
         # NOTE: The image is intentionally NOT animated. It is drawn during normal
         # draw() calls so that it becomes part of the background snapshot captured by
         # blitting (both this canvas's and any ROI selector's AxManager sharing these
@@ -131,6 +162,10 @@ class ImPlot(PlotBase):
             animated=True,
         )[0]
         self.range = (0, 1)
+        self.ax.callbacks.connect("xlim_changed", self._viewChanged)
+        self.ax.callbacks.connect("ylim_changed", self._viewChanged)
+        self.ax.figure.canvas.mpl_connect("resize_event", self._viewChanged)
+        self.displayPyramid = displayPyramid
 
     @property
     def artists(self) -> typing.Iterable[Artist]:
@@ -144,6 +179,7 @@ class ImPlot(PlotBase):
         """Sets the value range (clim) of the image."""
         self.range = (Min, Max)
         self.im.set_clim(*self.range)
+        self.dirty |= Dirty.RANGE
 
     def setMarker(self, pos: typing.Tuple[float, float]):
         """Set the position of the crosshairs.
@@ -153,6 +189,10 @@ class ImPlot(PlotBase):
                 and vertical indexes of the plot.
         """
         assert len(pos) == 2
+        if pos == self._markerPos:
+            return
+        self._markerPos = pos
+        self.dirty |= Dirty.MARKER
         y, x = pos
         y = self._verticalCoordToValue(y)
         x = self._horizontalCoordToValue(x)
@@ -161,13 +201,57 @@ class ImPlot(PlotBase):
 
     @property
     def data(self):
-        """The 2D image data of the plot"""
-        return self.im.get_data()
+        """The full resolution 2D image data of the plot"""
+        return self._data
 
     @data.setter
     def data(self, data: np.ndarray):
         """Set the 2D image data of the plot."""
-        self.im.set_data(data)
+        self._data = data
+        self.dirty |= Dirty.DATA
+        if self._pyramid is None:
+            self.im.set_data(data)
+        else:
+            self._pyramid = DisplayPyramid(data)
+            self._level = self._chooseLevel()
+            self.im.set_data(self._pyramid[self._level])
+
+    @property
+    def displayPyramid(self) -> bool:
+        """If `True` the image is displayed at a resolution that matches the screen rather than at full resolution."""
+        return self._pyramid is not None
+
+    @displayPyramid.setter
+    def displayPyramid(self, enabled: bool):
+        self._pyramid = DisplayPyramid(self._data) if enabled else None
+        self._level = 0
+        self.im.set_data(self._data)
+        self._viewChanged()
+
+    def _chooseLevel(self) -> int:
+        """Select the pyramid level for the current size of the axes and the current zoom."""
+        left, right, bottom, top = self.im.get_extent()
+        visible = []
+        for lim, (start, end), n in zip(
+            (self.ax.get_ylim(), self.ax.get_xlim()),
+            ((bottom, top), (left, right)),
+            self._data.shape[:2],
+        ):
+            span = abs(end - start)
+            fraction = min(1, abs(lim[1] - lim[0]) / span) if span > 0 else 1
+            visible.append(fraction * n)
+        bbox = self.ax.bbox
+        return self._pyramid.chooseLevel(tuple(visible), (bbox.height, bbox.width))
+
+    def _viewChanged(self, *args):
+        """Called when the axes limits or the canvas size change. Switch to the appropriate pyramid level."""
+        if self._pyramid is None:
+            return
+        level = self._chooseLevel()
+        if level != self._level:
+            self._level = level
+            self.im.set_data(self._pyramid[level])
+            self.dirty |= Dirty.DATA
 
     def setIndices(
         self,
@@ -178,7 +262,10 @@ class ImPlot(PlotBase):
         just the integer element coordinates in the array ([0, 1, 2, ...]) then we can provide a vertical and horizontal
         index. For example if we want the image to span from -1 to 1 vertically and from 0 to 100 horizontally we could
         call `self.setIndices(np.linspace(-1, 1, num=self.data.shape[0]), np.linspace(0, 100, num=self.data.shape[1])`"""
-        self._indices = (tuple(verticalIndex), tuple(horizontalIndex))
+        self._indices = (AxisIndex(verticalIndex), AxisIndex(horizontalIndex))
+        self._markerPos = None
+        self.dirty = Dirty.ALL
+        verticalIndex, horizontalIndex = self._indices
         self.shape = (len(verticalIndex), len(horizontalIndex))
         self.im.set_extent(
             (
@@ -216,17 +303,11 @@ class ImPlot(PlotBase):
 
     def verticalValueToCoord(self, value: float):
         """Given a value of this plot's index return the nearest corresponding coordinate [0, 1, 2, ...]"""
-        coord = np.where(
-            np.abs(self._indices[0] - value) == np.min(np.abs(self._indices[0] - value))
-        )[0]
-        return int(coord[0])
+        return self._indices[0].valueToCoord(value)
 
     def horizontalValueToCoord(self, value: float):
         """Given a value of this plot's index return the nearest corresponding coordinate [0, 1, 2, ...]"""
-        coord = np.where(
-            np.abs(self._indices[1] - value) == np.min(np.abs(self._indices[1] - value))
-        )[0]
-        return int(coord[0])
+        return self._indices[1].valueToCoord(value)
 
 
 class SidePlot(PlotBase):
@@ -283,6 +364,10 @@ class SidePlot(PlotBase):
     def setMarker(self, pos: typing.Tuple[float]):
         """Set the position of the marker line. Should be given in terms of this plot's `index`"""
         assert len(pos) == 1
+        if pos == self._markerPos:
+            return
+        self._markerPos = pos
+        self.dirty |= Dirty.MARKER
         pos = self._coordToValue(pos[0])
         data = ((pos, pos), self.range)
         if self.vertical:
@@ -295,12 +380,13 @@ class SidePlot(PlotBase):
 
     def valueToCoord(self, value):
         """Given a value of this plot's index return the nearest corresponding coordinate [0, 1, 2, ...]"""
-        coord = np.argmin(np.abs(self.index - value))
-        return int(coord)
+        return self.index.valueToCoord(value)
 
     def setRange(self, Min, Max):
         """Set the y-axis range of the plot."""
         self.range = (Min, Max)
+        self._markerPos = None  # The length of the marker line depends on the range.
+        self.dirty |= Dirty.RANGE
         if self.vertical:
             _ = self.ax.set_xlim
         else:
@@ -313,8 +399,10 @@ class SidePlot(PlotBase):
         just the integer element coordinates in the data ([0, 1, 2, ...]) then we can provide an index. For example
         if we want the plot to span from -1 to 1 we could call `self.setIndex(np.linspace(-1, 1, num=self.data.shape[0])`
         """
-        self.index = tuple(index)
-        self.dimLength = len(index)
+        self.index = AxisIndex(index)
+        self.dimLength = len(self.index)
+        self._markerPos = None
+        self.dirty = Dirty.ALL
         if self.vertical:
             _ = self.ax.set_ylim
         else:
@@ -328,14 +416,15 @@ class SidePlot(PlotBase):
     @data.setter
     def data(self, data):
         self._data = data
+        self.dirty |= Dirty.DATA
         if self.vertical:
-            data = (data, self.index)
+            data = (data, self.index.values)
         else:
-            data = (self.index, data)
+            data = (self.index.values, data)
         self.plot.set_data(*data)
 
-    def getIndex(self):
-        return self.index
+    def getIndex(self) -> np.ndarray:
+        return self.index.values
 
 
 class CBar:
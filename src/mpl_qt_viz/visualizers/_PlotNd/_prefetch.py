@@ -0,0 +1,164 @@
+# Copyright 2018-2021 Nick Anthony, Backman Biophotonics Lab, Northwestern University
+#
+# This file is part of mpl_qt_viz.
+#
+# mpl_qt_viz is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# mpl_qt_viz is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with mpl_qt_viz.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+import logging
+import threading
+import typing
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+from ._cache import SliceCache
+
+Coords = typing.Tuple[int, ...]
+
+
+class PlanePrefetcher:
+    """Loads image planes into a `SliceCache` on a pool of worker threads before they are needed. The direction of
+    travel is predicted from the recent history of crosshair coordinates: if the last move changed one of the
+    non-image dimensions then the next `planes` planes in that direction are loaded.
+
+    Args:
+        cache: The cache that loaded planes are added to.
+        keyFunc: Returns the cache key of the image plane for a set of coordinates.
+        readFunc: Reads the image plane for a set of coordinates. This is called from the worker threads.
+        shape: The shape of the data. Used to wrap coordinates around, the same way scrolling does.
+        planes: The number of planes to load ahead.
+        workers: The number of worker threads.
+        historyLength: The number of previous coordinates kept to predict the direction of travel.
+    """
+
+    def __init__(
+        self,
+        cache: SliceCache,
+        keyFunc: typing.Callable[[Coords], typing.Hashable],
+        readFunc: typing.Callable[[Coords], np.ndarray],
+        shape: typing.Tuple[int, ...],
+        planes: int = 4,
+        workers: int = 2,
+        historyLength: int = 8,
+    ):
+        self.cache = cache
+        self.planes = planes
+        self._keyFunc = keyFunc
+        self._readFunc = readFunc
+        self._shape = shape
+        self._history: typing.Deque[Coords] = deque(maxlen=historyLength)
+        self._pending: typing.Dict[typing.Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._generation = 0  # Incremented whenever the data changes so that stale loads are discarded.
+        self._isShutdown = False
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="PlotNdPrefetch"
+        )
+
+    def reset(self, shape: typing.Tuple[int, ...]):
+        """Forget the coordinate history and discard any loads in progress. Call this when the data changes."""
+        with self._lock:
+            self._generation += 1
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:  # Cancelling runs the done callbacks, which need the lock.
+            future.cancel()
+        self._history.clear()
+        self._shape = shape
+
+    def take(self, key: typing.Hashable) -> typing.Optional[np.ndarray]:
+        """If the plane for `key` is currently being loaded then wait for it and return it. Otherwise return `None`."""
+        with self._lock:
+            future = self._pending.get(key)
+        if future is None or future.cancelled():
+            return None
+        try:
+            return future.result()
+        except Exception:
+            return None
+
+    def predict(self) -> typing.List[Coords]:
+        """Return the coordinates that are expected to be displayed next, nearest first."""
+        if len(self._history) < 2 or self.planes <= 0:
+            return []
+        history = list(self._history)
+        current = history[-1]
+        for previous, later in zip(reversed(history[:-1]), reversed(history[1:])):
+            changed = [
+                i for i in range(2, len(current)) if previous[i] != later[i]
+            ]  # Only the non-image dimensions select a new plane.
+            if len(changed) == 1:
+                dim = changed[0]
+                step = later[dim] - previous[dim]
+                # Moves that wrapped around the end of the dimension are really small steps the other way.
+                length = self._shape[dim]
+                if abs(step) > length / 2:
+                    step -= int(np.sign(step)) * length
+                break
+            elif len(changed) > 1:
+                return []
+        else:
+            return []
+        predicted = []
+        for k in range(1, self.planes + 1):
+            coords = list(current)
+            coords[dim] = (current[dim] + k * step) % self._shape[dim]
+            predicted.append(tuple(coords))
+        return predicted
+
+    def notify(self, coords: Coords):
+        """Record that `coords` are now displayed and begin loading the planes that are expected next."""
+        if self._isShutdown:
+            return
+        coords = tuple(int(c) for c in coords)
+        if len(self._history) == 0 or self._history[-1] != coords:
+            self._history.append(coords)
+        for predicted in self.predict():
+            key = self._keyFunc(predicted)
+            with self._lock:
+                if key in self._pending or key in self.cache:
+                    continue
+                future = self._executor.submit(
+                    self._load, key, predicted, self._generation
+                )
+                self._pending[key] = future
+            future.add_done_callback(lambda f, key=key: self._finished(key, f))
+
+    def _load(self, key: typing.Hashable, coords: Coords, generation: int) -> np.ndarray:
+        data = self._readFunc(coords)
+        if not data.flags.owndata:  # Make sure the bytes are actually read, not just mapped.
+            data = data.copy()
+        with self._lock:
+            if generation == self._generation:
+                self.cache.put(key, data)
+        return data
+
+    def _finished(self, key: typing.Hashable, future: Future):
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+        if not future.cancelled() and future.exception() is not None:
+            logging.getLogger(__name__).warning(
+                f"Failed to prefetch plane: {future.exception()}"
+            )
+
+    def shutdown(self, wait: bool = False):
+        """Stop the worker threads and discard any loads in progress. Nothing is prefetched after this.
+
+        Args:
+            wait: If `True` then block until any reads that have already started are finished.
+        """
+        self._isShutdown = True
+        self.reset(self._shape)
+        self._executor.shutdown(wait=wait, cancel_futures=True)
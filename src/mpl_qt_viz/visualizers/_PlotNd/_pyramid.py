@@ -0,0 +1,82 @@
+# Copyright 2018-2021 Nick Anthony, Backman Biophotonics Lab, Northwestern University
+#
+# This file is part of mpl_qt_viz.
+#
+# mpl_qt_viz is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# mpl_qt_viz is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with mpl_qt_viz.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+import typing
+import numpy as np
+
+
+class DisplayPyramid:
+    """Progressively downsampled copies of a 2D image plane. Level 0 is the plane itself and each following level halves
+    both dimensions by averaging 2x2 blocks. Levels are only computed the first time they are requested.
+
+    Drawing an image that has many more pixels than the screen area it occupies wastes most of the time spent resampling
+    it. Displaying the coarsest level that still has at least one pixel per screen pixel looks the same and is much
+    cheaper.
+
+    Args:
+        plane: The full resolution 2D image.
+        minSize: Levels are not reduced below this many pixels along either dimension.
+    """
+
+    def __init__(self, plane: np.ndarray, minSize: int = 64):
+        self._levels = [plane]
+        self.minSize = minSize
+        smallest = min(plane.shape[:2])
+        self.maxLevel = (
+            int(np.floor(np.log2(smallest / minSize))) if smallest > minSize else 0
+        )
+
+    def __getitem__(self, level: int) -> np.ndarray:
+        """Return the image at `level`, computing it (and any coarser levels in between) if needed."""
+        level = min(max(level, 0), self.maxLevel)
+        while len(self._levels) <= level:
+            self._levels.append(self._reduce(self._levels[-1]))
+        return self._levels[level]
+
+    @staticmethod
+    def _reduce(image: np.ndarray) -> np.ndarray:
+        """Average 2x2 blocks of `image`. An odd row or column at the end is repeated to complete the last blocks."""
+        if image.dtype.kind not in "fc":
+            image = image.astype(np.float32)
+        rows, cols = image.shape[:2]
+        if rows % 2 or cols % 2:
+            image = np.pad(image, ((0, rows % 2), (0, cols % 2)), mode="edge")
+        out = image[0::2, 0::2] + image[1::2, 0::2]
+        out += image[0::2, 1::2]
+        out += image[1::2, 1::2]
+        out *= 0.25
+        return out
+
+    def chooseLevel(
+        self, visibleShape: typing.Tuple[float, float], screenShape: typing.Tuple[float, float]
+    ) -> int:
+        """Return the coarsest level that still has at least one pixel for every screen pixel.
+
+        Args:
+            visibleShape: The number of full resolution (rows, columns) that are currently visible.
+            screenShape: The size, in screen pixels, of the area the visible region is drawn to as (height, width).
+
+        Returns:
+            The level to display.
+        """
+        factor = min(
+            v / max(s, 1) for v, s in zip(visibleShape, screenShape)
+        )  # The number of image pixels per screen pixel.
+        if factor < 2:
+            return 0
+        return min(int(np.floor(np.log2(factor))), self.maxLevel)
@@ -0,0 +1,112 @@
+# Copyright 2018-2021 Nick Anthony, Backman Biophotonics Lab, Northwestern University
+#
+# This file is part of mpl_qt_viz.
+#
+# mpl_qt_viz is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# mpl_qt_viz is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with mpl_qt_viz.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+import typing
+import numpy as np
+from ._index import AxisIndex
+from ._sources import ArraySource, asArraySource
+from ._statistics import chunkKeys
+
+_reducers = {
+    "mean": lambda selected: selected.mean(axis=0, dtype=np.float64),
+    "std": lambda selected: selected.std(axis=0, dtype=np.float64),
+    "median": lambda selected: np.median(selected, axis=0),
+    "sum": lambda selected: selected.sum(axis=0),
+}
+
+
+def roiMask(
+    verts: np.ndarray, shape: typing.Tuple[int, int]
+) -> typing.Tuple[typing.Tuple[slice, slice], np.ndarray]:
+    """Rasterize a polygon, only the bounding box of the polygon is rasterized.
+
+    Args:
+        verts: An Nx2 array of the (x, y) vertices of the polygon in terms of array coordinates, x is the column and
+            y is the row.
+        shape: The (rows, columns) shape of the image that the polygon is drawn on.
+
+    Returns:
+        A tuple of the slices of the bounding box within the image and a boolean mask of the pixels of the bounding box
+        that are inside the polygon.
+    """
+    import cv2
+
+    iVerts = np.rint(np.asarray(verts, dtype=float)).astype(np.int32)
+    lower = np.clip(iVerts.min(axis=0), 0, (shape[1] - 1, shape[0] - 1))
+    upper = np.clip(iVerts.max(axis=0), 0, (shape[1] - 1, shape[0] - 1))
+    bbox = (slice(lower[1], upper[1] + 1), slice(lower[0], upper[0] + 1))
+    mask = np.zeros((upper[1] - lower[1] + 1, upper[0] - lower[0] + 1), dtype=np.uint8)
+    cv2.fillPoly(mask, [np.ascontiguousarray(iVerts - lower)], 1)
+    return bbox, mask.astype(bool)
+
+
+def reduceRoi(
+    data: typing.Union[np.ndarray, ArraySource],
+    verts: np.ndarray,
+    statistics: typing.Sequence[str] = ("mean",),
+    indices: typing.Optional[typing.Tuple[typing.Sequence[float], typing.Sequence[float]]] = None,
+    chunkBytes: int = 64 * 1024**2,
+) -> typing.Dict[str, np.ndarray]:
+    """Reduce the pixels inside a polygonal region of interest of an N-dimensional array. The first two dimensions of
+    the array are the image dimensions, the result has the shape of the remaining dimensions.
+
+    Only the bounding box of the region is read, in chunks along the remaining dimensions, so the memory used is
+    limited by `chunkBytes` no matter how large the region or the array are.
+
+    Args:
+        data: The array to reduce. Can be an `ArraySource` to read data that doesn't fit in memory.
+        verts: An Nx2 array of the (x, y) vertices of the region. These are array coordinates unless `indices` is given.
+        statistics: The reductions to compute. Any of "mean", "std", "median" and "sum".
+        indices: The (vertical, horizontal) index values of the first two dimensions. If provided then `verts` are in
+            terms of these values and are converted to the nearest array coordinates.
+        chunkBytes: The approximate size of each read from the data.
+
+    Returns:
+        A dictionary with an array for each of the requested `statistics`.
+
+    Raises:
+        ValueError: If a statistic isn't supported or the region doesn't contain any pixels.
+    """
+    unknown = set(statistics) - set(_reducers)
+    if unknown:
+        raise ValueError(f"Unsupported statistics: {unknown}. Options are {list(_reducers)}")
+    source = asArraySource(data)
+    verts = np.asarray(verts, dtype=float)
+    if indices is not None:
+        verts = np.stack(
+            [
+                AxisIndex(indices[1]).valuesToCoords(verts[:, 0]),
+                AxisIndex(indices[0]).valuesToCoords(verts[:, 1]),
+            ],
+            axis=1,
+        )
+    bbox, mask = roiMask(verts, source.shape[:2])
+    if not mask.any():
+        raise ValueError("The region of interest does not contain any pixels.")
+
+    # Chunk the remaining dimensions so that each read of the bounding box is about `chunkBytes`.
+    itemsize = mask.size * np.dtype(source.dtype).itemsize
+    results = {stat: None for stat in statistics}
+    for key in chunkKeys(source.shape[2:], itemsize, chunkBytes):
+        selected = source[bbox + key][mask]  # The 0th axis has one element for each selected pixel.
+        for stat in statistics:
+            reduced = _reducers[stat](selected)
+            if results[stat] is None:
+                results[stat] = np.empty(source.shape[2:], dtype=reduced.dtype)
+            results[stat][key] = reduced
+    return results
@@ -0,0 +1,109 @@
+# Copyright 2018-2021 Nick Anthony, Backman Biophotonics Lab, Northwestern University
+#
+# This file is part of mpl_qt_viz.
+#
+# mpl_qt_viz is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# mpl_qt_viz is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with mpl_qt_viz.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+import time
+import typing
+from PyQt6.QtCore import QTimer
+
+
+class RenderStatistics(typing.NamedTuple):
+    """A snapshot of the performance of a `RenderScheduler`.
+
+    Attributes:
+        frames: The number of renders performed.
+        droppedFrames: The number of render requests that were merged into a later render rather than being rendered.
+        meanLatency: The average time, in seconds, from the first request of a frame until its render finished.
+        maxLatency: The longest time, in seconds, from the first request of a frame until its render finished.
+    """
+
+    frames: int
+    droppedFrames: int
+    meanLatency: float
+    maxLatency: float
+
+
+class RenderScheduler:
+    """Coalesces render requests so that rendering happens at most once per frame at the target frame rate. Requests
+    that arrive while a render is already scheduled are merged into that render. The requester should store whatever
+    state the render needs so that only the latest state is rendered.
+
+    Args:
+        render: The function that performs the rendering.
+        targetFps: The maximum number of renders per second. If this is 0 or less then each request is rendered
+            immediately.
+    """
+
+    def __init__(self, render: typing.Callable[[], None], targetFps: float = 60):
+        self._render = render
+        self.targetFps = targetFps
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+        self._requestTime: typing.Optional[float] = None  # The time of the first request since the last render.
+        self._lastRenderTime = -float("inf")
+        self.resetStatistics()
+
+    @property
+    def pending(self) -> bool:
+        """`True` if a render has been requested but not performed yet."""
+        return self._requestTime is not None
+
+    def request(self):
+        """Request a render. It will happen once the current frame interval has elapsed."""
+        now = time.perf_counter()
+        if self._requestTime is not None:
+            self._dropped += 1
+            return
+        self._requestTime = now
+        if self.targetFps <= 0:
+            self.flush()
+            return
+        wait = self._lastRenderTime + 1 / self.targetFps - now
+        self._timer.start(int(max(0.0, wait) * 1000))
+
+    def flush(self):
+        """Perform a pending render right away."""
+        self._timer.stop()
+        if self._requestTime is None:
+            return
+        requestTime = self._requestTime
+        self._requestTime = None
+        self._render()
+        self._lastRenderTime = time.perf_counter()
+        latency = self._lastRenderTime - requestTime
+        self._frames += 1
+        self._totalLatency += latency
+        self._maxLatency = max(self._maxLatency, latency)
+
+    def cancel(self):
+        """Discard a pending render."""
+        self._timer.stop()
+        self._requestTime = None
+
+    @property
+    def statistics(self) -> RenderStatistics:
+        return RenderStatistics(
+            self._frames,
+            self._dropped,
+            self._totalLatency / self._frames if self._frames > 0 else 0.0,
+            self._maxLatency,
+        )
+
+    def resetStatistics(self):
+        self._frames = self._dropped = 0
+        self._totalLatency = self._maxLatency = 0.0
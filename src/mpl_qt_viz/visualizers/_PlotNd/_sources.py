@@ -0,0 +1,453 @@
+# Copyright 2018-2021 Nick Anthony, Backman Biophotonics Lab, Northwestern University
+#
+# This file is part of mpl_qt_viz.
+#
+# mpl_qt_viz is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# mpl_qt_viz is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with mpl_qt_viz.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Array sources allow `PlotNdCanvas` to visualize data that is not held in memory as a numpy array. The canvas only
+ever asks a source for the 2D image plane and the 1D side-plot lines that it is currently displaying so disk-backed
+sources only need to read the bytes that are actually shown."""
+
+from __future__ import annotations
+import mmap
+import os
+import typing
+from abc import ABC, abstractmethod
+import numpy as np
+
+Key = typing.Tuple[typing.Union[int, slice], ...]
+
+
+class ArraySource(ABC):
+    """Abstract base class for an N-dimensional array that can be partially read. Subclasses only need to implement
+    `shape`, `dtype` and `read`. Indexing a source with `[]` supports integers and slices, the result is always a numpy
+    array. Sources that hold open files release them with `close`, a source can also be used as a context manager."""
+
+    @property
+    @abstractmethod
+    def shape(self) -> typing.Tuple[int, ...]:
+        """The shape of the full array."""
+        pass
+
+    @property
+    @abstractmethod
+    def dtype(self) -> np.dtype:
+        """The numpy dtype of the array."""
+        pass
+
+    @abstractmethod
+    def read(self, key: Key) -> np.ndarray:
+        """Read a subset of the array.
+
+        Args:
+            key: A tuple with one integer or slice for each dimension of the array. Integer indices are already
+                normalized to be non-negative.
+
+        Returns:
+            A numpy array of the requested data. Dimensions indexed with an integer are dropped, just like numpy.
+        """
+        pass
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def inMemory(self) -> bool:
+        """`True` if reading from this source doesn't require any I/O."""
+        return False
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape, dtype=np.int64)) * np.dtype(self.dtype).itemsize
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __enter__(self) -> ArraySource:
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    def close(self):
+        """Release any files held open by the source, it can't be read afterward. Does nothing by default."""
+        pass
+
+    def __getitem__(self, key) -> np.ndarray:
+        return self.read(self._normalizeKey(key))
+
+    def transpose(self, axes: typing.Sequence[int]) -> ArraySource:
+        """Return a source with its dimensions permuted, equivalent to `np.transpose`. No data is read."""
+        return _TransposedSource(self, axes)
+
+    def _normalizeKey(self, key) -> Key:
+        """Expand `key` to a full tuple of non-negative integers and slices."""
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(k is Ellipsis for k in key):
+            i = key.index(Ellipsis)
+            key = (
+                key[:i] + (slice(None),) * (self.ndim - len(key) + 1) + key[i + 1 :]
+            )
+        if len(key) > self.ndim:
+            raise IndexError(
+                f"Too many indices for an array source with {self.ndim} dimensions."
+            )
+        key = key + (slice(None),) * (self.ndim - len(key))
+        newKey = []
+        for k, s in zip(key, self.shape):
+            if isinstance(k, slice):
+                newKey.append(k)
+            else:
+                k = int(k)
+                if k < 0:
+                    k += s
+                if not 0 <= k < s:
+                    raise IndexError(
+                        f"Index {k} is out of bounds for a dimension of length {s}."
+                    )
+                newKey.append(k)
+        return tuple(newKey)
+
+
+class NumpyArraySource(ArraySource):
+    """An `ArraySource` that wraps an existing numpy array. `np.memmap` arrays can also be wrapped, in that case only the
+    pages that back the requested slice are read from disk.
+
+    Args:
+        array: The array to wrap.
+    """
+
+    def __init__(self, array: np.ndarray):
+        self.array = array
+
+    @property
+    def shape(self) -> typing.Tuple[int, ...]:
+        return self.array.shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.array.dtype
+
+    @property
+    def inMemory(self) -> bool:
+        return not isinstance(self.array, np.memmap)
+
+    def read(self, key: Key) -> np.ndarray:
+        return np.asarray(self.array[key])
+
+    def transpose(self, axes: typing.Sequence[int]) -> ArraySource:
+        return NumpyArraySource(np.transpose(self.array, axes))
+
+    def __reduce__(self):
+        # A view of a memory map is pickled as a reference to its file rather than by its contents.
+        layout = _memmapLayout(self.array)
+        if layout is None:
+            return NumpyArraySource, (self.array,)
+        return _openMemmapSource, layout
+
+
+class MemmapArraySource(NumpyArraySource):
+    """An `ArraySource` for raw binary files that are opened with `np.memmap`. Opening the file does not read any
+    data.
+
+    Args:
+        path: The path to the binary file.
+        dtype: The dtype of the values stored in the file.
+        shape: The shape of the array stored in the file.
+        offset: The number of header bytes to skip at the beginning of the file.
+        order: 'C' for row-major or 'F' for column-major data.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dtype: typing.Union[np.dtype, str],
+        shape: typing.Tuple[int, ...],
+        offset: int = 0,
+        order: str = "C",
+    ):
+        self.path = os.fspath(path)
+        self._openArgs = (np.dtype(dtype), tuple(shape), offset, order)
+        super().__init__(
+            np.memmap(
+                self.path, dtype=dtype, mode="r", shape=tuple(shape), offset=offset, order=order
+            )
+        )
+
+    def transpose(self, axes: typing.Sequence[int]) -> ArraySource:
+        # Wrapping `self` rather than transposing the memory map keeps pickling by file path.
+        return _TransposedSource(self, axes)
+
+    def __reduce__(self):
+        # Pickle by file path rather than by the contents of the memory map.
+        return MemmapArraySource, (self.path,) + self._openArgs
+
+
+def _memmapLayout(array: np.ndarray) -> typing.Optional[tuple]:
+    """Return the file name, byte offset, dtype, shape and strides that describe `array` if it is a view of a
+    read-only file backed `np.memmap`, otherwise `None`."""
+    root = array
+    while isinstance(root.base, np.ndarray):
+        root = root.base
+    if not (isinstance(root, np.memmap) and isinstance(root.base, mmap.mmap)):
+        return None
+    if getattr(root, "filename", None) is None or root.mode != "r":
+        return None
+    # The first byte of `root` is at `root.offset` in the file.
+    offset = root.offset + array.ctypes.data - root.ctypes.data
+    return root.filename, offset, array.dtype, array.shape, array.strides
+
+
+def _openMemmapSource(
+    path: str,
+    offset: int,
+    dtype: np.dtype,
+    shape: typing.Tuple[int, ...],
+    strides: typing.Tuple[int, ...],
+) -> NumpyArraySource:
+    """Reopen a `NumpyArraySource` that was pickled by `_memmapLayout`. Only the bytes spanned by the view are
+    mapped."""
+    if 0 in shape:
+        return NumpyArraySource(np.empty(shape, dtype=dtype))
+    low = sum(min(0, (n - 1) * s) for n, s in zip(shape, strides))
+    high = sum(max(0, (n - 1) * s) for n, s in zip(shape, strides)) + dtype.itemsize
+    buffer = np.memmap(path, dtype=np.uint8, mode="r", offset=offset + low, shape=(high - low,))
+    # Constructing the view as an `np.memmap` keeps `inMemory` False for the reopened source.
+    array = np.ndarray.__new__(np.memmap, shape, dtype, buffer=buffer, offset=-low, strides=strides)
+    return NumpyArraySource(array)
+
+
+class RawBinaryArraySource(ArraySource):
+    """An `ArraySource` for raw C-ordered binary files that reads the requested slices with explicit file reads. This
+    is useful for files on network drives or file systems where memory mapping performs poorly.
+
+    Requests are served by reading contiguous runs of the file. If the run that covers a requested region is larger than
+    `maxReadBytes` then the region is split along its outermost dimension and each part is read separately, this keeps
+    the number of bytes read close to the number of bytes actually requested.
+
+    Args:
+        path: The path to the binary file.
+        dtype: The dtype of the values stored in the file.
+        shape: The shape of the array stored in the file.
+        offset: The number of header bytes to skip at the beginning of the file.
+        maxReadBytes: The largest contiguous run (in bytes) that will be read in order to serve a request with a
+            single read.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dtype: typing.Union[np.dtype, str],
+        shape: typing.Tuple[int, ...],
+        offset: int = 0,
+        maxReadBytes: int = 4 * 1024**2,
+    ):
+        self.path = os.fspath(path)
+        self._dtype = np.dtype(dtype)
+        self._shape = tuple(int(i) for i in shape)
+        self.offset = offset
+        self.maxReadBytes = maxReadBytes
+        expected = offset + self.nbytes
+        if os.path.getsize(self.path) < expected:
+            raise ValueError(
+                f"File {self.path} is smaller than the {expected} bytes required for an array of shape {self._shape}."
+            )
+        # Number of elements between successive indices of each dimension.
+        self._strides = tuple(
+            int(np.prod(self._shape[i + 1 :], dtype=np.int64)) for i in range(len(self._shape))
+        )
+
+    @property
+    def shape(self) -> typing.Tuple[int, ...]:
+        return self._shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dtype
+
+    def read(self, key: Key) -> np.ndarray:
+        ranges = [
+            range(*k.indices(s)) if isinstance(k, slice) else range(k, k + 1)
+            for k, s in zip(key, self._shape)
+        ]
+        flipped = tuple(i for i, r in enumerate(ranges) if r.step < 0 and len(r) > 0)
+        ranges = [
+            r[::-1] if i in flipped else r for i, r in enumerate(ranges)
+        ]  # Read in ascending order and flip afterward.
+        outShape = tuple(len(r) for r in ranges)
+        out = np.empty(outShape, dtype=self._dtype)
+        if out.size > 0:
+            with open(self.path, "rb") as f:
+                self._readInto(f, ranges, 0, 0, out)
+            if flipped:
+                out = np.flip(out, flipped)
+        return out.reshape(
+            tuple(s for s, k in zip(outShape, key) if isinstance(k, slice))
+        )
+
+    def _readInto(
+        self,
+        f: typing.BinaryIO,
+        ranges: typing.List[range],
+        axis: int,
+        elementOffset: int,
+        out: np.ndarray,
+    ):
+        """Recursively read the region described by `ranges[axis:]` into `out`.
+
+        Args:
+            f: The open file.
+            ranges: The requested indices along each dimension.
+            axis: The first dimension that has not already been fixed to a single index.
+            elementOffset: The element offset into the file of the index that has been fixed for dimensions before
+                `axis`.
+            out: The output array for the region. Has one dimension for each dimension from `axis` onwards.
+        """
+        r = ranges[axis]
+        lo, hi = r[0], r[-1]  # Ranges are always ascending.
+        stride = self._strides[axis]
+        count = (hi - lo + 1) * stride
+        if (
+            count * self._dtype.itemsize <= self.maxReadBytes
+            or axis == len(self._shape) - 1
+        ):
+            f.seek(self.offset + (elementOffset + lo * stride) * self._dtype.itemsize)
+            block = np.fromfile(f, dtype=self._dtype, count=count)
+            block = block.reshape((hi - lo + 1,) + self._shape[axis + 1 :])
+            idx = (slice(r.start - lo, r.stop - lo, r.step),) + tuple(
+                slice(rr.start, rr.stop, rr.step) for rr in ranges[axis + 1 :]
+            )
+            out[...] = block[idx]
+        else:
+            for i, index in enumerate(r):
+                self._readInto(
+                    f, ranges, axis + 1, elementOffset + index * stride, out[i]
+                )
+
+
+class ChunkedArraySource(ArraySource):
+    """An `ArraySource` for chunked array storage such as an HDF5 dataset from `h5py` or a `zarr` array. Any object
+    with `shape`, `dtype` and numpy-style `__getitem__` can be wrapped. The storage library takes care of only reading
+    the chunks that intersect each request.
+
+    Args:
+        dataset: The chunked dataset to wrap.
+    """
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self._file = None  # A file opened by `fromHdf5`. Closed by `close`.
+
+    @classmethod
+    def fromHdf5(cls, path: str, datasetName: str) -> ChunkedArraySource:
+        """Open a dataset in an HDF5 file for reading. Requires the optional `h5py` package. The file stays open until
+        `close` is called.
+
+        Args:
+            path: The path to the HDF5 file.
+            datasetName: The name of the dataset within the file.
+        """
+        import h5py
+
+        file = h5py.File(path, "r")
+        try:
+            source = cls(file[datasetName])
+        except Exception:
+            file.close()
+            raise
+        source._file = file
+        return source
+
+    def close(self):
+        """Close the file opened by `fromHdf5`. Datasets that were passed in directly are left open."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def shape(self) -> typing.Tuple[int, ...]:
+        return tuple(self.dataset.shape)
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(self.dataset.dtype)
+
+    @property
+    def chunks(self) -> typing.Optional[typing.Tuple[int, ...]]:
+        """The chunk shape of the underlying dataset, if it has one."""
+        return getattr(self.dataset, "chunks", None)
+
+    def read(self, key: Key) -> np.ndarray:
+        return np.asarray(self.dataset[key])
+
+
+class _TransposedSource(ArraySource):
+    """A view of another `ArraySource` with its dimensions permuted.
+
+    Args:
+        source: The source being viewed.
+        axes: The permutation of the dimensions of `source`, same as the argument to `np.transpose`.
+    """
+
+    def __init__(self, source: ArraySource, axes: typing.Sequence[int]):
+        if sorted(axes) != list(range(source.ndim)):
+            raise ValueError(f"{axes} is not a valid permutation of the dimensions.")
+        self.source = source
+        self.axes = tuple(axes)
+
+    @property
+    def shape(self) -> typing.Tuple[int, ...]:
+        return tuple(self.source.shape[a] for a in self.axes)
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.source.dtype
+
+    @property
+    def inMemory(self) -> bool:
+        return self.source.inMemory
+
+    def read(self, key: Key) -> np.ndarray:
+        innerKey = [None] * len(self.axes)
+        for k, a in zip(key, self.axes):
+            innerKey[a] = k
+        data = self.source.read(tuple(innerKey))
+        # The dimensions that survive indexing, in the order the inner source returns them.
+        remaining = [a for a in range(len(self.axes)) if isinstance(innerKey[a], slice)]
+        wanted = [a for a, k in zip(self.axes, key) if isinstance(k, slice)]
+        return np.transpose(data, [remaining.index(a) for a in wanted])
+
+    def close(self):
+        self.source.close()
+
+    def transpose(self, axes: typing.Sequence[int]) -> ArraySource:
+        combined = [self.axes[a] for a in axes]
+        if combined == list(range(len(combined))):
+            return self.source
+        return self.source.transpose(combined)
+
+
+def asArraySource(data) -> ArraySource:
+    """Convert `data` to an `ArraySource`. Numpy arrays (including `np.memmap`) are wrapped by `NumpyArraySource`,
+    other array-like objects that support slicing (e.g. `h5py.Dataset`) are wrapped by `ChunkedArraySource`."""
+    if isinstance(data, ArraySource):
+        return data
+    elif isinstance(data, np.ndarray):
+        return NumpyArraySource(data)
+    elif all(hasattr(data, attr) for attr in ("shape", "dtype", "__getitem__")):
+        return ChunkedArraySource(data)
+    else:
+        return NumpyArraySource(np.asarray(data))
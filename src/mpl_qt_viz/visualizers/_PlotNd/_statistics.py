@@ -0,0 +1,189 @@
+# Copyright 2018-2021 Nick Anthony, Backman Biophotonics Lab, Northwestern University
+#
+# This file is part of mpl_qt_viz.
+#
+# mpl_qt_viz is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# mpl_qt_viz is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with mpl_qt_viz.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+import enum
+import typing
+import numpy as np
+from ._sources import ArraySource, asArraySource
+
+
+class StatisticsMode(enum.Enum):
+    """How `DataStatistics` scans the data.
+
+    Attributes:
+        EXACT: Every value is read. The minimum, maximum and percentiles are exact. Percentiles require holding all
+            finite values in memory at once.
+        APPROXIMATE: At most `maxScanBytes` of the data is read, in chunks, and percentiles are estimated from a
+            uniform random sample of fixed size. The minimum and maximum are exact when the whole array fits in the
+            scan budget.
+    """
+
+    EXACT = "exact"
+    APPROXIMATE = "approximate"
+
+
+def chunkKeys(
+    shape: typing.Tuple[int, ...], itemsize: int, chunkBytes: int
+) -> typing.List[typing.Tuple]:
+    """Divide an array into reads of about `chunkBytes`. Leading dimensions are indexed one element at a time until the
+    remaining block is small enough, consecutive blocks along the last of those dimensions are grouped into a single
+    read.
+
+    Args:
+        shape: The shape of the array.
+        itemsize: The size in bytes of each element of the array.
+        chunkBytes: The approximate size of each read.
+
+    Returns:
+        A list of keys that can be used to index the array. Together they cover the whole array.
+    """
+    k = 0
+    while (
+        k < len(shape)
+        and int(np.prod(shape[k:], dtype=np.int64)) * itemsize > chunkBytes
+    ):
+        k += 1
+    if k == 0:
+        return [()]
+    blockBytes = int(np.prod(shape[k:], dtype=np.int64)) * itemsize
+    group = max(1, chunkBytes // max(blockBytes, 1))
+    keys = []
+    for outer in np.ndindex(*shape[: k - 1]):
+        for start in range(0, shape[k - 1], group):
+            keys.append(outer + (slice(start, min(start + group, shape[k - 1])),))
+    return keys
+
+
+class DataStatistics:
+    """Computes the range and percentiles of an N-dimensional array in a single chunked pass. Nothing is computed until
+    one of the statistics is first requested.
+
+    Args:
+        data: The data to compute statistics of.
+        mode: See `StatisticsMode`.
+        sampleSize: The number of values kept to estimate percentiles in approximate mode.
+        maxScanBytes: In approximate mode, arrays larger than this are only read at evenly spaced chunks totalling
+            about this many bytes. This keeps the cost constant regardless of the size of the data.
+        chunkBytes: The approximate size of each read from the data.
+        seed: Seed for the random sampling used to estimate percentiles.
+    """
+
+    def __init__(
+        self,
+        data: typing.Union[np.ndarray, ArraySource],
+        mode: typing.Union[StatisticsMode, str] = StatisticsMode.APPROXIMATE,
+        sampleSize: int = 1_000_000,
+        maxScanBytes: int = 256 * 1024**2,
+        chunkBytes: int = 32 * 1024**2,
+        seed: int = 0,
+    ):
+        self._source = asArraySource(data)
+        self.mode = StatisticsMode(mode)
+        self.sampleSize = sampleSize
+        self.maxScanBytes = maxScanBytes
+        self.chunkBytes = chunkBytes
+        self._seed = seed
+        self._computed = False
+        self._min = self._max = None
+        self._count = 0
+        self._scannedAll = False
+        self._values = None  # The finite values (or a sample of them) used for percentiles.
+
+    @property
+    def min(self) -> float:
+        """The minimum finite value."""
+        self._compute()
+        return self._min
+
+    @property
+    def max(self) -> float:
+        """The maximum finite value."""
+        self._compute()
+        return self._max
+
+    @property
+    def isRangeExact(self) -> bool:
+        """`True` if every value was scanned, so `min` and `max` are the true extremes of the data. In approximate mode
+        data larger than `maxScanBytes` is only partly scanned and values outside of the range may exist."""
+        self._compute()
+        return self._scannedAll
+
+    @property
+    def count(self) -> int:
+        """The number of finite values that were scanned."""
+        self._compute()
+        return self._count
+
+    def percentile(self, q: typing.Union[float, typing.Sequence[float]]):
+        """Return the `q`th percentile(s) of the finite values, same as `np.percentile`. In approximate mode this is
+        estimated from a random sample."""
+        self._compute()
+        if self._values.size == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        return np.percentile(self._values, q)
+
+    def _compute(self):
+        if self._computed:
+            return
+        keys = chunkKeys(
+            self._source.shape, np.dtype(self._source.dtype).itemsize, self.chunkBytes
+        )
+        exact = self.mode is StatisticsMode.EXACT
+        totalKeys = len(keys)
+        if not exact and self._source.nbytes > self.maxScanBytes:
+            # Read a subset of evenly spaced chunks.
+            nKeys = max(1, int(len(keys) * self.maxScanBytes / self._source.nbytes))
+            keys = [keys[i] for i in np.unique(np.linspace(0, len(keys) - 1, nKeys).round().astype(int))]
+        self._scannedAll = len(keys) == totalKeys
+
+        rng = np.random.default_rng(self._seed)
+        Min, Max = np.inf, -np.inf
+        count = 0
+        values = []  # Exact mode: every finite chunk.
+        sample = np.empty(0, dtype=float)  # Approximate mode: the values with the smallest random priorities.
+        priorities = np.empty(0)
+        for key in keys:
+            chunk = np.asarray(self._source[key]).ravel()
+            if chunk.dtype.kind in "fc":
+                chunk = chunk[np.isfinite(chunk)]
+            if chunk.size == 0:
+                continue
+            count += chunk.size
+            Min = min(Min, chunk.min())
+            Max = max(Max, chunk.max())
+            if exact:
+                values.append(chunk)
+            else:
+                # Bottom-k sampling: giving every value a random priority and keeping the `sampleSize` smallest
+                # priorities seen so far is a uniform sample without replacement of everything scanned.
+                p = rng.random(chunk.size)
+                if chunk.size > self.sampleSize:
+                    idx = np.argpartition(p, self.sampleSize)[: self.sampleSize]
+                    chunk, p = chunk[idx], p[idx]
+                sample = np.concatenate([sample, chunk.astype(float)])
+                priorities = np.concatenate([priorities, p])
+                if sample.size > self.sampleSize:
+                    idx = np.argpartition(priorities, self.sampleSize)[: self.sampleSize]
+                    sample, priorities = sample[idx], priorities[idx]
+        if exact:
+            self._values = np.concatenate(values) if values else np.empty(0)
+        else:
+            self._values = sample
+        self._count = count
+        self._min, self._max = (Min, Max) if count > 0 else (np.nan, np.nan)
+        self._computed = True
@@ -29,10 +29,58 @@ Classes
    PlotNdCanvas
    DockablePlotWindow
 
+Array Sources
+--------------
+.. autosummary::
+   :toctree: generated/
+
+   ArraySource
+   NumpyArraySource
+   MemmapArraySource
+   RawBinaryArraySource
+   ChunkedArraySource
+
+Statistics
+-----------
+.. autosummary::
+   :toctree: generated/
+
+   DataStatistics
+   StatisticsMode
+
+Functions
+----------
+.. autosummary::
+   :toctree: generated/
+
+   reduceRoi
+
 """
 
 from ._multiPlot import MultiPlot
 from ._PlotNd import PlotNd, PlotNdCanvas
+from ._PlotNd._sources import (
+    ArraySource,
+    NumpyArraySource,
+    MemmapArraySource,
+    RawBinaryArraySource,
+    ChunkedArraySource,
+)
+from ._PlotNd._statistics import DataStatistics, StatisticsMode
+from ._PlotNd._roi import reduceRoi
 from ._dockPlot import DockablePlotWindow
 
-__all__ = ["MultiPlot", "PlotNd", "PlotNdCanvas", "DockablePlotWindow"]
+__all__ = [
+    "MultiPlot",
+    "PlotNd",
+    "PlotNdCanvas",
+    "DockablePlotWindow",
+    "ArraySource",
+    "NumpyArraySource",
+    "MemmapArraySource",
+    "RawBinaryArraySource",
+    "ChunkedArraySource",
+    "DataStatistics",
+    "StatisticsMode",
+    "reduceRoi",
+]
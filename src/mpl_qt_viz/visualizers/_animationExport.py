@@ -0,0 +1,473 @@
+# Copyright 2018-2021 Nick Anthony, Backman Biophotonics Lab, Northwestern University
+#
+# This file is part of mpl_qt_viz.
+#
+# mpl_qt_viz is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# mpl_qt_viz is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with mpl_qt_viz.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+import collections
+import logging
+import math
+import multiprocessing
+import os
+import pickle
+import queue
+import subprocess
+import threading
+import time
+import typing as t_
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ProcessPoolExecutor
+import numpy as np
+import matplotlib
+from matplotlib import animation
+from matplotlib.artist import Artist
+from matplotlib.backends.backend_agg import RendererAgg
+from matplotlib.figure import Figure
+from PyQt6 import QtCore
+
+__all__ = ["AnimationExporter"]
+
+AnimationInput = t_.Union[t_.List[t_.List[Artist]], t_.Tuple[t_.Callable, t_.Iterable]]
+
+
+class FrameEncoder(ABC):
+    """Writes RGBA frames to an animation file. Frames are passed to `write` from the exporter's worker thread.
+
+    Args:
+        path: The file path to save to.
+        size: The (width, height) of each frame in pixels.
+        fps: The frame rate of the animation.
+    """
+
+    def __init__(self, path: str, size: t_.Tuple[int, int], fps: float):
+        self.path = path
+        self.size = size
+        self.fps = fps
+
+    @abstractmethod
+    def write(self, frame: np.ndarray):
+        """Add a (height, width, 4) uint8 RGBA frame to the animation."""
+        pass
+
+    @abstractmethod
+    def close(self):
+        """Finish writing the file."""
+        pass
+
+    def abort(self):
+        """Stop writing and remove the partially written file."""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class FFMpegEncoder(FrameEncoder):
+    """Pipes raw RGBA frames to an ffmpeg subprocess."""
+
+    def __init__(self, path: str, size: t_.Tuple[int, int], fps: float):
+        super().__init__(path, size, fps)
+        if not animation.writers.is_available("ffmpeg"):
+            raise RuntimeError(
+                "ffmpeg could not be found. Install it or set matplotlib's `animation.ffmpeg_path` rcParam."
+            )
+        cmd = [
+            animation.FFMpegWriter.bin_path(),
+            "-y",
+            "-loglevel", "error",
+            "-f", "rawvideo",
+            "-vcodec", "rawvideo",
+            "-s", f"{size[0]}x{size[1]}",
+            "-pix_fmt", "rgba",
+            "-framerate", str(fps),
+            "-i", "-",
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",  # Most codecs require even dimensions.
+            "-pix_fmt", "yuv420p",  # Other pixel formats aren't supported by many players.
+            path,
+        ]  # fmt: skip
+        self._proc = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+
+    def write(self, frame: np.ndarray):
+        self._proc.stdin.write(frame.tobytes())
+
+    def close(self):
+        self._proc.stdin.close()
+        err = self._proc.stderr.read()
+        if self._proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed: {err.decode(errors='replace')}")
+
+    def abort(self):
+        self._proc.kill()
+        self._proc.wait()
+        super().abort()
+
+
+class GifEncoder(FrameEncoder):
+    """Saves frames as an animated GIF using Pillow. Each frame is reduced to a 256 color palette as it arrives so that
+    the frames waiting to be saved take a quarter of the memory of RGBA frames."""
+
+    def __init__(self, path: str, size: t_.Tuple[int, int], fps: float):
+        super().__init__(path, size, fps)
+        self._frames = []
+
+    def write(self, frame: np.ndarray):
+        from PIL import Image
+
+        self._frames.append(Image.fromarray(frame[..., :3]).quantize())
+
+    def close(self):
+        if len(self._frames) == 0:
+            return
+        self._frames[0].save(
+            self.path,
+            save_all=True,
+            append_images=self._frames[1:],
+            duration=int(round(1000 / self.fps)),
+            loop=0,
+        )
+        self._frames = []
+
+
+class FrameRenderer:
+    """Renders the frames of an animation into a single reused Agg buffer.
+
+    If the frame function returns the artists that it changed (the same convention as `FuncAnimation` with blitting)
+    then the rest of the figure is drawn only once and each frame only draws those artists.
+
+    Args:
+        fig: The figure to render.
+        input: See the `input` argument of `AnimationDlg`.
+    """
+
+    def __init__(self, fig: Figure, input: AnimationInput):
+        self.figure = fig
+        if callable(input[0]):
+            func, frames = input
+            self.frames = list(frames)
+            self._step = lambda i: func(self.frames[i])
+            self._animatedArtists = []
+        else:  # A list of lists of artists, only one list is shown at a time.
+            self.frames = list(input)
+            self._step = self._showArtists
+            self._animatedArtists = [a for frame in self.frames for a in frame]
+        width, height = (int(round(v)) for v in fig.bbox.size)
+        self._renderer = RendererAgg(width, height, fig.dpi)
+        self._background = None
+        self._savedAnimated = {}
+
+    @property
+    def size(self) -> t_.Tuple[int, int]:
+        """The (width, height) of the frames in pixels."""
+        return int(self._renderer.width), int(self._renderer.height)
+
+    def render(self, index: int) -> np.ndarray:
+        """Update the figure for frame `index` and render it.
+
+        Returns:
+            A (height, width, 4) uint8 RGBA array.
+        """
+        changed = self._step(index)
+        renderer = self._renderer
+        if changed is not None and not self._animatedArtists:
+            self._animatedArtists = list(changed)
+        if self._background is None or changed is None:
+            # Draw everything except the artists that change. If the changed artists are known then later frames start
+            # from a copy of this rather than drawing the whole figure again.
+            for artist in self._animatedArtists:
+                self._savedAnimated.setdefault(artist, artist.get_animated())
+                artist.set_animated(True)
+            renderer.clear()
+            with self.figure.canvas.callbacks.blocked(signal="draw_event"):
+                self.figure.draw(renderer)
+            if changed is not None:
+                self._background = renderer.copy_from_bbox(self.figure.bbox)
+        else:
+            renderer.restore_region(self._background)
+        # `Figure.draw` skips animated artists so they are drawn here. This includes artists that are always animated
+        # because the figure's canvas blits them, e.g. the side plots of `PlotNd`.
+        artists = [
+            artist
+            for ax in self.figure.axes
+            for artist in ax.get_children()
+            if artist.get_animated() and artist not in self._savedAnimated
+        ]
+        artists += self._animatedArtists if changed is None else list(changed)
+        for artist in sorted(artists, key=lambda a: a.get_zorder()):
+            if artist.get_visible():
+                artist.draw(renderer)
+        return np.array(renderer.buffer_rgba())  # Copy, the buffer is reused for the next frame.
+
+    def close(self):
+        """Restore the artists that were temporarily set as animated."""
+        for artist, animated in self._savedAnimated.items():
+            artist.set_animated(animated)
+        self._savedAnimated = {}
+        self._background = None
+
+    def _showArtists(self, index: int) -> t_.List[Artist]:
+        for i, frame in enumerate(self.frames):
+            for artist in frame:
+                artist.set_visible(i == index)
+        return self.frames[index]
+
+
+def _initWorker():
+    """Runs when each rendering process starts. Figures are only rendered offscreen in these processes."""
+    matplotlib.use("Agg", force=True)
+
+
+def _renderChunk(payload: bytes, indices: t_.Sequence[int]) -> t_.List[np.ndarray]:
+    """Runs in a worker process. Rebuild the figure and frame function from `payload` and render the frames at
+    `indices`."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig, input = pickle.loads(payload)
+    FigureCanvasAgg(fig)
+    renderer = FrameRenderer(fig, input)
+    return [renderer.render(i) for i in indices]
+
+
+class AnimationExporter(QtCore.QObject):
+    """Renders the frames of an animation offscreen and encodes them to a file without blocking the GUI.
+
+    With a single worker, frames are rendered with a `FrameRenderer` on the GUI thread, a few at a time between events,
+    because the figure may be shown on screen and matplotlib artists aren't thread-safe. The raw RGBA frames are handed
+    to a worker thread that encodes and writes the file.
+
+    With more than one worker, the frames are split into chunks that are rendered in separate processes. Each process
+    rebuilds the figure by unpickling it together with the animation input, so the frame function must be picklable
+    (e.g. a module level function or a callable object, not a closure). If the frame function has a
+    `forFrames(frames)` method then it is called to get a frame function for each chunk, this allows sending each
+    process only the data that it needs. The rendered frames are encoded in order. If the input can't be pickled then
+    the frames are rendered on the GUI thread instead.
+
+    Args:
+        fig: The figure to save the animation from.
+        input: See the `input` argument of `AnimationDlg`.
+        path: The file path to save to.
+        method: "ffmpeg" or "pillow".
+        fps: The frame rate of the animation.
+        workers: The number of processes to render frames with.
+        parent: The parent QObject.
+    """
+
+    progress = QtCore.pyqtSignal(int, int)  # The number of frames rendered so far and the total number of frames.
+    finished = QtCore.pyqtSignal(str)  # The path the animation was saved to.
+    failed = QtCore.pyqtSignal(str)  # A description of the error.
+    cancelled = QtCore.pyqtSignal()
+
+    Encoders = {"ffmpeg": FFMpegEncoder, "pillow": GifEncoder}
+
+    def __init__(
+        self,
+        fig: Figure,
+        input: AnimationInput,
+        path: str,
+        method: str,
+        fps: float,
+        workers: int = 1,
+        parent: t_.Optional[QtCore.QObject] = None,
+    ):
+        super().__init__(parent)
+        self.figure = fig
+        self.input = input
+        self.path = path
+        self.fps = fps
+        self.workers = workers
+        self._encoderType = self.Encoders[method]
+        self._frameCount = len(input[1]) if callable(input[0]) else len(input)
+        self._queue: queue.Queue = queue.Queue(maxsize=8)
+        self._stop = threading.Event()
+        self._thread: t_.Optional[threading.Thread] = None
+        self._error: t_.Optional[BaseException] = None
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._renderSome)
+        self._renderer: t_.Optional[FrameRenderer] = None
+        self._pool: t_.Optional[ProcessPoolExecutor] = None
+        self._chunks: t_.Deque[t_.Tuple[int, int]] = collections.deque()  # (start, stop) of chunks not submitted yet.
+        self._pending: t_.Deque[Future] = collections.deque()  # Submitted chunks, in order.
+        self._ready: t_.Deque[np.ndarray] = collections.deque()  # Rendered frames waiting for space in the queue.
+        self._sharedPayload: t_.Optional[bytes] = None
+        self._index = 0
+        self._endQueued = False
+
+    @property
+    def frameCount(self) -> int:
+        return self._frameCount
+
+    @property
+    def isRunning(self) -> bool:
+        return self._timer.isActive()
+
+    def start(self):
+        """Begin exporting. Progress is reported with the `progress` signal and completion with the `finished`, `failed`
+        or `cancelled` signals."""
+        self._index = 0
+        self._endQueued = False
+        self._error = None
+        self._stop.clear()
+        self._renderer = None
+        if self.workers > 1 and self._frameCount > 1:
+            self._startPool()
+        width, height = (int(round(v)) for v in self.figure.bbox.size)
+        if self._pool is None:
+            self._renderer = FrameRenderer(self.figure, self.input)
+            width, height = self._renderer.size
+        try:
+            encoder = self._encoderType(self.path, (width, height), self.fps)
+        except Exception as e:
+            self._finish()
+            self.failed.emit(str(e))
+            return
+        self._thread = threading.Thread(
+            target=self._encode, args=(encoder,), name="AnimationExport", daemon=True
+        )
+        self._thread.start()
+        self._timer.start()
+
+    def cancel(self):
+        """Stop exporting and remove the partially written file."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._finish()
+        self.cancelled.emit()
+
+    def _startPool(self):
+        """Divide the frames into chunks to be rendered by a pool of processes."""
+        try:
+            self._payload(0, 1)  # Make sure that the input can be pickled.
+        except Exception as e:
+            logging.getLogger(__name__).warning(
+                f"Animation can't be rendered in parallel, rendering in a single process. {e}"
+            )
+            return
+        # Several chunks per worker so that the work stays balanced, but not so many that rebuilding the figure for
+        # each chunk becomes significant.
+        chunkSize = max(1, math.ceil(self._frameCount / (self.workers * 4)))
+        self._chunks = collections.deque(
+            (start, min(start + chunkSize, self._frameCount))
+            for start in range(0, self._frameCount, chunkSize)
+        )
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initWorker,
+        )
+
+    def _payload(self, start: int, stop: int) -> t_.Tuple[bytes, t_.Sequence[int]]:
+        """Pickle the figure along with the animation input needed to render frames `start` to `stop`. They must be
+        pickled together so that the artists referenced by the input are the ones in the unpickled figure."""
+        if callable(self.input[0]):
+            func, frames = self.input
+            frames = list(frames)[start:stop]
+            if hasattr(func, "forFrames"):
+                func = func.forFrames(frames)
+            return pickle.dumps((self.figure, (func, frames))), range(len(frames))
+        if self._sharedPayload is None:
+            self._sharedPayload = pickle.dumps((self.figure, self.input))
+        return self._sharedPayload, range(start, stop)
+
+    def _renderSome(self):
+        """Called repeatedly by the timer. Render frames for a short time and then return to the event loop."""
+        if self._error is not None:
+            self._stop.set()
+            self._thread.join()
+            error = self._error
+            self._finish()
+            self.failed.emit(str(error))
+            return
+        try:
+            if self._pool is None:
+                self._renderSerial()
+            else:
+                self._collectChunks()
+        except Exception as e:
+            self._error = e
+            return
+        if self._index < self._frameCount:
+            return
+        if not self._endQueued:
+            if self._queue.full():
+                return
+            self._queue.put(None)  # Tell the worker that there are no more frames.
+            self._endQueued = True
+        if not self._thread.is_alive() and self._error is None:
+            self._finish()
+            self.finished.emit(self.path)
+
+    def _renderSerial(self):
+        deadline = time.perf_counter() + 0.03
+        while self._index < self._frameCount and time.perf_counter() < deadline:
+            if self._queue.full():  # The encoder is behind. Don't block the GUI waiting for it.
+                return
+            self._queue.put(self._renderer.render(self._index))
+            self._index += 1
+            self.progress.emit(self._index, self._frameCount)
+
+    def _collectChunks(self):
+        """Keep the process pool busy and pass finished frames to the encoder in order."""
+        while self._chunks and len(self._pending) < 2 * self.workers:
+            start, stop = self._chunks.popleft()
+            self._pending.append(self._pool.submit(_renderChunk, *self._payload(start, stop)))
+        while self._pending and not self._ready and self._pending[0].done():
+            self._ready.extend(self._pending.popleft().result())
+        while self._ready and not self._queue.full():
+            self._queue.put(self._ready.popleft())
+            self._index += 1
+            self.progress.emit(self._index, self._frameCount)
+
+    def _encode(self, encoder: FrameEncoder):
+        """Runs on the worker thread. Pass frames from the queue to the encoder."""
+        try:
+            while not self._stop.is_set():
+                try:
+                    frame = self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if frame is None:
+                    encoder.close()
+                    return
+                encoder.write(frame)
+            encoder.abort()
+        except BaseException as e:
+            self._error = e
+            try:
+                encoder.abort()
+            except Exception:
+                pass
+
+    def _finish(self):
+        """Clean up after exporting finishes or is stopped."""
+        self._timer.stop()
+        self._thread = None
+        if self._renderer is not None:
+            self._renderer.close()
+            self._renderer = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self._sharedPayload = None
+        self._chunks.clear()
+        self._pending.clear()
+        self._ready.clear()
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        if self.figure.canvas is not None:
+            self.figure.canvas.draw_idle()
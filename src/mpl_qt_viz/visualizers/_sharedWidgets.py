@@ -32,6 +32,7 @@ from PyQt6.QtWidgets import (
     QFileIconProvider,
     QHBoxLayout,
     QWidget,
+    QProgressBar,
 )
 from matplotlib import animation
 from matplotlib.artist import Artist
@@ -40,17 +41,22 @@ import os
 from numbers import Number
 import numpy as np
 from PyQt6 import QtCore, QtGui, QtWidgets
+from ._animationExport import AnimationExporter
 
 __all__ = ["AnimationDlg", "QRangeSlider"]
 
 
 class AnimationDlg(QDialog):
-    """A dialog box that facilitates the saving an animation.
+    """A dialog box that facilitates the saving an animation. Videos and GIFs are exported in the background with
+    `AnimationExporter` so the application stays responsive, the export can be cancelled from the dialog.
+
     Args:
         fig (Figure): The figure to save the animation from.
         input (list(list(Artists)) or tuple(Callable, Iterable)): If this is a list of lists of Artists then it will be passed to matplotlib.animation.ArtistAnimation which
             will be used to save the animation. If this is a tuple of a function and an iterable then the function will be passed to FuncAnimation where the iterable will be passed
-            to the `frames` argument.
+            to the `frames` argument. If the function returns the artists that it changed then only those artists are
+            redrawn for each frame. To render with more than one process the function must be picklable, see
+            `AnimationExporter`.
         parent (QWidget): The widget that this dialog will act as the child for.
     """
 
@@ -84,6 +90,14 @@ class AnimationDlg(QDialog):
         self.intervalSpinBox.setSingleStep(50)
         self.intervalSpinBox.setValue(100)
 
+        self.workersSpinBox = QSpinBox(self)
+        self.workersSpinBox.setMinimum(1)
+        self.workersSpinBox.setMaximum(os.cpu_count() or 1)
+        self.workersSpinBox.setValue(1)
+        self.workersSpinBox.setToolTip(
+            "The number of processes used to render frames. Not used for HTML."
+        )
+
         self.fPath = QLineEdit(self)
 
         self.browseButton = QPushButton(
@@ -97,6 +111,13 @@ class AnimationDlg(QDialog):
         self.saveButton = QPushButton("Save", self)
         self.saveButton.released.connect(self.save)
 
+        self.progressBar = QProgressBar(self)
+        self.progressBar.setVisible(False)
+        self.cancelButton = QPushButton("Cancel", self)
+        self.cancelButton.released.connect(self.reject)
+        self.cancelButton.setVisible(False)
+        self._exporter: t_.Optional[AnimationExporter] = None
+
         layout = QVBoxLayout()
         bottomLay = QHBoxLayout()
 
@@ -105,6 +126,11 @@ class AnimationDlg(QDialog):
         lay.addWidget(self.intervalSpinBox)
         layout.addLayout(lay)
 
+        lay = QHBoxLayout()
+        lay.addWidget(QLabel("Rendering Processes:"))
+        lay.addWidget(self.workersSpinBox)
+        layout.addLayout(lay)
+
         lay = QHBoxLayout()
         lay.addWidget(self.fPath)
         lay.addWidget(self.browseButton)
@@ -116,6 +142,11 @@ class AnimationDlg(QDialog):
         bottomLay.addStretch()
         layout.addLayout(bottomLay)
 
+        lay = QHBoxLayout()
+        lay.addWidget(self.progressBar)
+        lay.addWidget(self.cancelButton)
+        layout.addLayout(lay)
+
         self.setLayout(layout)
 
     def save(self):
@@ -128,6 +159,9 @@ class AnimationDlg(QDialog):
                 os.path.splitext(savePath)[1] != self.Extensions[saveMethod]
             ):  # Make sure we have the right file extension to avoid an error.
                 savePath += self.Extensions[saveMethod]
+            if saveMethod is not self.SaveMethods.HTML:
+                self._startExport(savePath, saveMethod, 1000 / frameIntervalMs)
+                return
             if callable(self.input[0]):
                 ani = animation.FuncAnimation(
                     self.figure,
@@ -152,6 +186,48 @@ class AnimationDlg(QDialog):
             QMessageBox.warning(self, "Warning", str(e))
         self.accept()
 
+    def _startExport(self, savePath: str, saveMethod: SaveMethods, fps: float):
+        """Save a video or GIF in the background, showing the progress in the dialog."""
+        self._exporter = AnimationExporter(
+            self.figure,
+            self.input,
+            savePath,
+            saveMethod.value,
+            fps,
+            workers=self.workersSpinBox.value(),
+            parent=self,
+        )
+        self._exporter.progress.connect(self._exportProgress)
+        self._exporter.finished.connect(lambda path: self.accept())
+        self._exporter.failed.connect(self._exportFailed)
+        for widget in (
+            self.saveButton,
+            self.methodCombo,
+            self.fPath,
+            self.browseButton,
+            self.intervalSpinBox,
+            self.workersSpinBox,
+        ):
+            widget.setEnabled(False)
+        self.progressBar.setRange(0, self._exporter.frameCount)
+        self.progressBar.setValue(0)
+        self.progressBar.setVisible(True)
+        self.cancelButton.setVisible(True)
+        self._exporter.start()
+
+    def _exportProgress(self, done: int, total: int):
+        self.progressBar.setValue(done)
+
+    def _exportFailed(self, message: str):
+        QMessageBox.warning(self, "Warning", message)
+        self.accept()
+
+    def reject(self):
+        """Closing the dialog cancels an export that is in progress."""
+        if self._exporter is not None and self._exporter.isRunning:
+            self._exporter.cancel()
+        super().reject()
+
     def browseFile(self):
         fname, extension = QFileDialog.getSaveFileName(
             self, "Save Location", os.getcwd()
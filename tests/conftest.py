@@ -4,4 +4,4 @@ from PyQt6.QtWidgets import QApplication
 
 @pytest.fixture(scope="session")
 def qapplication():
-    return QApplication([])
+    return QApplication.instance() or QApplication([])
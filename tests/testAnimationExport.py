@@ -0,0 +1,193 @@
+from mpl_qt_viz.visualizers._animationExport import AnimationExporter, FrameEncoder, FrameRenderer
+from mpl_qt_viz.visualizers._PlotNd._animation import PlotNdAnimator
+from mpl_qt_viz.visualizers._PlotNd._canvas import PlotNdCanvas
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PyQt6.QtCore import QCoreApplication, QEventLoop
+import numpy as np
+import os
+import pickle
+import pytest
+import time
+
+
+class RawEncoder(FrameEncoder):
+    """Writes the frames to a file without compression so that they can be read back exactly."""
+
+    def __init__(self, path, size, fps):
+        super().__init__(path, size, fps)
+        self._file = open(path, "wb")
+
+    def write(self, frame):
+        self._file.write(frame.tobytes())
+
+    def close(self):
+        self._file.close()
+
+    def abort(self):
+        self._file.close()
+        super().abort()
+
+    @staticmethod
+    def read(path, size):
+        return np.fromfile(path, dtype=np.uint8).reshape((-1, size[1], size[0], 4))
+
+
+class RawExporter(AnimationExporter):
+    Encoders = {"raw": RawEncoder}
+
+
+def processUntil(condition, timeout: float = 60):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline, "Timed out waiting for the export."
+        QCoreApplication.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 50)
+
+
+def export(exporter: AnimationExporter):
+    """Run `exporter` to completion and return the signals it emitted."""
+    signals = []
+    exporter.progress.connect(lambda *args: signals.append(("progress",) + args))
+    exporter.finished.connect(lambda path: signals.append(("finished", path)))
+    exporter.failed.connect(lambda message: signals.append(("failed", message)))
+    exporter.start()
+    processUntil(lambda: any(s[0] in ("finished", "failed") for s in signals))
+    return signals
+
+
+def lineFigure():
+    fig = Figure(figsize=(3, 2), dpi=80)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.imshow(np.random.default_rng(0).random((20, 30)))
+    ax.set_axis_off()
+    return fig, ax
+
+
+def plotNdCanvas(nFrames: int, memmapPath=None) -> PlotNdCanvas:
+    x = np.linspace(0, 1, 30)
+    y = np.linspace(0, 1, 20)
+    z = np.linspace(0, 1, nFrames)
+    Y, X, Z = np.meshgrid(y, x, z, indexing="ij")
+    data = np.sin(6 * X + 4 * Z) + np.cos(5 * Y)
+    if memmapPath is not None:
+        data.tofile(memmapPath)
+        data = np.memmap(memmapPath, data.dtype, "r", shape=data.shape)
+    canvas = PlotNdCanvas(data, ("y", "x", "z"))
+    canvas.fig.set_size_inches(3, 3)
+    return canvas
+
+
+class TestFrameRenderer:
+    @staticmethod
+    def assertMatchesDraw(fig, input, show):
+        renderer = FrameRenderer(fig, input)
+        frames = [renderer.render(i) for i in range(3)]
+        renderer.close()
+        assert renderer.size == (240, 160)
+        for i, frame in enumerate(frames):
+            show(i)
+            fig.canvas.draw()
+            assert np.array_equal(frame, np.asarray(fig.canvas.buffer_rgba()))
+
+    def test_artists(self):
+        fig, ax = lineFigure()
+        artistFrames = [ax.plot([3 + i, 20 - i], [4, 15], lw=3) for i in range(3)]
+
+        def show(i):
+            for j, artists in enumerate(artistFrames):
+                [a.set_visible(i == j) for a in artists]
+
+        self.assertMatchesDraw(fig, artistFrames, show)
+
+    def test_function(self):
+        fig, ax = lineFigure()
+        line = ax.plot([5, 25], [10, 10], color="w", lw=2)[0]
+
+        def step(i):
+            line.set_ydata([3 + 4 * i, 16 - 2 * i])
+            return [line]
+
+        self.assertMatchesDraw(fig, (step, range(3)), step)
+
+
+class TestAnimationExporter:
+    def test_progress(self, qapplication, tmp_path):
+        fig, ax = lineFigure()
+        frames = [ax.plot([3 + i, 20 - i], [4, 15]) for i in range(5)]
+        path = str(tmp_path / "anim.raw")
+        exporter = RawExporter(fig, frames, path, "raw", fps=10)
+        signals = export(exporter)
+        progress = [s[1:] for s in signals if s[0] == "progress"]
+        assert progress == [(i, 5) for i in range(1, 6)]
+        assert signals[-1] == ("finished", path)
+        assert not exporter.isRunning
+        assert RawEncoder.read(path, (240, 160)).shape[0] == 5
+
+    def test_cancel(self, qapplication, tmp_path):
+        canvas = plotNdCanvas(nFrames=200)
+        path = str(tmp_path / "anim.raw")
+        exporter = RawExporter(
+            canvas.fig, (PlotNdAnimator(canvas, 2), range(200)), path, "raw", fps=10
+        )
+        signals = []
+        exporter.progress.connect(lambda *args: signals.append("progress"))
+        exporter.finished.connect(lambda path: signals.append("finished"))
+        exporter.cancelled.connect(lambda: signals.append("cancelled"))
+        exporter.start()
+        processUntil(lambda: signals.count("progress") >= 3)
+        assert os.path.exists(path)
+        exporter.cancel()
+        assert signals[-1] == "cancelled"
+        assert not exporter.isRunning
+        assert not os.path.exists(path)  # The partial file is removed.
+        count = len(signals)
+        QCoreApplication.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 200)
+        assert len(signals) == count  # Nothing is rendered after cancelling.
+        canvas.shutdown()
+
+    @pytest.mark.parametrize("memmap", [False, True])
+    def test_parallel(self, qapplication, tmp_path, memmap):
+        canvas = plotNdCanvas(nFrames=6, memmapPath=tmp_path / "data.raw" if memmap else None)
+        if memmap:  # The memory mapped data is sent to the workers by reference to its file.
+            assert len(pickle.dumps(PlotNdAnimator(canvas, 2).forFrames(range(6)).source)) < 1000
+        size = tuple(int(round(v)) for v in canvas.fig.bbox.size)
+        results = []
+        for workers in (1, 2):
+            path = str(tmp_path / f"anim{workers}.raw")
+            exporter = RawExporter(
+                canvas.fig, (PlotNdAnimator(canvas, 2), range(6)), path, "raw", fps=10, workers=workers
+            )
+            pooled = []
+            exporter.progress.connect(lambda *args: pooled.append(exporter._pool is not None))
+            signals = export(exporter)
+            assert signals[-1] == ("finished", path)
+            assert all(pooled) == (workers > 1)  # The figure and animator could be pickled.
+            results.append(RawEncoder.read(path, size))
+        serial, parallel = results
+        assert serial.shape[0] == 6
+        assert not np.array_equal(serial[0], serial[-1])
+        assert np.array_equal(serial, parallel)
+        canvas.shutdown()
+
+    def test_cancelParallel(self, qapplication, tmp_path):
+        canvas = plotNdCanvas(nFrames=40)
+        path = str(tmp_path / "anim.raw")
+        exporter = RawExporter(
+            canvas.fig, (PlotNdAnimator(canvas, 2), range(40)), path, "raw", fps=10, workers=2
+        )
+        cancelled = []
+        exporter.cancelled.connect(lambda: cancelled.append(True))
+        exporter.start()
+        pool = exporter._pool
+        assert pool is not None
+        processUntil(lambda: exporter._index > 0)
+        processes = list(pool._processes.values())
+        assert len(processes) > 0
+        exporter.cancel()
+        assert cancelled == [True] and exporter._pool is None
+        assert not os.path.exists(path)
+        for process in processes:
+            process.join(timeout=30)
+            assert not process.is_alive()
+        canvas.shutdown()
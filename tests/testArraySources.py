@@ -0,0 +1,82 @@
+from mpl_qt_viz.visualizers import (
+    ChunkedArraySource,
+    NumpyArraySource,
+    MemmapArraySource,
+    RawBinaryArraySource,
+)
+import numpy as np
+import pickle
+import pytest
+
+
+class TestArraySources:
+    keys = [
+        (slice(None), slice(None), 2, 1),
+        (2, slice(None), 2, 0),
+        (1, 2, slice(None), 0),
+        (slice(None, None, -2), 1, slice(1, 4), slice(None)),
+        (Ellipsis, 1),
+        (-1,),
+    ]
+
+    @pytest.fixture
+    def array(self, tmp_path):
+        arr = np.random.random((7, 5, 6, 3)).astype(np.float32)
+        path = tmp_path / "data.bin"
+        arr.tofile(path)
+        return arr, path
+
+    def sources(self, arr, path):
+        return [
+            NumpyArraySource(arr),
+            MemmapArraySource(path, arr.dtype, arr.shape),
+            RawBinaryArraySource(path, arr.dtype, arr.shape),
+            RawBinaryArraySource(path, arr.dtype, arr.shape, maxReadBytes=64),
+        ]
+
+    def test_read(self, array):
+        arr, path = array
+        for source in self.sources(arr, path):
+            for key in self.keys:
+                assert np.array_equal(source[key], arr[key])
+
+    def test_transpose(self, array):
+        arr, path = array
+        transposed = np.transpose(arr, [3, 0, 1, 2])
+        for source in self.sources(arr, path):
+            t = source.transpose([3, 0, 1, 2])
+            assert t.shape == transposed.shape
+            for key in self.keys:
+                assert np.array_equal(t[key], transposed[key])
+            assert np.array_equal(t.transpose([1, 2, 3, 0])[1, :, 2], arr[1, :, 2])
+
+    def test_pickle_memmap(self, array):
+        arr, path = array
+        source = pickle.loads(pickle.dumps(MemmapArraySource(path, arr.dtype, arr.shape)))
+        assert np.array_equal(source[3], arr[3])
+        transposed = np.transpose(arr, [3, 0, 1, 2])
+        sources = [
+            MemmapArraySource(path, arr.dtype, arr.shape).transpose([3, 0, 1, 2]),
+            NumpyArraySource(np.memmap(path, arr.dtype, "r", shape=arr.shape)).transpose([3, 0, 1, 2]),
+            NumpyArraySource(np.memmap(path, arr.dtype, "r", shape=arr.shape)[::-2, 1:].transpose([3, 0, 1, 2])),
+        ]
+        for source, expected in zip(sources, [transposed, transposed, transposed[:, ::-2, 1:]]):
+            payload = pickle.dumps(source)
+            assert len(payload) < 1000  # Pickled by reference to the file rather than by value.
+            source = pickle.loads(payload)
+            assert not source.inMemory
+            for key in self.keys:
+                assert np.array_equal(source[key], expected[key])
+
+    def test_hdf5_close(self, array, tmp_path):
+        h5py = pytest.importorskip("h5py")
+        arr, _ = array
+        path = tmp_path / "data.h5"
+        with h5py.File(path, "w") as f:
+            f.create_dataset("data", data=arr, chunks=(1, 5, 6, 3))
+        with ChunkedArraySource.fromHdf5(path, "data") as source:
+            assert np.array_equal(source.transpose([3, 0, 1, 2])[1, 2], arr[2, :, :, 1])
+            file = source._file
+        assert not file  # h5py files are falsy once closed.
+        with h5py.File(path, "a"):  # Nothing else holds the file open.
+            pass
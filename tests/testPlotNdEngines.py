@@ -0,0 +1,242 @@
+import pytest
+import threading
+from mpl_qt_viz.visualizers import DataStatistics, PlotNd, reduceRoi
+from mpl_qt_viz.visualizers._PlotNd._index import AxisIndex
+from mpl_qt_viz.visualizers._PlotNd._cache import SliceCache
+from mpl_qt_viz.visualizers._PlotNd._canvas import PlotNdCanvas
+from mpl_qt_viz.visualizers._PlotNd._prefetch import PlanePrefetcher
+from mpl_qt_viz.visualizers._PlotNd._pyramid import DisplayPyramid
+from mpl_qt_viz.visualizers._PlotNd._scheduler import RenderScheduler
+from mpl_qt_viz.visualizers._PlotNd._plots import SidePlot, Dirty
+import matplotlib.pyplot as plt
+import numpy as np
+
+
+class TestDataStatistics:
+    def test_exact(self):
+        arr = np.random.random((40, 30, 20))
+        arr[0, 0, 0] = np.nan
+        arr[1, 1, 1] = -3
+        stats = DataStatistics(arr, "exact", chunkBytes=1024)
+        assert stats.min == -3
+        assert stats.max == np.nanmax(arr)
+        assert stats.count == arr.size - 1
+        assert np.allclose(
+            stats.percentile((0.01, 99.99)), np.nanpercentile(arr, (0.01, 99.99))
+        )
+
+    def test_approximate(self):
+        arr = np.random.random((40, 30, 20))
+        stats = DataStatistics(arr, "approximate", sampleSize=5000, chunkBytes=1024)
+        assert stats.min == arr.min()
+        assert stats.max == arr.max()
+        assert abs(stats.percentile(50) - 0.5) < 0.05
+
+    def test_scan_budget(self):
+        arr = np.random.random((40, 30, 20))
+        stats = DataStatistics(arr, maxScanBytes=arr.nbytes // 4, chunkBytes=1024)
+        assert stats.count <= arr.size // 3
+        assert arr.min() <= stats.min <= stats.max <= arr.max()
+        assert not stats.isRangeExact
+        assert DataStatistics(arr, chunkBytes=1024).isRangeExact
+
+
+class TestAxisIndex:
+    @staticmethod
+    def bruteForce(index, value):
+        return int(np.argmin(np.abs(np.asarray(index) - value)))
+
+    def test_lookup(self):
+        indices = [
+            np.linspace(0, 3, num=4096),  # Uniform
+            np.linspace(5, -1, num=100),  # Uniform, descending
+            np.cumsum(np.random.random(500)),  # Ascending
+            -np.cumsum(np.random.random(500)),  # Descending
+            np.random.random(50),  # Unordered
+            [2.0],
+        ]
+        for values in indices:
+            index = AxisIndex(values)
+            queries = np.random.uniform(np.min(values) - 1, np.max(values) + 1, 200)
+            expected = [self.bruteForce(values, q) for q in queries]
+            assert list(index.valuesToCoords(queries)) == expected
+            assert index.valueToCoord(queries[0]) == expected[0]
+
+    def test_range(self):
+        index = AxisIndex(range(10))
+        assert index.isUniform
+        assert index.valueToCoord(3.2) == 3
+        assert index[-1] == 9.0
+
+
+class TestSliceCache:
+    def test_lru_eviction(self):
+        cache = SliceCache(maxBytes=3 * 80)
+        for i in range(3):
+            cache.put(i, np.zeros(10))
+        assert cache.get(0) is not None  # 0 is now the most recently used.
+        cache.put(3, np.zeros(10))
+        assert 1 not in cache
+        assert all(k in cache for k in (0, 2, 3))
+        assert cache.nbytes == 3 * 80
+        cache.put(4, np.zeros(100))  # Too big to cache.
+        assert 4 not in cache
+        assert cache.get(1) is None
+        stats = cache.statistics
+        assert (stats.hits, stats.misses, stats.entries) == (1, 1, 3)
+        assert stats.hitRate == 0.5
+
+
+class TestPlanePrefetcher:
+    def test_prefetch(self):
+        data = np.random.random((8, 8, 10, 3))
+        cache = SliceCache()
+        prefetcher = PlanePrefetcher(
+            cache, lambda c: c[2:], lambda c: data[:, :, c[2], c[3]], data.shape, planes=3
+        )
+        try:
+            prefetcher.notify((0, 0, 1, 0))
+            prefetcher.notify((0, 0, 0, 0))  # Moving backwards, wraps around the end of the dimension.
+            assert prefetcher.predict() == [(0, 0, 9, 0), (0, 0, 8, 0), (0, 0, 7, 0)]
+            for key in ((9, 0), (8, 0), (7, 0)):
+                plane = prefetcher.take(key)
+                if plane is None:
+                    plane = cache.get(key)
+                assert np.array_equal(plane, data[:, :, key[0], key[1]])
+            prefetcher.notify((0, 0, 0, 1))
+            prefetcher.notify((0, 0, 3, 2))  # Two dimensions changed, the direction is unknown.
+            assert prefetcher.predict() == []
+        finally:
+            prefetcher.shutdown()
+
+
+class TestDisplayPyramid:
+    def test_levels(self):
+        plane = np.arange(300 * 257, dtype=np.uint16).reshape(300, 257)
+        pyramid = DisplayPyramid(plane, minSize=32)
+        assert pyramid.maxLevel == 3
+        assert pyramid[0] is plane
+        assert pyramid[1].shape == (150, 129)
+        assert pyramid[1][0, 0] == plane[:2, :2].mean()
+        assert pyramid[1][0, -1] == plane[:2, -1].mean()  # The odd column is repeated.
+        assert pyramid[10].shape == (38, 33)  # Clipped to the maximum level.
+
+    def test_chooseLevel(self):
+        pyramid = DisplayPyramid(np.zeros((4096, 4096)))
+        assert pyramid.chooseLevel((4096, 4096), (500, 500)) == 3
+        assert pyramid.chooseLevel((4096, 4096), (500, 2000)) == 1
+        assert pyramid.chooseLevel((600, 600), (500, 500)) == 0
+        assert pyramid.chooseLevel((4096, 4096), (1, 1)) == pyramid.maxLevel
+
+
+class TestRenderScheduler:
+    def test_coalesce(self, qapplication):
+        renders = []
+        scheduler = RenderScheduler(lambda: renders.append(1), targetFps=1)
+        for i in range(5):
+            scheduler.request()
+        assert scheduler.pending and len(renders) == 0
+        scheduler.flush()
+        stats = scheduler.statistics
+        assert (len(renders), stats.frames, stats.droppedFrames) == (1, 1, 4)
+        scheduler.request()
+        scheduler.cancel()
+        scheduler.flush()
+        assert len(renders) == 1
+        scheduler.targetFps = 0  # Render immediately.
+        scheduler.request()
+        assert len(renders) == 2 and not scheduler.pending
+
+
+class TestDirtyFlags:
+    def test_sidePlot(self):
+        fig, ax = plt.subplots()
+        plot = SidePlot(ax, range(10), False, 2)
+        plot.dirty = Dirty.NONE
+        plot.setMarker((3,))
+        assert plot.dirty == Dirty.MARKER
+        plot.dirty = Dirty.NONE
+        plot.setMarker((3,))  # Unchanged.
+        assert plot.dirty == Dirty.NONE
+        plot.setRange(0, 2)
+        plot.data = np.zeros(10)
+        assert plot.dirty == Dirty.RANGE | Dirty.DATA
+        plt.close(fig)
+
+
+class TestReduceRoi:
+    def test_reduce(self):
+        import cv2
+
+        data = np.random.random((60, 50, 4, 3))
+        verts = np.array([[5, 3], [40, 10], [30, 55], [2, 40]])
+        mask = np.zeros(data.shape[:2], dtype=np.uint8)
+        cv2.fillPoly(mask, [verts.astype(np.int32)], 1)
+        selected = data[mask.astype(bool)]
+        results = reduceRoi(data, verts, ("mean", "std", "median", "sum"), chunkBytes=2048)
+        assert np.allclose(results["mean"], selected.mean(axis=0))
+        assert np.allclose(results["std"], selected.std(axis=0))
+        assert np.allclose(results["median"], np.median(selected, axis=0))
+        assert np.allclose(results["sum"], selected.sum(axis=0))
+        # Vertices in terms of index values.
+        indices = (np.linspace(0, 1, 60), np.linspace(10, 20, 50))
+        valueVerts = np.stack([indices[1][verts[:, 0]], indices[0][np.minimum(verts[:, 1], 59)]], axis=1)
+        verts[:, 1] = np.minimum(verts[:, 1], 59)
+        expected = reduceRoi(data, verts)["mean"]
+        assert np.allclose(reduceRoi(data, valueVerts, indices=indices)["mean"], expected)
+
+    def test_empty(self):
+        with pytest.raises(ValueError):
+            reduceRoi(np.zeros((10, 10, 3)), np.array([[20, 20], [30, 20], [30, 30]]))
+
+
+class TestPlotNdCanvas:
+    def test_sliceCache(self, qapplication, tmp_path):
+        arr = np.random.random((20, 30, 10))
+        mm = np.memmap(tmp_path / "data.raw", dtype=arr.dtype, mode="w+", shape=arr.shape)
+        mm[:] = arr
+        for data in (mm, arr.transpose(1, 0, 2)):
+            canvas = PlotNdCanvas(data, ("a", "b", "c"))
+            assert len(canvas.sliceCache) == 4
+            for cached in canvas.sliceCache._entries.values():
+                assert cached.flags.owndata  # Views of the data are copied.
+            assert np.array_equal(canvas.image.data, np.asarray(data)[:, :, canvas.coords[2]])
+
+    def test_shutdown(self, qapplication, tmp_path):
+        mm = np.memmap(tmp_path / "data.raw", dtype=float, mode="w+", shape=(20, 30, 10))
+        mm[:] = np.random.random(mm.shape)
+        canvas = PlotNdCanvas(mm, ("a", "b", "c"))
+        for z in range(4):  # Scrolling through the data starts prefetching.
+            canvas.coords = canvas.coords[:2] + (z,)
+            canvas.updatePlots(draw=False)
+        assert any(t.name.startswith("PlotNdPrefetch") for t in threading.enumerate())
+        closed = []
+        canvas.source.close = lambda: closed.append(True)
+        canvas.close()
+        assert closed == [True]
+        for thread in threading.enumerate():
+            if thread.name.startswith("PlotNdPrefetch"):
+                thread.join(timeout=5)
+                assert not thread.is_alive()
+        canvas.coords = canvas.coords[:2] + (5,)
+        canvas.updatePlots(draw=False)  # Still usable, but nothing is prefetched.
+        assert not any(t.name.startswith("PlotNdPrefetch") for t in threading.enumerate())
+
+
+class TestPlotNd:
+    def test_sliderLimits(self, qapplication):
+        arr = np.random.default_rng(0).integers(100, 4000, (40, 30, 20)).astype(np.uint16)
+        arr[0, 0, 0], arr[-1, -1, -1] = 5, 4090
+        plot = PlotNd(arr, statisticsMode="exact")
+        assert (plot.slider.min(), plot.slider.max()) == (5, 4090)
+        plot.close()
+        for data, limits in [(arr, (0, 65535)), (arr.astype(float) - 2000, (-np.inf, np.inf))]:
+            plot = PlotNd(data)
+            # Only part of the data is scanned.
+            plot.canvas.statistics = DataStatistics(data, maxScanBytes=data.nbytes // 4, chunkBytes=1024)
+            Min, Max = plot.canvas.statistics.min, plot.canvas.statistics.max
+            sliderMin, sliderMax = plot._sliderLimits(Min, Max)
+            assert sliderMin == max(Min - (Max - Min) / 2, limits[0])
+            assert sliderMax == min(Max + (Max - Min) / 2, limits[1])
+            assert sliderMin <= data.min() and sliderMax >= data.max()
+            plot.close()
@@ -0,0 +1,233 @@
+from mpl_qt_viz.roiSelection import ImageObserver, CreatorWidgetBase, FullImPaintCreator, WaterShedPaintCreator
+from mpl_qt_viz.roiSelection._coreClasses import AxManager
+from mpl_qt_viz.roiSelection._creatorWidgets._roiOverlay import RoiOverlay
+from mpl_qt_viz.roiSelection._creatorWidgets._regionIndex import RegionIndex
+from mpl_qt_viz.roiSelection._creatorWidgets.lasso import _VertexBuffer
+from mpl_qt_viz.roiSelection._modifierWidgets._spline import ClosedCatmullRom
+from mpl_qt_viz.roiSelection._modifierWidgets.polygonModifier import PolygonModifier, pointToSegmentDistances
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Polygon
+from matplotlib.path import Path
+import matplotlib.pyplot as plt
+import shapely
+import numpy as np
+import pickle
+import pytest
+import time
+from PyQt6.QtCore import QCoreApplication, QEventLoop
+
+
+class TestImageObserver:
+    def test_notify(self):
+        fig, ax = plt.subplots()
+        im = ax.imshow(np.zeros((10, 10)))
+        observer = ImageObserver.forImage(im)
+        assert ImageObserver.forImage(im) is observer
+        versions = []
+        cid = observer.subscribe(versions.append)
+        im.set_data(np.ones((5, 5)))
+        im.set_array(np.ones((6, 6)))
+        assert versions == [1, 2]
+        assert im.get_array().shape == (6, 6)
+        observer.unsubscribe(cid)
+        im.set_data(np.ones((5, 5)))
+        assert versions == [1, 2] and observer.version == 3
+        im2 = pickle.loads(pickle.dumps(im))
+        im2.set_data(np.ones((2, 2)))
+        assert im2.get_array().shape == (2, 2)
+        plt.close(fig)
+
+
+class TestRegionIndex:
+    def test_lookup(self):
+        rng = np.random.default_rng(0)
+        polys = [
+            shapely.Point(rng.uniform(0, 200, 2)).buffer(rng.uniform(3, 20))
+            for _ in range(50)
+        ]
+        index = RegionIndex(polys)
+        paths = [Path(np.asarray(p.exterior.coords)) for p in polys]
+        for x, y in rng.uniform(-10, 210, (500, 2)):
+            expected = next(
+                (i for i, path in enumerate(paths) if path.contains_point((x, y))),
+                None,
+            )
+            assert index.lookup(x, y) == expected
+        assert RegionIndex([]).lookup(0, 0) is None
+
+
+class TestRoiOverlay:
+    class Selector(CreatorWidgetBase):
+        getHelpText = staticmethod(lambda: "")
+
+        def reset(self):
+            pass
+
+    def test_image(self):
+        polys = [shapely.box(100, 100, 160, 140), shapely.box(300, 200, 380, 260)]
+        fig, ax = plt.subplots()
+        ax.imshow(np.zeros((500, 500)), cmap="gray")
+        selector = self.Selector(ax)
+        overlay = RoiOverlay(selector, alpha=1, imageThreshold=0)
+        overlay.setRegions(polys, RegionIndex(polys))
+        overlay.setColor(1, (0, 1, 1))
+        assert overlay.setHighlight(1) and not overlay.setHighlight(1)
+        ax.set_xlim(290, 390)
+        ax.set_ylim(270, 190)
+        fig.canvas.draw()
+        for artist in selector._artists:
+            ax.draw_artist(artist)
+        buffer = np.asarray(fig.canvas.buffer_rgba())
+        for point, color in [((340, 230), (0, 255, 255)), ((299, 199), (0, 0, 0))]:
+            x, y = ax.transData.transform(point)
+            assert tuple(buffer[int(buffer.shape[0] - y), int(x), :3]) == color
+        overlay.clear()
+        assert len(selector._artists) == 0
+        plt.close(fig)
+
+
+class TestVertexBuffer:
+    def test_grow(self):
+        buffer = _VertexBuffer(capacity=4)
+        points = np.random.random((50, 2))
+        for x, y in points:
+            buffer.append(x, y)
+        assert len(buffer) == 50
+        assert np.array_equal(buffer.array, points)
+        assert np.array_equal(buffer.closedArray[-1], points[0])
+        patch = Polygon([[0, 0]])
+        patch.set_xy(buffer.closedArray)
+        assert np.shares_memory(patch.get_xy(), buffer.array)  # Not copied.
+        buffer.clear()
+        buffer.append(1, 2)
+        assert buffer.closedArray.tolist() == [[1, 2], [1, 2]]
+
+
+class TestClosedCatmullRom:
+    def test_movePoint(self):
+        angle = np.linspace(0, 2 * np.pi, 50, endpoint=False)
+        points = np.stack([np.cos(angle), np.sin(angle)], axis=1) * 100 + np.random.normal(0, 3, (50, 2))
+        spline = ClosedCatmullRom(points)
+        counts = np.random.randint(1, 10, 50)
+        samples = spline.sample(counts)
+        assert len(samples) == counts.sum() + 1
+        starts = np.concatenate([[0], np.cumsum(counts)])
+        assert np.allclose(samples[starts], np.concatenate([points, points[:1]]))  # Passes through every point.
+        for i, xy in [(0, (10, 20)), (49, (-5, 0)), (20, (0, 0))]:
+            spline.movePoint(i, xy)
+        assert np.allclose(spline.sample(counts), ClosedCatmullRom(spline.points).sample(counts))
+
+
+class TestPointToSegmentDistances:
+    def test_distances(self):
+        starts = np.array([[0, 0], [0, 0], [4, 4], [2, 2]], dtype=float)
+        ends = np.array([[10, 0], [0, -5], [6, 4], [2, 2]], dtype=float)  # The last segment has no length.
+        d = pointToSegmentDistances((3, 4), starts, ends)
+        assert np.allclose(d, [4, 5, 1, np.hypot(1, 2)])
+
+
+class TestPolygonModifier:
+    def test_vertexUnderPoint(self):
+        fig, ax = plt.subplots()
+        ax.set_xlim(0, 100)
+        ax.set_ylim(0, 100)
+        modifier = PolygonModifier(ax)
+        angle = np.linspace(0, 2 * np.pi, 12, endpoint=False)
+        modifier.initialize([np.stack([50 + 30 * np.cos(angle), 50 + 30 * np.sin(angle)], axis=1)])
+        handles = modifier._screenHandles()
+        rng = np.random.default_rng(0)
+        points = np.concatenate([handles + rng.normal(0, 6, handles.shape), rng.uniform(0, 500, (200, 2))])
+        hits = 0
+        for x, y in points:
+            event = type("Event", (), dict(x=x, y=y))
+            d = np.hypot(handles[:, 0] - x, handles[:, 1] - y)  # Compare against checking every vertex.
+            expected = int(d.argmin()) if d.min() < modifier.epsilon else None
+            assert modifier._get_ind_under_point(event) == expected
+            hits += expected is not None
+        assert hits > 5
+        plt.close(fig)
+
+
+class TestAxManager:
+    def test_partialUpdate(self):
+        fig, ax = plt.subplots()
+        ax.imshow(np.random.random((50, 50)))
+        manager = AxManager(ax)
+        blits = []
+        fig.canvas.blit = blits.append
+        square = Polygon([(5, 5), (15, 5), (15, 15), (5, 15)], animated=True, alpha=0.5)
+        line = Polygon([(30, 30), (40, 35)], closed=False, fill=False, animated=True)
+        manager.addArtist(square)
+        manager.addArtist(line)
+        fig.canvas.draw()
+        manager.update()
+        assert blits[-1].bounds == ax.bbox.bounds  # The first update after a draw covers the whole axes.
+        manager.update()
+        assert len(blits) == 1  # Nothing changed.
+        for x in range(10):
+            square.set_xy(np.array(square.get_xy()) + 1)
+            manager.update()
+        assert blits[-1].width * blits[-1].height < ax.bbox.width * ax.bbox.height / 4
+        partial = np.asarray(fig.canvas.buffer_rgba()).copy()
+        manager._needsFull = True
+        manager.update()
+        assert np.array_equal(partial, np.asarray(fig.canvas.buffer_rgba()))
+        manager.removeArtist(line)
+        manager.update()
+        assert blits[-1].bounds != ax.bbox.bounds
+        plt.close(fig)
+
+
+class TestPaintCreators:
+    @staticmethod
+    def waitForSegmentation(creator, timeout=30):
+        deadline = time.perf_counter() + timeout
+        while creator._segmenter.busy:
+            assert time.perf_counter() < deadline
+            QCoreApplication.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 20)
+
+    @pytest.mark.parametrize("creatorType", [FullImPaintCreator, WaterShedPaintCreator])
+    def test_refresh(self, qapplication, creatorType):
+        x = np.linspace(0, 1, 200)
+        X, Y = np.meshgrid(x, x)
+        fig = Figure()
+        FigureCanvasQTAgg(fig)
+        ax = fig.add_subplot()
+        im = ax.imshow(np.clip(np.sin(8 * X) * np.sin(8 * Y), 0, None))
+        creator = creatorType(ax, im)
+        creator.set_active(True)
+        self.waitForSegmentation(creator)
+        before = creator._cachedRegions
+        assert len(before) > 0
+        im.get_array()[:] = np.clip(np.sin(12 * X) * np.sin(12 * Y), 0, None)  # Modified in place, this isn't detected.
+        creator.paint()
+        assert not creator._segmenter.busy and creator._cachedRegions is before
+        creator.dlg.refreshButton.click()
+        self.waitForSegmentation(creator)
+        expected = type(creator._pipeline)()(im.get_array().copy(), **creator.dlg.getSettings())
+        assert len(creator._cachedRegions) == len(expected) != len(before)
+        assert all(p.equals(q) for p, q in zip(creator._cachedRegions, expected))
+        creator.set_active(False)
+
+    def test_dialogSettings(self, qapplication):
+        fig = Figure()
+        FigureCanvasQTAgg(fig)
+        ax = fig.add_subplot()
+        im = ax.imshow(np.zeros((100, 100)))
+        watershed = WaterShedPaintCreator(ax, im)
+        assert set(watershed.dlg.getSettings()) == {
+            "closingRadius", "openingRadius", "minimumArea", "hMinimaDepth"
+        }
+        adaptive = FullImPaintCreator(ax, im)
+        sliders = adaptive.dlg.sliders
+        settings = adaptive.dlg.getSettings()
+        assert set(settings) == {
+            "adaptiveRange", "thresholdOffset", "erode", "dilate", "polySimplification", "minArea"
+        }
+        assert not adaptive.dlg.isStale()
+        sliders["erode"].setValue(4)
+        assert adaptive.dlg.isStale()
+        assert adaptive.dlg.getSettings()["dilate"] == 4  # Dilation is limited by the erosion.
+        sliders["adaptiveRange"].setValue(50)
+        assert sliders["adaptiveRange"].value() % 2 == 1
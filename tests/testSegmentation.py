@@ -0,0 +1,214 @@
+from mpl_qt_viz.roiSelection._creatorWidgets._segmentation import (
+    AdaptiveSegmenter,
+    EightBitNormalizer,
+    WatershedSegmenter,
+    adaptiveThresholdTiled,
+    _erodeDilate,
+    segmentAdaptive,
+    segmentWatershed,
+    to8bit,
+)
+from mpl_qt_viz.roiSelection._creatorWidgets._worker import SegmentationWorker
+from mpl_qt_viz.roiSelection import segmentStack
+from PyQt6.QtCore import QCoreApplication, QEventLoop
+from shapely.geometry import Polygon
+import pytest
+from skimage import measure
+import cv2
+import numpy as np
+import threading
+import time
+
+
+def blobImage(size: int = 400, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 1, size)
+    X, Y = np.meshgrid(x, x)
+    return np.sin(20 * X) * np.sin(20 * Y) + rng.normal(0, 0.1, X.shape)
+
+
+class TestAdaptiveSegmenter:
+    def test_stages(self):
+        image = blobImage()
+        segmenter = AdaptiveSegmenter()
+        polys = segmenter(image, adaptiveRange=51, erode=1, dilate=1)
+        assert len(polys) > 0
+        threshold = segmenter._stages["threshold"][1]
+        filtered = segmenter(image, adaptiveRange=51, erode=1, dilate=1, minArea=400)
+        assert segmenter._stages["threshold"][1] is threshold  # Not recomputed.
+        assert len(filtered) < len(polys)
+        expected = segmentAdaptive(image, adaptiveRange=51, erode=1, dilate=1, minArea=400)
+        assert all(p.equals(q) for p, q in zip(filtered, expected))
+        segmenter(image + 1, adaptiveRange=51, erode=1, dilate=1, minArea=400)
+        assert segmenter._stages["threshold"][1] is not threshold  # The image changed.
+
+    def test_tiled(self):
+        image = to8bit(blobImage(size=700))
+        for blockSize, tileSize in [(3, 128), (51, 200), (301, 160)]:
+            expected = cv2.adaptiveThreshold(
+                image, 1, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, blockSize, -5
+            )
+            tiled = adaptiveThresholdTiled(image, blockSize, -5, tileSize, workers=3)
+            assert np.array_equal(tiled, expected)
+
+    def test_erodeDilate(self):
+        dumbbell = Polygon(
+            [(0, 0), (10, 0), (10, 4), (20, 4), (20, 0), (30, 0), (30, 10), (20, 10), (20, 6), (10, 6), (10, 10), (0, 10)]
+        )
+        square = Polygon([(50, 50), (60, 50), (60, 60), (50, 60)])
+        polys = _erodeDilate([dumbbell, square], erode=2, dilate=1)
+        assert len(polys) == 3  # The erosion splits the dumbbell in two.
+        expected = list(dumbbell.buffer(-2).geoms) + [square.buffer(-2)]
+        assert all(p.equals_exact(q.buffer(1), 0) for p, q in zip(polys, expected))
+
+
+class TestEightBitNormalizer:
+    @staticmethod
+    def reference(arr):
+        arr = arr.astype(float)
+        arr -= np.percentile(arr, 0.1)
+        arr = arr / np.percentile(arr, 99.9) * 255
+        return np.clip(arr, 0, 255).astype(np.uint8)
+
+    def test_matchesPercentile(self):
+        rng = np.random.default_rng(0)
+        for arr in [
+            rng.integers(0, 256, (301, 257)).astype(np.uint8),
+            rng.integers(0, 4096, (500, 333)).astype(np.uint16)[:, ::2],
+            blobImage(),
+            rng.integers(-50, 50, (100, 101)),
+        ]:
+            assert np.array_equal(to8bit(arr), self.reference(arr))
+
+    def test_cache(self):
+        normalizer = EightBitNormalizer(cacheSize=2)
+        image = blobImage()
+        assert np.array_equal(normalizer(image, key=1), self.reference(image))
+        Min = np.percentile(image, 0.1)
+        Max = np.percentile(image - Min, 99.9)
+        stale = np.clip((image + 1 - Min) / Max * 255, 0, 255).astype(np.uint8)
+        assert np.array_equal(normalizer(image + 1, key=1), stale)  # The cached percentiles are reused.
+        normalizer(image, key=2)
+        normalizer(image, key=3)
+        assert list(normalizer._cache) == [2, 3]
+
+
+class TestWatershedSegmenter:
+    def test_removeSmallObjects(self):
+        binary = blobImage(size=300) > 0.5
+        expected = binary.copy()
+        labeled = measure.label(binary)
+        for prop in measure.regionprops(labeled):
+            if prop.area < 150:
+                expected[labeled == prop.label] = False
+        filtered = WatershedSegmenter._removeSmallObjects(binary, 150)
+        assert np.array_equal(filtered, expected)
+        assert 0 < filtered.sum() < binary.sum()
+
+    def test_stages(self):
+        segmenter = WatershedSegmenter()
+        polys = segmenter(blobImage(), minimumArea=100, hMinimaDepth=2)
+        assert len(polys) > 0
+        image8 = segmenter._stages["8bit"][1]
+        distance = segmenter._stages["distance"][1]
+        segmenter(blobImage(), minimumArea=100, hMinimaDepth=5)
+        assert segmenter._stages["distance"][1] is distance
+        assert segmenter._stages["8bit"][1] is image8  # The image isn't converted again.
+        assert set(segmenter.timings) >= {"smallObjects", "distance", "markers", "watershed"}
+
+    def test_distanceMetric(self):
+        segmenter = WatershedSegmenter()
+        segmenter(blobImage(), minimumArea=100, hMinimaDepth=2)
+        smallObjects = segmenter._stages["smallObjects"][1]
+        distance = segmenter._stages["distance"][1]
+        polys = segmenter(blobImage(), minimumArea=100, hMinimaDepth=2, distanceMetric="chessboard")
+        assert segmenter._stages["smallObjects"][1] is smallObjects
+        assert not np.array_equal(segmenter._stages["distance"][1], distance)
+        expected = segmentWatershed(blobImage(), minimumArea=100, hMinimaDepth=2, distanceMetric="chessboard")
+        assert len(polys) == len(expected) > 0
+        with pytest.raises(ValueError):
+            segmenter(blobImage(), distanceMetric="manhattan")
+
+
+class TestSegmentStack:
+    def test_parallel(self, tmp_path):
+        stack = np.stack([blobImage(size=200, seed=i) for i in range(4)]).astype(np.float32)
+        params = dict(adaptiveRange=51, erode=1, dilate=1)
+        expected = [segmentAdaptive(frame, **params) for frame in stack]
+        mm = np.memmap(tmp_path / "stack.raw", dtype=stack.dtype, mode="w+", shape=stack.shape)
+        mm[:] = stack
+        mm.flush()
+        progress = []
+        for images in (stack, mm, iter(stack)):
+            results = list(
+                segmentStack(images, "adaptive", params, workers=2, progress=lambda *args: progress.append(args))
+            )
+            assert len(results) == len(expected)
+            for polys, expectedPolys in zip(results, expected):
+                assert len(polys) == len(expectedPolys) > 0
+                assert all(p.equals(q) for p, q in zip(polys, expectedPolys))
+        assert progress[:4] == [(i, 4) for i in range(1, 5)]
+        assert progress[-1] == (4, None)
+
+
+class TestSegmentationWorker:
+    @pytest.fixture
+    def worker(self, qapplication):
+        worker = SegmentationWorker()
+        self.results, self.errors, self.busy, self.ran = [], [], [], []
+        worker.finished.connect(self.results.append)
+        worker.failed.connect(self.errors.append)
+        worker.busyChanged.connect(self.busy.append)
+        self.release = threading.Event()
+        yield worker
+        self.release.set()
+        worker._pool.waitForDone(5000)
+
+    def job(self, name, block=False):
+        if block:
+            self.release.wait(5)
+        self.ran.append(name)
+        return name
+
+    @staticmethod
+    def processEvents(worker, condition=lambda: True, timeout=5):
+        """Deliver the queued signals of jobs until `condition` is true and no job is running."""
+        deadline = time.perf_counter() + timeout
+        while not (condition() and worker._pool.activeThreadCount() == 0):
+            assert time.perf_counter() < deadline
+            QCoreApplication.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 20)
+        QCoreApplication.processEvents()
+
+    def test_latestOnly(self, worker):
+        worker.submit(self.job, "a", block=True)
+        for name in "bcd":
+            worker.submit(self.job, name)
+        assert worker.busy and self.busy == [True]
+        self.release.set()
+        self.processEvents(worker, lambda: len(self.results) > 0)
+        assert self.results == ["d"]
+        assert self.ran == ["a", "d"]  # "b" and "c" were replaced before they started.
+        assert self.busy == [True, False] and not worker.busy
+
+    def test_staleResult(self, worker):
+        worker.submit(self.job, "a", block=True)
+        worker.cancel()
+        self.release.set()
+        self.processEvents(worker, lambda: not worker._running)
+        assert self.ran == ["a"] and self.results == []  # "a" finished but belonged to an older generation.
+        worker.submit(self.job, "b")
+        self.processEvents(worker, lambda: len(self.results) > 0)
+        assert self.results == ["b"]
+
+    def test_cancel(self, worker):
+        def fail():
+            self.release.wait(5)
+            raise ValueError()
+
+        worker.submit(fail)
+        worker.cancel()
+        assert self.busy == [True, False] and not worker.busy
+        self.release.set()
+        self.processEvents(worker, lambda: not worker._running)
+        assert self.results == [] and self.errors == []
+        assert self.busy == [True, False]